@@ -0,0 +1,21 @@
+"""Shared endpoint dependencies."""
+
+from fastapi import HTTPException
+
+from app.ml.lifecycle import ModelNotReadyError, get_model_lifecycle
+
+
+async def require_model():
+    """
+    Wait until the model is loaded and warmed up.
+
+    Inference endpoints depend on this instead of loading the model
+    themselves, so only the lifecycle manager ever loads it.
+
+    Raises:
+        HTTPException: 503 if the model is not ready in time or failed to load
+    """
+    try:
+        await get_model_lifecycle().wait_ready()
+    except ModelNotReadyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
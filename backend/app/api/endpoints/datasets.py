@@ -1,14 +1,84 @@
-"""Dataset management endpoints."""
+"""Dataset management endpoints.
 
-from typing import List
-from fastapi import APIRouter, HTTPException, UploadFile, File
+Reading dataset metadata may (re-)index new or modified files, which
+hashes and parses them, so it runs in a worker thread.
+
+Request bodies are size-limited before FastAPI parses them: by then an
+upload would already be spooled in full.
+"""
+
+import asyncio
+import logging
+from concurrent.futures import Future
+from typing import BinaryIO, Callable, List, Optional
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+    Request,
+    Response,
+    UploadFile,
+    File,
+)
+from fastapi.routing import APIRoute
 import os
 
+from app.api.deps import require_model
 from app.core.config import settings
 from app.models.schemas import DatasetInfo
-from app.utils.data_loader import load_dataset, list_available_datasets
+from app.ml.dataset_embeddings import (
+    DTYPES,
+    load_dataset_embeddings,
+    precompute_dataset_embeddings,
+)
+from app.ml.executor import get_inference_executor
+from app.utils.data_loader import load_dataset, list_available_datasets, resolve_dataset_file
+from app.utils.ingestion import ingest_dataset
+
+logger = logging.getLogger(__name__)
+
+# Room for the multipart boundaries and part headers around an uploaded file
+_MULTIPART_OVERHEAD = 64 * 1024
+
+
+def _upload_too_large() -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File exceeds the {settings.MAX_UPLOAD_SIZE_MB} MB upload limit",
+    )
+
+
+class SizeLimitedRoute(APIRoute):
+    """Route rejecting request bodies over MAX_UPLOAD_SIZE_MB while they are received."""
 
-router = APIRouter()
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def size_limited_handler(request: Request) -> Response:
+            max_bytes = settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024 + _MULTIPART_OVERHEAD
+            content_length = request.headers.get("content-length")
+            if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+                raise _upload_too_large()
+
+            # Bodies without (or with a wrong) Content-Length are counted as they arrive
+            received = 0
+            receive = request.receive
+
+            async def limited_receive():
+                nonlocal received
+                message = await receive()
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    raise _upload_too_large()
+                return message
+
+            return await route_handler(Request(request.scope, limited_receive))
+
+        return size_limited_handler
+
+
+router = APIRouter(route_class=SizeLimitedRoute)
 
 
 @router.get("/", response_model=List[DatasetInfo])
@@ -20,7 +90,7 @@ async def list_datasets():
         List[DatasetInfo]: List of available datasets with metadata
     """
     try:
-        datasets = list_available_datasets()
+        datasets = await asyncio.to_thread(list_available_datasets)
         return datasets
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -39,7 +109,9 @@ async def get_dataset_info(dataset_name: str, include_samples: bool = True):
         DatasetInfo: Dataset information and optional samples
     """
     try:
-        dataset_info = load_dataset(dataset_name, include_samples=include_samples)
+        dataset_info = await asyncio.to_thread(
+            load_dataset, dataset_name, include_samples=include_samples
+        )
         return dataset_info
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Dataset '{dataset_name}' not found")
@@ -47,32 +119,147 @@ async def get_dataset_info(dataset_name: str, include_samples: bool = True):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post(
+    "/{dataset_name}/embeddings",
+    status_code=202,
+    dependencies=[Depends(require_model)],
+)
+async def precompute_embeddings(dataset_name: str, dtype: Optional[str] = None):
+    """
+    Precompute the embeddings of a dataset in the background.
+
+    Batch requests naming the dataset as reference_dataset then memory-map
+    the stored matrix instead of encoding the dataset.
+
+    Args:
+        dataset_name: Name of the dataset
+        dtype: Storage dtype, float16 or float32 (settings default if omitted)
+
+    Returns:
+        dict: Scheduling status
+    """
+    if dtype is not None and dtype not in DTYPES:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown dtype '{dtype}'. Available: {', '.join(DTYPES)}"
+        )
+    try:
+        resolve_dataset_file(dataset_name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_name}' not found")
+
+    # Encoding shares the inference workers with matching requests
+    future = get_inference_executor().submit(
+        precompute_dataset_embeddings, dataset_name, dtype=dtype
+    )
+    future.add_done_callback(lambda done: _log_precompute_failure(dataset_name, done))
+
+    return {"status": "scheduled", "dataset": dataset_name}
+
+
+def _log_precompute_failure(dataset_name: str, future: Future):
+    """Log the error of a failed background precomputation."""
+    if future.exception() is not None:
+        logger.error(f"Precomputing embeddings of {dataset_name} failed: {future.exception()}")
+
+
+@router.get("/{dataset_name}/embeddings")
+async def get_embeddings_info(dataset_name: str):
+    """
+    Describe the precomputed embeddings of a dataset for the current model.
+
+    Args:
+        dataset_name: Name of the dataset
+
+    Returns:
+        dict: Model fingerprint, dtype, shape and creation time of the embeddings
+    """
+    try:
+        embeddings = await asyncio.to_thread(load_dataset_embeddings, dataset_name)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Dataset '{dataset_name}' not found")
+
+    if embeddings is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No embeddings of '{dataset_name}' precomputed for the current model",
+        )
+    return embeddings.meta
+
+
 @router.post("/upload")
-async def upload_dataset(file: UploadFile = File(...)):
+async def upload_dataset(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
     """
     Upload a custom dataset.
 
+    Request bodies larger than MAX_UPLOAD_SIZE_MB are rejected while they
+    are received; the file is then copied to disk in chunks. It is ingested
+    into an Arrow file in the background, so later loads skip CSV parsing.
+
     Args:
+        background_tasks: Runs the ingestion after the response is sent
         file: CSV file containing records
 
     Returns:
         dict: Upload status and dataset name
     """
-    if not file.filename.endswith(".csv"):
+    filename = os.path.basename(file.filename or "")
+    if not filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only CSV files are supported")
 
+    file_path = os.path.join(settings.RAW_DATA_DIR, filename)
     try:
-        # Save uploaded file
-        file_path = os.path.join(settings.RAW_DATA_DIR, file.filename)
-        content = await file.read()
-
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        return {
-            "status": "success",
-            "filename": file.filename,
-            "message": "Dataset uploaded successfully",
-        }
+        # File I/O runs in a worker thread, off the event loop
+        size = await asyncio.to_thread(
+            _store_upload, file.file, file_path, settings.MAX_UPLOAD_SIZE_MB * 1024 * 1024
+        )
+    except OverflowError:
+        raise _upload_too_large()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    background_tasks.add_task(ingest_dataset, filename)
+
+    return {
+        "status": "success",
+        "filename": filename,
+        "size": size,
+        "message": "Dataset uploaded successfully, ingestion scheduled",
+    }
+
+
+def _store_upload(source: BinaryIO, file_path: str, max_bytes: int) -> int:
+    """
+    Copy an uploaded file into the raw data directory in chunks.
+
+    The copy goes to a partial file first, so an aborted upload never
+    replaces a dataset.
+
+    Args:
+        source: Uploaded file
+        file_path: Destination path
+        max_bytes: Maximum file size
+
+    Returns:
+        int: Size of the file in bytes
+
+    Raises:
+        OverflowError: If the file exceeds max_bytes
+    """
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    part_path = f"{file_path}.part"
+
+    size = 0
+    try:
+        with open(part_path, "wb") as f:
+            while chunk := source.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise OverflowError(f"File exceeds {max_bytes} bytes")
+                f.write(chunk)
+        os.replace(part_path, file_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+    return size
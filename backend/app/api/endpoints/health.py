@@ -1,9 +1,10 @@
 """Health check endpoint."""
 
 from fastapi import APIRouter
-import torch
+from fastapi.responses import JSONResponse
 
 from app.core.config import settings
+from app.ml.lifecycle import get_model_lifecycle
 from app.models.schemas import HealthCheck
 
 router = APIRouter()
@@ -14,18 +15,40 @@ async def health_check():
     """
     Check the health status of the API.
 
+    Liveness is reported unconditionally; readiness only once the model is
+    loaded and warmed up.
+
     Returns:
         HealthCheck: Current health status including model availability
     """
-    # Check if CUDA is available
-    device = "cuda" if torch.cuda.is_available() else "cpu"
-
-    # TODO: Check if model is actually loaded
-    model_loaded = False  # Will be updated when we implement model loading
+    # The configured device until the model (and torch) is loaded; then the device in use
+    lifecycle = get_model_lifecycle()
+    device = lifecycle.device or settings.DEVICE
 
     return HealthCheck(
         status="healthy",
         version=settings.VERSION,
-        model_loaded=model_loaded,
+        model_loaded=lifecycle.ready,
         device=device,
+        live=True,
+        ready=lifecycle.ready,
+        model_state=lifecycle.state,
+        backend=settings.MODEL_BACKEND,
+        model_load_time=lifecycle.load_time,
+        model_warmup_time=lifecycle.warmup_time,
+        model_error=lifecycle.error,
     )
+
+
+@router.get("/health/ready", response_model=HealthCheck, responses={503: {"model": HealthCheck}})
+async def readiness_check():
+    """
+    Readiness probe: 200 once the model is ready, 503 before.
+
+    Returns:
+        HealthCheck: Current health status including model availability
+    """
+    health = await health_check()
+    if not health.ready:
+        return JSONResponse(status_code=503, content=health.model_dump())
+    return health
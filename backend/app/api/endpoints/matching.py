@@ -1,19 +1,44 @@
 """Entity matching endpoints."""
 
-from fastapi import APIRouter, HTTPException
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.api.deps import require_model
 from app.models.schemas import (
     RecordPair,
     MatchResult,
     BatchMatchRequest,
     BatchMatchResult,
+    MatchJob,
+    ClusterRequest,
+    Explanation,
+    LinkageCorpusConfig,
+    LinkageCorpusInfo,
+    LinkageDelta,
+    LinkageDeltaResult,
+    ThresholdOptimizationResult,
+    TokenAttributionResult,
 )
-from app.ml.inference import predict_match, batch_predict
+from app.ml.clustering import MatchGraph, cluster_match_edges
+from app.ml.executor import InferenceOverloadedError, get_inference_executor
+from app.ml.explainability import RecordLinkageExplainer
+from app.ml.explanation_store import get_explanation_store
+from app.ml.inference import BatchMatchRun, predict_match, batch_predict, resolve_dataset_b
+from app.ml.jobs import get_job_manager
+from app.ml.linkage_corpus import get_corpus_registry
+from app.ml.micro_batching import get_micro_batcher
+from app.ml.model import get_model
+from app.ml.threshold_optimization import get_threshold_optimizer
 
 router = APIRouter()
 
 
-@router.post("/predict", response_model=MatchResult)
+@router.post("/predict", response_model=MatchResult, dependencies=[Depends(require_model)])
 async def predict_record_match(
     record_pair: RecordPair,
     include_explanation: bool = True,
@@ -34,11 +59,80 @@ async def predict_record_match(
             include_explanation=include_explanation,
         )
         return result
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
 
-@router.post("/batch", response_model=BatchMatchResult)
+@router.post(
+    "/explain/tokens", response_model=TokenAttributionResult, dependencies=[Depends(require_model)]
+)
+async def explain_record_tokens(
+    record_pair: RecordPair,
+    max_tokens: Optional[int] = None,
+    time_budget: Optional[float] = None,
+):
+    """
+    Attribute the similarity of two records to their tokens by occlusion.
+
+    Token attributions cost one encode per token and are never part of
+    /predict; the request's budget is capped by the server settings.
+
+    Args:
+        record_pair: Pair of records to explain
+        max_tokens: Maximum number of tokens to occlude
+        time_budget: Seconds after which no further batch of tokens is started
+
+    Returns:
+        TokenAttributionResult: Contribution of each evaluated token
+    """
+    if (max_tokens is not None and max_tokens < 1) or (
+        time_budget is not None and time_budget <= 0
+    ):
+        raise HTTPException(status_code=400, detail="Budgets must be positive")
+
+    try:
+        explainer = RecordLinkageExplainer(get_model())
+        return await get_inference_executor().run(
+            explainer.explain_tokens, record_pair, max_tokens, time_budget
+        )
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Token attribution failed: {str(e)}")
+
+
+@router.get(
+    "/explanations/{explanation_id}",
+    response_model=Explanation,
+    dependencies=[Depends(require_model)],
+)
+async def get_explanation(explanation_id: str):
+    """
+    Resolve the explanation handle of a batch match.
+
+    The explanation is computed on the first request and memoized.
+
+    Args:
+        explanation_id: explanation_id of a MatchResult
+
+    Returns:
+        Explanation: SHAP explanation of the match
+    """
+    try:
+        return await get_explanation_store().get(explanation_id)
+    except KeyError:
+        raise HTTPException(
+            status_code=404, detail=f"Explanation not found or expired: {explanation_id}"
+        )
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Explanation failed: {str(e)}")
+
+
+@router.post("/batch", response_model=BatchMatchResult, dependencies=[Depends(require_model)])
 async def batch_match_records(request: BatchMatchRequest):
     """
     Perform batch matching between two datasets.
@@ -50,27 +144,437 @@ async def batch_match_records(request: BatchMatchRequest):
         BatchMatchResult: Results of all comparisons
     """
     try:
+        # Loading a reference dataset may index and parse it: keep it off the event loop
+        dataset_b, embeddings_b = await asyncio.to_thread(resolve_dataset_b, request)
         result = await batch_predict(
             dataset_a=request.dataset_a,
-            dataset_b=request.dataset_b,
+            dataset_b=dataset_b,
             threshold=request.threshold,
             include_explanations=request.include_explanations,
+            blocking=request.blocking,
+            scoring_mode=request.scoring_mode,
+            top_k=request.top_k,
+            prefilter=request.prefilter,
+            embeddings_b=embeddings_b,
+            clustering=request.clustering,
         )
         return result
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Batch matching failed: {str(e)}")
 
 
-@router.get("/threshold/optimize")
-async def optimize_threshold(dataset_name: str):
+@router.post("/batch/stream", dependencies=[Depends(require_model)])
+async def batch_match_records_stream(request: BatchMatchRequest):
     """
-    Find optimal threshold for a dataset using ROC curve analysis.
+    Perform batch matching and stream results as newline-delimited JSON.
+
+    Every line is a JSON object with a "type":
+    - "progress": emitted once up front and after every scored chunk
+    - "match": one MatchResult, emitted as soon as its chunk is scored
+    - "cluster": one EntityCluster, emitted after all matches if clustering was requested
+    - "summary": final counts and processing time
+    - "error": emitted instead of the summary if matching fails midway
+
+    Args:
+        request: Batch matching request with two datasets
+
+    Returns:
+        StreamingResponse: application/x-ndjson stream of frames
+    """
+    start_time = time.time()
+
+    try:
+        # Loading a reference dataset may index and parse it: keep it off the event loop
+        dataset_b, embeddings_b = await asyncio.to_thread(resolve_dataset_b, request)
+        run = BatchMatchRun(
+            dataset_a=request.dataset_a,
+            dataset_b=dataset_b,
+            threshold=request.threshold,
+            blocking=request.blocking,
+            scoring_mode=request.scoring_mode,
+            top_k=request.top_k,
+            prefilter=request.prefilter,
+            embeddings_b=embeddings_b,
+        )
+        graph = None
+        if request.clustering:
+            graph = MatchGraph(run.dataset_a.ids, run.dataset_b.ids, request.clustering)
+        # Candidate generation and dataset_b encoding happen before the stream starts
+        await get_inference_executor().run(run.prepare)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch matching failed: {str(e)}")
+
+    return StreamingResponse(
+        _stream_batch_frames(run, request.include_explanations, start_time, graph),
+        media_type="application/x-ndjson",
+    )
+
+
+def _frame(frame_type: str, **payload) -> str:
+    """Serialize one NDJSON frame."""
+    return json.dumps({"type": frame_type, **payload}) + "\n"
+
+
+def _next_chunk_results(
+    chunks: Iterator,
+    run: BatchMatchRun,
+    include_explanations: bool,
+    graph: Optional[MatchGraph] = None,
+) -> Optional[List[MatchResult]]:
+    """Score the next chunk of a run, or return None when the run is done."""
+    scored_pairs = next(chunks, None)
+    if scored_pairs is None:
+        return None
+    if graph is not None:
+        graph.add(scored_pairs)
+    return [
+        run.to_match_result(scored_pair, include_explanation=include_explanations)
+        for scored_pair in scored_pairs
+    ]
+
+
+async def _stream_batch_frames(
+    run: BatchMatchRun,
+    include_explanations: bool,
+    start_time: float,
+    graph: Optional[MatchGraph] = None,
+) -> AsyncIterator[str]:
+    """
+    Generate the NDJSON frames of a streaming batch run.
+
+    Every chunk is scored on the inference executor, so the event loop
+    stays free while the stream is open.
+    """
+    executor = get_inference_executor()
+    yield _frame("progress", **run.progress(time.time() - start_time).model_dump())
+
+    try:
+        chunks = run.chunks()
+        while True:
+            # Already-admitted streams queue for a worker instead of being rejected
+            match_results = await asyncio.wrap_future(
+                executor.submit(_next_chunk_results, chunks, run, include_explanations, graph)
+            )
+            if match_results is None:
+                break
+            for result in match_results:
+                yield _frame("match", result=result.model_dump())
+            yield _frame("progress", **run.progress(time.time() - start_time).model_dump())
+        run.precompute_explanations()
+
+        if graph is not None:
+            clusters = await asyncio.wrap_future(executor.submit(lambda: list(graph.clusters())))
+            for cluster in clusters:
+                yield _frame("cluster", cluster=cluster.model_dump())
+    except Exception as e:
+        yield _frame("error", detail=f"Batch matching failed: {str(e)}")
+        return
+
+    yield _frame(
+        "summary",
+        total_comparisons=run.total_comparisons,
+        matches_found=run.matches_found,
+        processing_time=time.time() - start_time,
+        pairs_pruned=run.pairs_pruned,
+        blocking_method=run.blocking_method,
+        prefilter_accepted=run.prefilter_accepted,
+        prefilter_rejected=run.prefilter_rejected,
+        model_scored=run.model_scored,
+    )
+
+
+@router.post("/cluster")
+async def cluster_matches(request: ClusterRequest):
+    """
+    Resolve scored matches between records into entity clusters.
+
+    Use it to cluster matches found elsewhere, e.g. the results of a job.
+
+    Args:
+        request: Matches between record IDs and the clustering configuration
+
+    Returns:
+        StreamingResponse: application/x-ndjson stream, one EntityCluster per line
+    """
+    try:
+        clusters = await get_inference_executor().run(
+            lambda: list(cluster_match_edges(request.edges, request.clustering))
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    return StreamingResponse(
+        (cluster.model_dump_json() + "\n" for cluster in clusters),
+        media_type="application/x-ndjson",
+    )
+
+
+@router.get("/metrics")
+async def get_matching_metrics():
+    """
+    Get inference performance metrics.
+
+    Returns:
+        dict: Micro-batching, inference executor and embedding cache counters
+    """
+    model = get_model()
+    return {
+        "micro_batching": get_micro_batcher().stats(),
+        "inference_executor": get_inference_executor().stats(),
+        "embedding_cache": model.embedding_cache.stats() if model.embedding_cache else None,
+    }
+
+
+@router.post(
+    "/jobs",
+    response_model=MatchJob,
+    status_code=202,
+    dependencies=[Depends(require_model)],
+)
+async def create_match_job(request: BatchMatchRequest):
+    """
+    Start a batch matching job in the background.
+
+    Jobs do not cluster their matches: a request with clustering is rejected,
+    and the job results can be clustered with POST /match/cluster.
+
+    Args:
+        request: Batch matching request with two datasets
+
+    Returns:
+        MatchJob: The queued job
+    """
+    try:
+        return get_job_manager().submit(request)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/jobs/{job_id}", response_model=MatchJob)
+async def get_match_job(job_id: str):
+    """
+    Get the status and progress of a batch matching job.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        MatchJob: Job status, pairs scored and throughput
+    """
+    try:
+        return get_job_manager().get(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+
+@router.get("/jobs/{job_id}/results")
+async def get_match_job_results(job_id: str):
+    """
+    Stream the matches found so far by a batch matching job.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        StreamingResponse: application/x-ndjson stream, one MatchResult per line
+    """
+    try:
+        lines = get_job_manager().iter_results(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+@router.delete("/jobs/{job_id}", response_model=MatchJob)
+async def cancel_match_job(job_id: str):
+    """
+    Cancel a batch matching job. Running jobs stop after their current chunk.
+
+    Args:
+        job_id: Job identifier
+
+    Returns:
+        MatchJob: Job state after the cancellation request
+    """
+    try:
+        return get_job_manager().cancel(job_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+
+@router.put("/corpora/{name}", response_model=LinkageCorpusInfo, status_code=201)
+async def create_linkage_corpus(name: str, config: Optional[LinkageCorpusConfig] = None):
+    """
+    Create an empty corpus for incremental linkage.
+
+    Args:
+        name: Name of the corpus
+        config: Threshold, blocking, scoring mode and top_k of the corpus
+
+    Returns:
+        LinkageCorpusInfo: The new corpus
+    """
+    try:
+        return get_corpus_registry().create(name, config).info(name)
+    except FileExistsError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _corpus_info(name: str) -> LinkageCorpusInfo:
+    return get_corpus_registry().get(name).info(name)
+
+
+@router.get("/corpora/{name}", response_model=LinkageCorpusInfo)
+async def get_linkage_corpus(name: str):
+    """
+    Get the record and link counts of a corpus.
+
+    Args:
+        name: Name of the corpus
+
+    Returns:
+        LinkageCorpusInfo: Corpus summary
+    """
+    try:
+        # Opening a corpus replays its logs and may build its index
+        return await get_inference_executor().run(_corpus_info, name)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def _apply_corpus_delta(name: str, delta: LinkageDelta) -> LinkageDeltaResult:
+    return get_corpus_registry().get(name).apply_delta(delta)
+
+
+@router.post(
+    "/corpora/{name}/delta",
+    response_model=LinkageDeltaResult,
+    dependencies=[Depends(require_model)],
+)
+async def apply_linkage_delta(name: str, delta: LinkageDelta):
+    """
+    Upsert and delete records of a corpus and re-link only the changed records.
+
+    Args:
+        name: Name of the corpus
+        delta: Records to upsert and IDs to delete
+
+    Returns:
+        LinkageDeltaResult: Counts and the links that were added, updated or removed
+    """
+    try:
+        return await get_inference_executor().run(_apply_corpus_delta, name, delta)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+def _corpus_links(name: str, record_id: str) -> Dict[str, float]:
+    return get_corpus_registry().get(name).links_of(record_id)
+
+
+@router.get("/corpora/{name}/records/{record_id}/links")
+async def get_record_links(name: str, record_id: str):
+    """
+    Get the current links of a corpus record.
+
+    Args:
+        name: Name of the corpus
+        record_id: Record ID
+
+    Returns:
+        dict: Linked record IDs with their similarity, best first
+    """
+    try:
+        links = await get_inference_executor().run(_corpus_links, name, record_id)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Record '{record_id}' not in corpus '{name}'")
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    return {
+        "record_id": record_id,
+        "links": [
+            {"id": other, "similarity": similarity}
+            for other, similarity in sorted(links.items(), key=lambda link: -link[1])
+        ],
+    }
+
+
+@router.get(
+    "/threshold/optimize",
+    response_model=ThresholdOptimizationResult,
+    responses={202: {"description": "Optimization running in the background"}},
+    dependencies=[Depends(require_model)],
+)
+async def optimize_threshold(
+    dataset_name: str, false_positive_cost: float = 1.0, false_negative_cost: float = 1.0
+):
+    """
+    Find the optimal threshold for a labeled dataset from its ROC and PR curves.
+
+    Every pair is scored once and every threshold is evaluated in one pass.
+    Large datasets are optimized in the background: the endpoint answers 202
+    until the result is ready, then returns it.
 
     Args:
         dataset_name: Name of the labeled dataset
+        false_positive_cost: Cost of predicting a non-matching pair as a match
+        false_negative_cost: Cost of missing a matching pair
 
     Returns:
-        dict: Optimal threshold and metrics
+        ThresholdOptimizationResult: Best-F1 and minimum-cost thresholds and the curves
     """
-    # TODO: Implement threshold optimization
-    raise HTTPException(status_code=501, detail="Threshold optimization not yet implemented")
+    if false_positive_cost < 0 or false_negative_cost < 0:
+        raise HTTPException(status_code=400, detail="Costs must not be negative")
+
+    try:
+        result = await get_threshold_optimizer().get(
+            dataset_name, false_positive_cost, false_negative_cost
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InferenceOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Threshold optimization failed: {str(e)}")
+
+    if result is None:
+        return JSONResponse(
+            status_code=202,
+            content={"status": "running", "dataset_name": dataset_name},
+            headers={"Retry-After": "5"},
+        )
+    return result
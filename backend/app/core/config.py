@@ -1,6 +1,6 @@
 """Application configuration."""
 
-from typing import List
+from typing import List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -29,14 +29,74 @@ class Settings(BaseSettings):
     DATA_DIR: str = "./data"
     RAW_DATA_DIR: str = "./data/raw"
     PROCESSED_DATA_DIR: str = "./data/processed"
+    DATASET_CATALOG_PATH: str = "./data/processed/dataset_catalog.json"
+    DATASET_CATALOG_SAMPLES: int = 5  # Sample rows stored per dataset
+    DATASET_EMBEDDING_DTYPE: str = "float16"  # float16 or float32 precomputed embeddings
+    MAX_UPLOAD_SIZE_MB: int = 100
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Bytes read per upload chunk
 
     # ML Settings
     MAX_SEQ_LENGTH: int = 128
     BATCH_SIZE: int = 32
     DEVICE: str = "cpu"  # Will auto-detect CUDA if available
+    MODEL_BACKEND: str = "torch"  # torch, torch-int8, onnx, or onnx-int8
+    ONNX_QUANTIZATION_CONFIG: str = "avx2"  # arm64, avx2, avx512 or avx512_vnni
+    BATCH_SCORING_MODE: str = "record"  # record (encode each record once), pair, or ann
+    SIMILARITY_CHUNK_SIZE: int = 1024
+    BATCH_CHUNK_SIZE: int = 256  # dataset_a records scored per batch matching chunk
+    JOB_WORKERS: int = 2  # Background batch matching jobs run concurrently
+
+    # Inference Executor Settings
+    INFERENCE_WORKERS: Optional[int] = None  # Defaults to CPU count / torch threads
+    INFERENCE_MAX_PENDING: int = 64  # Calls beyond this are rejected with 503
+    TORCH_NUM_THREADS: Optional[int] = None  # torch intra-op threads per inference call
+
+    # Model Lifecycle Settings
+    MODEL_PRELOAD: bool = True  # Load and warm up the model at startup
+    MODEL_WARMUP_SEQ_LENGTHS: List[int] = [16, 64, 128]  # Tokens per dummy warm-up batch
+    MODEL_READY_TIMEOUT: float = 30.0  # Seconds a request waits for the model before 503
+    MODEL_RETRY_BACKOFF: float = 30.0  # Seconds after a failed load before a request retries it
+
+    # Micro-batching Settings (/match/predict)
+    MICRO_BATCHING_ENABLED: bool = True
+    MICRO_BATCH_MAX_SIZE: int = 32
+    MICRO_BATCH_MAX_WAIT_MS: float = 5.0
+
+    # Embedding Cache Settings
+    EMBEDDING_CACHE_SIZE: int = 10000  # In-memory entries, 0 disables the memory tier
+    EMBEDDING_CACHE_DIR: Optional[str] = None  # On-disk tier, disabled if unset
+
+    # Blocking Settings
+    BLOCKING_METHOD: str = "token"  # full, standard, sorted_neighbourhood, qgram, token
+    BLOCKING_WINDOW_SIZE: int = 5
+    BLOCKING_QGRAM_SIZE: int = 3
+    BLOCKING_MAX_BLOCK_SIZE: int = 1000
+
+    # Pre-filter Cascade Settings (blocked record/pair scoring and /match/predict)
+    PREFILTER_ENABLED: bool = False
+    PREFILTER_ACCEPT_THRESHOLD: float = 0.95  # classical score resolving a pair as a match
+    PREFILTER_REJECT_THRESHOLD: float = 0.2  # classical score resolving a pair as a non-match
+    PREFILTER_MIN_FIELDS: int = 2  # pairs with fewer comparable fields go to the model
+
+    # Approximate Nearest-Neighbour Index Settings
+    ANN_TOP_K: int = 10
+    ANN_N_PROBE: int = 8
+    ANN_TRAIN_POINTS_PER_LIST: int = 64
+
+    # Threshold Optimization Settings
+    THRESHOLD_SYNC_MAX_PAIRS: int = 10000  # larger labeled datasets are optimized in the background
+    THRESHOLD_CURVE_POINTS: int = 200
+
+    # Clustering Settings
+    CLUSTERING_METHOD: str = "connected_components"  # connected_components, center, correlation
 
     # Explainability Settings
     SHAP_MAX_SAMPLES: int = 100
+    TOKEN_ATTRIBUTION_BATCH_SIZE: int = 32  # occluded texts encoded per step
+    TOKEN_ATTRIBUTION_MAX_TOKENS: int = 256  # per request
+    TOKEN_ATTRIBUTION_TIME_BUDGET: float = 2.0  # seconds per request
+    EXPLANATION_STORE_MAX_PAIRS: int = 100000  # batch matches whose explanation can be requested
+    EXPLANATION_PRECOMPUTE_TOP_N: int = 10  # most uncertain matches explained ahead, per run
 
     class Config:
         """Pydantic config."""
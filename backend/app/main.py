@@ -1,14 +1,32 @@
 """Main FastAPI application."""
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
 from app.core.config import settings
 from app.api.endpoints import health, datasets, matching
+from app.ml.executor import get_inference_executor
+from app.ml.jobs import get_job_manager
+from app.ml.lifecycle import get_model_lifecycle
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Preload the model and resume interrupted jobs on startup; stop workers on shutdown."""
+    if settings.MODEL_PRELOAD:
+        get_model_lifecycle().start()
+    get_job_manager().resume_interrupted()
+    yield
+    get_job_manager().shutdown()
+    get_inference_executor().shutdown()
+
 
 # Create FastAPI app
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
     description=settings.DESCRIPTION,
@@ -0,0 +1,349 @@
+"""Approximate nearest-neighbour index over record embeddings.
+
+The index is an IVF (inverted file) structure: embeddings are partitioned
+by a spherical k-means coarse quantizer and a query only scans the
+``n_probe`` partitions whose centroids are closest to it. It has no
+dependency beyond NumPy and persists to a single ``.npz`` file.
+"""
+
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import RecordBase
+from app.ml.model import EntityMatchingModel, get_model
+from app.ml.preprocessing import serialize_record, serialize_records
+
+# Neighbours are (record id, cosine similarity)
+Neighbour = Tuple[str, float]
+
+# An index with ~sqrt(n) lists is retrained once sqrt(n) exceeds this many times its lists
+_RETRAIN_GROWTH = 2
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """L2-normalize rows so inner products are cosine similarities."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _spherical_kmeans(
+    vectors: np.ndarray, n_clusters: int, n_iter: int = 10, seed: int = 0
+) -> np.ndarray:
+    """
+    Cluster normalized vectors by cosine similarity.
+
+    Args:
+        vectors: Normalized vectors of shape (n, dim)
+        n_clusters: Number of centroids
+        n_iter: Number of Lloyd iterations
+        seed: Random seed for centroid initialization
+
+    Returns:
+        np.ndarray: Normalized centroids of shape (n_clusters, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iter):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignments == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+            else:
+                # Re-seed empty clusters with a random vector
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+
+    return centroids
+
+
+class RecordIndex:
+    """IVF approximate nearest-neighbour index keyed by record id."""
+
+    def __init__(self, n_lists: Optional[int] = None, n_probe: Optional[int] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            n_lists: Number of inverted lists (defaults to ~sqrt of the corpus size,
+                retrained as the corpus grows)
+            n_probe: Number of lists scanned per query
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe or settings.ANN_N_PROBE
+        self._auto_lists = n_lists is None
+
+        self._centroids: Optional[np.ndarray] = None
+        # Vectors and assignments are over-allocated; rows past _size are unused
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._ids: List[Optional[str]] = []
+        self._assignments = np.zeros(0, dtype=np.int64)
+        self._lists: List[List[int]] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._positions
+
+    @property
+    def is_trained(self) -> bool:
+        """Whether the coarse quantizer has been trained."""
+        return self._centroids is not None
+
+    def build(self, ids: Sequence[str], embeddings: np.ndarray):
+        """
+        Train the coarse quantizer and index a corpus, replacing any existing content.
+
+        Args:
+            ids: Record ids, aligned with embeddings
+            embeddings: Embeddings of shape (n, dim)
+        """
+        vectors = _normalize(embeddings)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and embeddings must have the same length")
+        if len(vectors) == 0:
+            raise ValueError("Cannot build an index from an empty corpus")
+
+        n_lists = max(1, int(np.sqrt(len(vectors)))) if self._auto_lists else self.n_lists
+        n_lists = min(n_lists, len(vectors))
+
+        # Train on a bounded sample: centroid quality saturates quickly
+        rng = np.random.default_rng(0)
+        sample_size = min(len(vectors), n_lists * settings.ANN_TRAIN_POINTS_PER_LIST)
+        sample = vectors[rng.choice(len(vectors), size=sample_size, replace=False)]
+
+        self.n_lists = n_lists
+        self._centroids = _spherical_kmeans(sample, n_lists)
+        self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._assignments = np.zeros(0, dtype=np.int64)
+        self._lists = [[] for _ in range(n_lists)]
+        self._positions = {}
+
+        self.add(ids, vectors)
+
+    def add(self, ids: Sequence[str], embeddings: np.ndarray):
+        """
+        Add records to the index; records with an existing id are replaced.
+
+        An index whose number of lists was chosen automatically is retrained
+        once the corpus has outgrown it, so lists stay ~sqrt of the corpus size.
+
+        Args:
+            ids: Record ids, aligned with embeddings
+            embeddings: Embeddings of shape (n, dim)
+        """
+        if not self.is_trained:
+            self.build(ids, embeddings)
+            return
+
+        vectors = _normalize(embeddings)
+        if len(ids) != len(vectors):
+            raise ValueError("ids and embeddings must have the same length")
+
+        self.remove([record_id for record_id in ids if record_id in self._positions])
+
+        assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+        start = self._size
+        self._reserve(start + len(vectors))
+
+        self._vectors[start : start + len(vectors)] = vectors
+        self._assignments[start : start + len(vectors)] = assignments
+        self._size += len(vectors)
+        self._ids.extend(ids)
+
+        for offset, (record_id, cluster) in enumerate(zip(ids, assignments)):
+            self._positions[record_id] = start + offset
+            self._lists[cluster].append(start + offset)
+
+        if self._auto_lists and len(self) > (_RETRAIN_GROWTH * self.n_lists) ** 2:
+            self._retrain()
+
+    def _reserve(self, size: int):
+        """Grow the vector and assignment buffers geometrically to hold size rows."""
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+
+        vectors = np.zeros((capacity, self._vectors.shape[1]), dtype=np.float32)
+        vectors[: self._size] = self._vectors[: self._size]
+        assignments = np.zeros(capacity, dtype=np.int64)
+        assignments[: self._size] = self._assignments[: self._size]
+        self._vectors, self._assignments = vectors, assignments
+
+    def _retrain(self):
+        """Retrain the coarse quantizer on the records currently in the index."""
+        alive = np.fromiter(self._positions.values(), dtype=np.int64)
+        alive.sort()
+        self.build([self._ids[i] for i in alive], self._vectors[alive])
+
+    def remove(self, ids: Sequence[str]):
+        """
+        Remove records from the index. Unknown ids are ignored.
+
+        Args:
+            ids: Record ids to remove
+        """
+        for record_id in ids:
+            position = self._positions.pop(record_id, None)
+            if position is None:
+                continue
+            self._lists[self._assignments[position]].remove(position)
+            self._ids[position] = None
+
+    def get_vector(self, record_id: str) -> np.ndarray:
+        """Get the stored (normalized) embedding of a record."""
+        return self._vectors[self._positions[record_id]]
+
+    def search(self, embeddings: np.ndarray, k: int) -> List[List[Neighbour]]:
+        """
+        Find the approximate k nearest neighbours of each query embedding.
+
+        Args:
+            embeddings: Query embeddings of shape (q, dim)
+            k: Number of neighbours per query
+
+        Returns:
+            For each query, up to k (record id, similarity) sorted by similarity
+        """
+        if not self.is_trained or len(self) == 0:
+            return [[] for _ in range(len(np.atleast_2d(embeddings)))]
+
+        queries = _normalize(embeddings)
+        n_probe = min(self.n_probe, self.n_lists)
+        probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :n_probe]
+
+        results = []
+        for query, lists in zip(queries, probes):
+            candidates = [position for cluster in lists for position in self._lists[cluster]]
+            if not candidates:
+                results.append([])
+                continue
+
+            candidates = np.asarray(candidates, dtype=np.int64)
+            scores = self._vectors[candidates] @ query
+
+            top = min(k, len(candidates))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+
+            results.append(
+                [(self._ids[candidates[i]], float(np.clip(scores[i], 0.0, 1.0))) for i in best]
+            )
+
+        return results
+
+    def query(
+        self, record: RecordBase, k: int, model: Optional[EntityMatchingModel] = None
+    ) -> List[Neighbour]:
+        """
+        Find the approximate k nearest neighbours of a record.
+
+        Args:
+            record: Record to look up
+            k: Number of neighbours
+            model: Model used to encode the record (global model if None)
+
+        Returns:
+            Up to k (record id, similarity) sorted by similarity
+        """
+        model = model or get_model()
+        embedding = model.encode([serialize_record(record)]).cpu().numpy()
+        return self.search(embedding, k)[0]
+
+    def save(self, path: str):
+        """
+        Save the index to disk.
+
+        Args:
+            path: Path of the ``.npz`` file to write
+        """
+        if not self.is_trained:
+            raise ValueError("No index built to save")
+
+        # Compact away removed records before writing
+        alive = np.fromiter(self._positions.values(), dtype=np.int64)
+        alive.sort()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(
+            path,
+            centroids=self._centroids,
+            vectors=self._vectors[alive],
+            # Fixed-width unicode, so loading never needs to unpickle
+            ids=np.asarray([self._ids[i] for i in alive], dtype=np.str_),
+            assignments=self._assignments[alive],
+            n_probe=np.asarray(self.n_probe),
+            auto_lists=np.asarray(self._auto_lists),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "RecordIndex":
+        """
+        Load an index from disk.
+
+        Args:
+            path: Path of a ``.npz`` file written by save()
+
+        Returns:
+            RecordIndex: Loaded index
+        """
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Index not found at: {path}")
+
+        data = np.load(path, allow_pickle=False)
+
+        index = cls(n_lists=len(data["centroids"]), n_probe=int(data["n_probe"]))
+        # Indexes saved before lists were retrained keep their number of lists
+        index._auto_lists = bool(data["auto_lists"]) if "auto_lists" in data else False
+        index._centroids = data["centroids"]
+        index._vectors = data["vectors"]
+        index._size = len(index._vectors)
+        index._ids = data["ids"].tolist()
+        index._assignments = data["assignments"]
+        index._lists = [[] for _ in range(index.n_lists)]
+        for position, (record_id, cluster) in enumerate(zip(index._ids, index._assignments)):
+            index._positions[record_id] = position
+            index._lists[cluster].append(position)
+
+        return index
+
+
+def build_record_index(
+    records: Sequence[RecordBase],
+    model: EntityMatchingModel,
+    n_lists: Optional[int] = None,
+    n_probe: Optional[int] = None,
+) -> RecordIndex:
+    """
+    Encode records and build an index over them.
+
+    Records without an id are keyed by their position in records.
+
+    Args:
+        records: Records to index
+        model: Model used to encode the records
+        n_lists: Number of inverted lists
+        n_probe: Number of lists scanned per query
+
+    Returns:
+        RecordIndex: Index over the records
+    """
+    ids = [record.id if record.id is not None else str(i) for i, record in enumerate(records)]
+    embeddings = model.encode_unique(serialize_records(records))
+
+    index = RecordIndex(n_lists=n_lists, n_probe=n_probe)
+    index.build(ids, embeddings.cpu().numpy())
+    return index
@@ -0,0 +1,137 @@
+"""Inference backends for the sentence transformer.
+
+- ``torch``: the PyTorch model as published
+- ``torch-int8``: PyTorch with dynamic INT8 quantization of Linear layers (CPU only)
+- ``onnx``: ONNX export run under onnxruntime
+- ``onnx-int8``: dynamically INT8-quantized ONNX export run under onnxruntime
+
+The ONNX backends need ``sentence-transformers[onnx]`` (optimum and
+onnxruntime). Quantized ONNX exports are written once under
+``MODEL_PATH/onnx`` and reused.
+
+torch and sentence-transformers are imported when a model is loaded, not
+when this module is, so the API process starts without them.
+"""
+
+import glob
+import hashlib
+import os
+import time
+from typing import TYPE_CHECKING, List
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+
+
+def load_sentence_transformer(
+    model_name_or_path: str, device: str, backend: str, fingerprint: str = None
+) -> "SentenceTransformer":
+    """
+    Load a sentence transformer for the given inference backend.
+
+    Args:
+        model_name_or_path: Hub model name or local model directory
+        device: Device to run on (cpu/cuda)
+        backend: One of BACKENDS
+        fingerprint: Identifier of the weights, used to name quantized exports
+
+    Returns:
+        SentenceTransformer: Model ready for encoding
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name_or_path, device=device)
+
+    if backend == "torch-int8":
+        # Dynamic quantization kernels only exist for CPU
+        model = SentenceTransformer(model_name_or_path, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    if backend == "onnx":
+        return SentenceTransformer(model_name_or_path, device=device, backend="onnx")
+
+    if backend == "onnx-int8":
+        return _load_quantized_onnx(model_name_or_path, device, fingerprint or model_name_or_path)
+
+    raise ValueError(f"Unknown model backend: {backend}. Choose from: {', '.join(BACKENDS)}")
+
+
+def _load_quantized_onnx(model_name_or_path: str, device: str, fingerprint: str):
+    """Export (once) and load a dynamically INT8-quantized ONNX model."""
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+    config = settings.ONNX_QUANTIZATION_CONFIG
+
+    name = os.path.basename(model_name_or_path.rstrip("/\\"))
+    digest = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:12]
+    export_dir = os.path.join(settings.MODEL_PATH, "onnx", f"{name}-{digest}")
+
+    # The file is named after the weight type of the config, e.g. model_qint8_arm64.onnx
+    exported = glob.glob(os.path.join(export_dir, "onnx", f"model_*int8_{config}.onnx"))
+    if not exported:
+        model = SentenceTransformer(model_name_or_path, device="cpu", backend="onnx")
+        model.save(export_dir)
+        export_dynamic_quantized_onnx_model(model, config, export_dir)
+        exported = glob.glob(os.path.join(export_dir, "onnx", f"model_*int8_{config}.onnx"))
+
+    file_name = f"onnx/{os.path.basename(exported[0])}"
+    return SentenceTransformer(
+        export_dir, device=device, backend="onnx", model_kwargs={"file_name": file_name}
+    )
+
+
+def embedding_parity(reference, candidate, texts: List[str]) -> dict:
+    """
+    Compare the embeddings of two models on the same texts.
+
+    Args:
+        reference: EntityMatchingModel used as ground truth (usually torch)
+        candidate: EntityMatchingModel under test
+        texts: Texts to encode
+
+    Returns:
+        dict: Maximum and mean cosine deviation (1 - cosine similarity)
+    """
+    import torch
+
+    embeddings_ref = reference.encode_uncached(texts).float().cpu()
+    embeddings_cand = candidate.encode_uncached(texts).float().cpu()
+    deviations = 1 - torch.cosine_similarity(embeddings_ref, embeddings_cand)
+    return {
+        "max_cosine_deviation": deviations.max().item(),
+        "mean_cosine_deviation": deviations.mean().item(),
+    }
+
+
+def measure_throughput(model, texts: List[str], batch_size: int = None, repeats: int = 3) -> float:
+    """
+    Measure encoding throughput, bypassing the embedding cache.
+
+    Args:
+        model: EntityMatchingModel to measure
+        texts: Texts to encode
+        batch_size: Batch size for encoding
+        repeats: Timed runs; the best one is reported
+
+    Returns:
+        float: Sentences per second
+    """
+    model.encode_uncached(texts[: batch_size or settings.BATCH_SIZE], batch_size)  # warm-up
+
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.encode_uncached(texts, batch_size)
+        best = min(best, time.perf_counter() - start)
+
+    return len(texts) / best if best > 0 else 0.0
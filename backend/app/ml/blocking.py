@@ -0,0 +1,286 @@
+"""Blocking (candidate pair generation) for batch entity matching.
+
+Blocking narrows the ``dataset_a x dataset_b`` cartesian product down to the
+pairs that share some cheap-to-compute key, so the transformer only has to
+score plausible candidates.
+"""
+
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from app.core.config import settings
+from app.models.schemas import BlockingConfig, RecordBase
+from app.ml.preprocessing import normalize_text
+from app.utils.record_store import RecordView
+
+# Candidate pairs are (index in dataset_a, index in dataset_b)
+CandidatePair = Tuple[int, int]
+
+_NULL_VALUES = {"nan", "none", "null", ""}
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def field_value(record: RecordBase, field: str) -> str:
+    """Get the normalized value of a field, or an empty string if missing."""
+    if isinstance(record, RecordView):
+        # Record stores normalize whole columns at once
+        return record.normalized_value(field)
+
+    value = record.fields.get(field)
+    if value is None:
+        return ""
+
+    value = normalize_text(str(value))
+    if value in _NULL_VALUES:
+        return ""
+
+    return value
+
+
+class Blocker(ABC):
+    """Base class for blocking strategies."""
+
+    method = "base"
+
+    def __init__(self, fields: Optional[List[str]] = None, max_block_size: Optional[int] = None):
+        """
+        Initialize blocker.
+
+        Args:
+            fields: Fields used to build blocking keys (all fields if None)
+            max_block_size: Skip blocks with more records than this on either side
+        """
+        self.fields = fields
+        self.max_block_size = max_block_size or settings.BLOCKING_MAX_BLOCK_SIZE
+
+    def _fields_for(self, record: RecordBase) -> List[str]:
+        """Get the fields of a record that take part in blocking."""
+        if self.fields:
+            return self.fields
+        return sorted(record.fields.keys())
+
+    @abstractmethod
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """
+        Compute the blocking keys of a record.
+
+        Args:
+            record: Record to compute keys for
+
+        Returns:
+            Set of blocking keys
+        """
+
+    def _build_index(self, records: Sequence[RecordBase]) -> Dict[str, List[int]]:
+        """Build an inverted index from blocking key to record positions."""
+        index = defaultdict(list)
+        for position, record in enumerate(records):
+            for key in self.block_keys(record):
+                index[key].append(position)
+        return index
+
+    def candidate_pairs(
+        self, dataset_a: Sequence[RecordBase], dataset_b: Sequence[RecordBase]
+    ) -> List[CandidatePair]:
+        """
+        Generate candidate pairs between two datasets.
+
+        Args:
+            dataset_a: First dataset
+            dataset_b: Second dataset
+
+        Returns:
+            Sorted list of (index_a, index_b) candidate pairs
+        """
+        index_a = self._build_index(dataset_a)
+        index_b = self._build_index(dataset_b)
+
+        pairs: Set[CandidatePair] = set()
+        for key, positions_a in index_a.items():
+            positions_b = index_b.get(key)
+            if not positions_b:
+                continue
+            if len(positions_a) > self.max_block_size or len(positions_b) > self.max_block_size:
+                # Oversized blocks (e.g. stop-word tokens) carry no signal
+                continue
+            pairs.update(product(positions_a, positions_b))
+
+        return sorted(pairs)
+
+
+class FullBlocker(Blocker):
+    """No blocking: every record of dataset_a is compared with every record of dataset_b."""
+
+    method = "full"
+
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """All records share a single block."""
+        return {""}
+
+    def candidate_pairs(
+        self, dataset_a: Sequence[RecordBase], dataset_b: Sequence[RecordBase]
+    ) -> List[CandidatePair]:
+        """Generate the full cartesian product."""
+        return list(product(range(len(dataset_a)), range(len(dataset_b))))
+
+
+class StandardBlocker(Blocker):
+    """Standard key blocking: records match on the exact value of the blocking fields."""
+
+    method = "standard"
+
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """Concatenate the normalized blocking field values into a single key."""
+        values = [field_value(record, field) for field in self._fields_for(record)]
+        if not any(values):
+            return set()
+        return {"|".join(values)}
+
+
+class TokenBlocker(Blocker):
+    """Token blocking: records share a block for every common word in a blocking field."""
+
+    method = "token"
+
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """Emit one key per (field, token)."""
+        keys = set()
+        for field in self._fields_for(record):
+            for token in _TOKEN_PATTERN.findall(field_value(record, field)):
+                keys.add(f"{field}:{token}")
+        return keys
+
+
+class QGramBlocker(Blocker):
+    """Q-gram blocking: records share a block for every common character q-gram."""
+
+    method = "qgram"
+
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        q: Optional[int] = None,
+        max_block_size: Optional[int] = None,
+    ):
+        """
+        Initialize q-gram blocker.
+
+        Args:
+            fields: Fields used to build blocking keys (all fields if None)
+            q: Length of the character q-grams
+            max_block_size: Skip blocks with more records than this on either side
+        """
+        super().__init__(fields=fields, max_block_size=max_block_size)
+        self.q = q or settings.BLOCKING_QGRAM_SIZE
+
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """Emit one key per (field, q-gram)."""
+        keys = set()
+        for field in self._fields_for(record):
+            value = field_value(record, field)
+            if not value:
+                continue
+            if len(value) <= self.q:
+                keys.add(f"{field}:{value}")
+                continue
+            for start in range(len(value) - self.q + 1):
+                keys.add(f"{field}:{value[start:start + self.q]}")
+        return keys
+
+
+class SortedNeighbourhoodBlocker(Blocker):
+    """Sorted-neighbourhood blocking: records are compared within a sliding window
+    over both datasets sorted by a sorting key."""
+
+    method = "sorted_neighbourhood"
+
+    def __init__(
+        self,
+        fields: Optional[List[str]] = None,
+        window_size: Optional[int] = None,
+        max_block_size: Optional[int] = None,
+    ):
+        """
+        Initialize sorted-neighbourhood blocker.
+
+        Args:
+            fields: Fields used to build the sorting key (all fields if None)
+            window_size: Number of consecutive sorted records compared with each other
+            max_block_size: Not supported: the window already bounds the candidates of a record
+
+        Raises:
+            ValueError: If max_block_size is given
+        """
+        if max_block_size is not None:
+            raise ValueError(
+                "max_block_size does not apply to sorted_neighbourhood blocking; "
+                "use window_size to bound the candidates"
+            )
+        super().__init__(fields=fields)
+        self.window_size = window_size or settings.BLOCKING_WINDOW_SIZE
+
+    def block_keys(self, record: RecordBase) -> Set[str]:
+        """The sorting key of a record."""
+        return {" ".join(field_value(record, field) for field in self._fields_for(record))}
+
+    def candidate_pairs(
+        self, dataset_a: Sequence[RecordBase], dataset_b: Sequence[RecordBase]
+    ) -> List[CandidatePair]:
+        """Slide a window over the merged, sorted datasets."""
+        entries = [(next(iter(self.block_keys(r))), 0, i) for i, r in enumerate(dataset_a)]
+        entries += [(next(iter(self.block_keys(r))), 1, j) for j, r in enumerate(dataset_b)]
+        entries.sort()
+
+        pairs: Set[CandidatePair] = set()
+        for start, (_, side, position) in enumerate(entries):
+            for _, other_side, other_position in entries[start + 1 : start + self.window_size]:
+                if side == other_side:
+                    continue
+                if side == 0:
+                    pairs.add((position, other_position))
+                else:
+                    pairs.add((other_position, position))
+
+        return sorted(pairs)
+
+
+BLOCKERS = {
+    FullBlocker.method: FullBlocker,
+    StandardBlocker.method: StandardBlocker,
+    TokenBlocker.method: TokenBlocker,
+    QGramBlocker.method: QGramBlocker,
+    SortedNeighbourhoodBlocker.method: SortedNeighbourhoodBlocker,
+}
+
+
+def get_blocker(config: Optional[BlockingConfig] = None) -> Blocker:
+    """
+    Create a blocker from a blocking configuration.
+
+    Args:
+        config: Blocking configuration (settings defaults if None)
+
+    Returns:
+        Blocker: Configured blocker
+
+    Raises:
+        ValueError: If the blocking method is unknown or its options do not apply to it
+    """
+    config = config or BlockingConfig()
+    method = config.method or settings.BLOCKING_METHOD
+
+    if method not in BLOCKERS:
+        raise ValueError(
+            f"Unknown blocking method '{method}'. Available: {', '.join(sorted(BLOCKERS))}"
+        )
+
+    kwargs = {"fields": config.fields, "max_block_size": config.max_block_size}
+    if method == QGramBlocker.method:
+        kwargs["q"] = config.q
+    elif method == SortedNeighbourhoodBlocker.method:
+        kwargs["window_size"] = config.window_size
+
+    return BLOCKERS[method](**kwargs)
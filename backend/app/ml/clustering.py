@@ -0,0 +1,271 @@
+"""Entity clustering over pairwise matches.
+
+Batch matching links records two at a time; resolving entities needs the
+transitive closure of those links. Matches are the weighted edges of a
+graph over the records, and each method assigns every record a cluster:
+
+- connected_components: transitive closure, computed with
+  ``scipy.sparse.csgraph`` in O(V + E)
+- center: edges are visited by descending similarity; a record becomes a
+  center or joins the first center it is linked to, so a chain of weak links
+  cannot merge two strong clusters
+- correlation: pivot (KwikCluster) approximation of correlation clustering;
+  a random unclustered record takes all its unclustered neighbours
+"""
+
+from typing import Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import ClusteringConfig, ClusterMember, EntityCluster, MatchEdge
+from app.ml.similarity import ScoredPair
+
+CLUSTERING_METHODS = ("connected_components", "center", "correlation")
+
+
+def _clustering_method(config: ClusteringConfig) -> str:
+    """Get the clustering method of a configuration, checking that it exists."""
+    method = config.method or settings.CLUSTERING_METHOD
+    if method not in CLUSTERING_METHODS:
+        raise ValueError(
+            f"Unknown clustering method '{method}'. Available: {', '.join(CLUSTERING_METHODS)}"
+        )
+    return method
+
+
+def _adjacency(num_nodes: int, rows: np.ndarray, cols: np.ndarray):
+    """Build the symmetric CSR adjacency matrix of an edge list."""
+    from scipy.sparse import coo_matrix
+
+    graph = coo_matrix(
+        (np.ones(len(rows), dtype=np.int8), (rows, cols)), shape=(num_nodes, num_nodes)
+    ).tocsr()
+    return (graph + graph.T).tocsr()
+
+
+def _center_labels(num_nodes: int, rows: np.ndarray, cols: np.ndarray, scores: np.ndarray):
+    """Center clustering: greedy over edges by descending similarity."""
+    order = np.argsort(-scores, kind="stable")
+    center = [-1] * num_nodes
+    for u, v in zip(rows[order].tolist(), cols[order].tolist()):
+        center_u, center_v = center[u], center[v]
+        if center_u == -1 and center_v == -1:
+            center[u] = center[v] = u
+        elif center_u == -1 and center_v == v:
+            center[u] = v
+        elif center_v == -1 and center_u == u:
+            center[v] = u
+
+    labels = np.asarray(center, dtype=np.int64)
+    unassigned = labels == -1
+    labels[unassigned] = np.flatnonzero(unassigned)
+    return labels
+
+
+def _pivot_labels(num_nodes: int, rows: np.ndarray, cols: np.ndarray, seed: int):
+    """Pivot correlation clustering over the above-threshold edges."""
+    graph = _adjacency(num_nodes, rows, cols)
+    indptr, indices = graph.indptr, graph.indices
+
+    labels = np.arange(num_nodes, dtype=np.int64)
+    clustered = np.zeros(num_nodes, dtype=bool)
+
+    # Records without edges stay singletons; only linked records need a pivot pass
+    linked = np.flatnonzero(np.diff(indptr) > 0)
+    for pivot in np.random.default_rng(seed).permutation(linked).tolist():
+        if clustered[pivot]:
+            continue
+        neighbours = indices[indptr[pivot] : indptr[pivot + 1]]
+        neighbours = neighbours[~clustered[neighbours]]
+        labels[neighbours] = pivot
+        clustered[neighbours] = True
+        clustered[pivot] = True
+    return labels
+
+
+def cluster_edges(
+    num_nodes: int,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    scores: np.ndarray,
+    config: Optional[ClusteringConfig] = None,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Assign every node of a match graph to a cluster.
+
+    Args:
+        num_nodes: Number of nodes (records)
+        rows: First node of each edge
+        cols: Second node of each edge
+        scores: Similarity of each edge
+        config: Clustering configuration (settings defaults if None)
+        seed: Seed of the pivot order (correlation clustering)
+
+    Returns:
+        np.ndarray: Cluster label of each node, numbered in order of each
+        cluster's first node
+
+    Raises:
+        ValueError: If the clustering method is unknown
+    """
+    config = config or ClusteringConfig()
+    method = _clustering_method(config)
+
+    rows = np.asarray(rows, dtype=np.int64)
+    cols = np.asarray(cols, dtype=np.int64)
+    scores = np.asarray(scores, dtype=np.float32)
+    if config.threshold is not None:
+        keep = scores >= config.threshold
+        rows, cols, scores = rows[keep], cols[keep], scores[keep]
+
+    if method == "connected_components":
+        from scipy.sparse.csgraph import connected_components
+
+        _, labels = connected_components(_adjacency(num_nodes, rows, cols), directed=False)
+    elif method == "center":
+        labels = _center_labels(num_nodes, rows, cols, scores)
+    else:
+        labels = _pivot_labels(num_nodes, rows, cols, seed)
+
+    # Renumber clusters by their first node so labels do not depend on the method
+    _, first_nodes, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    ranks = np.empty(len(first_nodes), dtype=np.int64)
+    ranks[np.argsort(first_nodes)] = np.arange(len(first_nodes))
+    return ranks[inverse]
+
+
+def group_clusters(labels: np.ndarray, include_singletons: bool = False) -> Iterator[np.ndarray]:
+    """
+    Group nodes by cluster label.
+
+    Args:
+        labels: Cluster label of each node, as returned by cluster_edges
+        include_singletons: Also yield clusters of a single node
+
+    Yields:
+        np.ndarray: Nodes of each cluster, in label order
+    """
+    if len(labels) == 0:
+        return
+    order = np.argsort(labels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    for nodes in np.split(order, boundaries):
+        if len(nodes) > 1 or include_singletons:
+            yield nodes
+
+
+class MatchGraph:
+    """
+    Collects the matches of a batch run as the edges of a record graph.
+
+    Nodes are the rows of dataset_a followed by the rows of dataset_b.
+    """
+
+    def __init__(
+        self,
+        ids_a: Sequence[Optional[str]],
+        ids_b: Sequence[Optional[str]],
+        config: Optional[ClusteringConfig] = None,
+    ):
+        """
+        Initialize an empty graph.
+
+        Args:
+            ids_a: Record IDs of dataset_a (None for records without one)
+            ids_b: Record IDs of dataset_b
+            config: Clustering configuration (settings defaults if None)
+
+        Raises:
+            ValueError: If the clustering method is unknown
+        """
+        self.ids_a = ids_a
+        self.ids_b = ids_b
+        self.config = config or ClusteringConfig()
+        _clustering_method(self.config)
+        self._rows: List[np.ndarray] = []
+        self._cols: List[np.ndarray] = []
+        self._scores: List[np.ndarray] = []
+
+    def add(self, scored_pairs: List[ScoredPair]):
+        """
+        Add the matches of one chunk.
+
+        Args:
+            scored_pairs: (row in dataset_a, row in dataset_b, similarity) triples
+        """
+        if not scored_pairs:
+            return
+        rows, cols, scores = zip(*scored_pairs)
+        self._rows.append(np.asarray(rows, dtype=np.int64))
+        self._cols.append(np.asarray(cols, dtype=np.int64) + len(self.ids_a))
+        self._scores.append(np.asarray(scores, dtype=np.float32))
+
+    def clusters(self) -> Iterator[EntityCluster]:
+        """
+        Cluster the collected matches.
+
+        Yields:
+            EntityCluster: Each cluster with its members from both datasets
+        """
+        labels = cluster_edges(
+            len(self.ids_a) + len(self.ids_b),
+            np.concatenate(self._rows or [np.zeros(0, dtype=np.int64)]),
+            np.concatenate(self._cols or [np.zeros(0, dtype=np.int64)]),
+            np.concatenate(self._scores or [np.zeros(0, dtype=np.float32)]),
+            self.config,
+        )
+
+        num_a = len(self.ids_a)
+        for nodes in group_clusters(labels, self.config.include_singletons):
+            members = [
+                (
+                    ClusterMember(id=self.ids_a[node], dataset="a", index=node)
+                    if node < num_a
+                    else ClusterMember(id=self.ids_b[node - num_a], dataset="b", index=node - num_a)
+                )
+                for node in nodes.tolist()
+            ]
+            yield EntityCluster(
+                cluster_id=int(labels[nodes[0]]), size=len(members), members=members
+            )
+
+
+def cluster_match_edges(
+    edges: List[MatchEdge], config: Optional[ClusteringConfig] = None
+) -> Iterator[EntityCluster]:
+    """
+    Cluster matches between records identified by ID.
+
+    Args:
+        edges: Scored matches
+        config: Clustering configuration (settings defaults if None)
+
+    Yields:
+        EntityCluster: Each cluster of record IDs
+
+    Raises:
+        ValueError: If the clustering method is unknown
+    """
+    config = config or ClusteringConfig()
+    ids, nodes = np.unique(
+        np.asarray(
+            [edge.id_a for edge in edges] + [edge.id_b for edge in edges], dtype=object
+        ).astype(str),
+        return_inverse=True,
+    )
+    labels = cluster_edges(
+        len(ids),
+        nodes[: len(edges)],
+        nodes[len(edges) :],
+        np.asarray([edge.similarity for edge in edges], dtype=np.float32),
+        config,
+    )
+
+    for cluster in group_clusters(labels, config.include_singletons):
+        yield EntityCluster(
+            cluster_id=int(labels[cluster[0]]),
+            size=len(cluster),
+            members=[ClusterMember(id=str(ids[node])) for node in cluster.tolist()],
+        )
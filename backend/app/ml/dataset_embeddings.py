@@ -0,0 +1,240 @@
+"""Precomputed embeddings of stored datasets.
+
+Batch runs against the same reference dataset used to encode it from
+scratch every time. A dataset's embeddings can instead be computed once and
+stored under ``PROCESSED_DATA_DIR/embeddings`` as:
+
+- ``embeddings.npy``: L2-normalized matrix, one row per record
+- ``ids.npy``: record IDs, aligned with the rows
+- ``meta.json``: model fingerprint, dataset content hash, dtype and shape
+
+Both arrays are loaded with ``np.load(mmap_mode="r")``, so loading is
+instant and processes sharing the files share one copy in the page cache.
+The directory name includes the dataset's content hash and the model
+fingerprint, so a changed file or model never picks up stale embeddings.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.model import EntityMatchingModel, get_model
+from app.ml.preprocessing import serialize_records
+from app.ml.similarity import normalize_embeddings
+from app.utils.data_loader import load_records_from_csv, resolve_dataset_file
+from app.utils.dataset_catalog import get_dataset_catalog
+from app.utils.record_store import RecordStore
+
+if TYPE_CHECKING:
+    import torch
+
+logger = logging.getLogger(__name__)
+
+DTYPES = ("float16", "float32")
+
+
+class DatasetEmbeddings:
+    """Memory-mapped embeddings of a stored dataset."""
+
+    def __init__(self, directory: str):
+        """
+        Open precomputed embeddings.
+
+        Args:
+            directory: Directory written by precompute_dataset_embeddings
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.matrix = np.load(os.path.join(directory, "embeddings.npy"), mmap_mode="r")
+        self.ids = np.load(os.path.join(directory, "ids.npy"), mmap_mode="r")
+        self._rows: Optional[Dict[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.matrix)
+
+    def row(self, record_id: str) -> Optional[int]:
+        """
+        Get the row of a record ID.
+
+        Args:
+            record_id: Record ID
+
+        Returns:
+            Row of the record in the matrix, or None if unknown
+        """
+        if self._rows is None:
+            self._rows = {str(record_id): row for row, record_id in enumerate(self.ids)}
+        return self._rows.get(record_id)
+
+    def rows(self, rows: Optional[List[int]] = None) -> "torch.Tensor":
+        """
+        Read rows of the matrix as a float32 tensor.
+
+        Args:
+            rows: Rows to read (all rows if None)
+
+        Returns:
+            torch.Tensor: Normalized embeddings of shape (len(rows), dim)
+        """
+        import torch
+
+        vectors = self.matrix if rows is None else self.matrix[rows]
+        return torch.from_numpy(np.array(vectors, dtype=np.float32))
+
+
+def embeddings_directory(file_name: str, content_hash: str, fingerprint: str) -> str:
+    """
+    Get the directory of a dataset's embeddings for a model.
+
+    Args:
+        file_name: Name of the dataset CSV file
+        content_hash: SHA-256 of the dataset file's content
+        fingerprint: Fingerprint of the model weights
+
+    Returns:
+        str: Path under PROCESSED_DATA_DIR/embeddings
+    """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    model_hash = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:12]
+    return os.path.join(
+        settings.PROCESSED_DATA_DIR, "embeddings", f"{stem}-{content_hash[:16]}-{model_hash}"
+    )
+
+
+def _dataset_entry(dataset_name: str):
+    """Resolve a dataset name to its file name and catalog entry."""
+    file_name = resolve_dataset_file(dataset_name)
+    entry = get_dataset_catalog().get(file_name)
+    if entry is None:
+        raise FileNotFoundError(f"Dataset file not found: {file_name}")
+    return file_name, entry
+
+
+def precompute_dataset_embeddings(
+    dataset_name: str,
+    model: Optional[EntityMatchingModel] = None,
+    dtype: Optional[str] = None,
+    chunk_size: int = 4096,
+) -> DatasetEmbeddings:
+    """
+    Encode every record of a stored dataset and persist the embeddings.
+
+    Rows are encoded in chunks and written straight into the memory-mapped
+    output, so the full float32 matrix is never held in memory.
+
+    Args:
+        dataset_name: Name of the dataset (built-in or uploaded)
+        model: Entity matching model (global model if None)
+        dtype: Storage dtype, float16 or float32 (settings default if None)
+        chunk_size: Number of records encoded per step
+
+    Returns:
+        DatasetEmbeddings: The stored embeddings
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+        ValueError: If the dtype is unknown or the dataset has no records
+    """
+    model = model or get_model()
+    dtype = dtype or settings.DATASET_EMBEDDING_DTYPE
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown embedding dtype '{dtype}'. Available: {', '.join(DTYPES)}")
+
+    file_name, entry = _dataset_entry(dataset_name)
+    records = load_records_from_csv(os.path.join(get_dataset_catalog().data_dir, file_name))
+    directory = embeddings_directory(file_name, entry["content_hash"], model.fingerprint)
+
+    # Written to a temporary directory and renamed, so readers never see a partial matrix
+    tmp_directory = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    os.makedirs(tmp_directory)
+
+    try:
+        matrix = None
+        for start in range(0, len(records), chunk_size):
+            rows = range(start, min(start + chunk_size, len(records)))
+            vectors = normalize_embeddings(model.encode_uncached(serialize_records(records, rows)))
+            if matrix is None:
+                matrix = np.lib.format.open_memmap(
+                    os.path.join(tmp_directory, "embeddings.npy"),
+                    mode="w+",
+                    dtype=dtype,
+                    shape=(len(records), vectors.shape[1]),
+                )
+            matrix[start : start + len(rows)] = vectors.cpu().numpy()
+
+        if matrix is None:
+            raise ValueError(f"Dataset '{dataset_name}' has no records")
+        dim = matrix.shape[1]
+        matrix.flush()
+        del matrix
+
+        np.save(os.path.join(tmp_directory, "ids.npy"), np.asarray(records.ids, dtype=str))
+        with open(os.path.join(tmp_directory, "meta.json"), "w") as f:
+            json.dump(_meta(file_name, entry, model, records, dtype, dim), f, indent=2)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp_directory, directory)
+    finally:
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+
+    return DatasetEmbeddings(directory)
+
+
+def _meta(
+    file_name: str,
+    entry: dict,
+    model: EntityMatchingModel,
+    records: RecordStore,
+    dtype: str,
+    dim: int,
+) -> dict:
+    """Describe a precomputed embedding matrix."""
+    return {
+        "dataset": file_name,
+        "content_hash": entry["content_hash"],
+        "fingerprint": model.fingerprint,
+        "max_seq_length": getattr(model.model, "max_seq_length", settings.MAX_SEQ_LENGTH),
+        "dtype": dtype,
+        "dim": int(dim),
+        "num_records": len(records),
+        "created_at": time.time(),
+    }
+
+
+def load_dataset_embeddings(
+    dataset_name: str, model: Optional[EntityMatchingModel] = None
+) -> Optional[DatasetEmbeddings]:
+    """
+    Open the precomputed embeddings of a dataset for a model, if there are any.
+
+    Args:
+        dataset_name: Name of the dataset (built-in or uploaded)
+        model: Entity matching model (global model if None)
+
+    Returns:
+        The memory-mapped embeddings, or None if none match the current
+        dataset content and model weights
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+    """
+    model = model or get_model()
+    file_name, entry = _dataset_entry(dataset_name)
+    directory = embeddings_directory(file_name, entry["content_hash"], model.fingerprint)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+
+    embeddings = DatasetEmbeddings(directory)
+    if len(embeddings) != entry["num_records"]:
+        logger.warning(f"Ignoring embeddings of {file_name}: row count does not match")
+        return None
+    return embeddings
@@ -0,0 +1,224 @@
+"""Content-addressed cache for text embeddings.
+
+Embeddings are keyed by a hash of (model fingerprint, max sequence length,
+text). A bounded in-memory LRU tier sits in front of an optional on-disk
+tier: an append-only float32 matrix read through ``np.memmap`` plus a key
+log, so cached embeddings survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+def make_cache_key(fingerprint: str, max_seq_length: int, text: str) -> str:
+    """
+    Build the content-addressed key of an embedding.
+
+    Args:
+        fingerprint: Identifier of the model weights
+        max_seq_length: Maximum sequence length used for encoding
+        text: Encoded text
+
+    Returns:
+        str: Hex digest identifying the embedding
+    """
+    payload = f"{fingerprint}\x00{max_seq_length}\x00{text}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class _DiskTier:
+    """Append-only on-disk embedding store for one model fingerprint."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.keys_path = os.path.join(directory, "keys.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+
+        self.dim: Optional[int] = None
+        self.rows: Dict[str, int] = {}
+        self._mmap: Optional[np.memmap] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Read the key log and metadata written by a previous process."""
+        if not os.path.exists(self.meta_path):
+            return
+
+        with open(self.meta_path) as f:
+            self.dim = json.load(f)["dim"]
+
+        # The metadata is written before the first vectors and keys: a crash in
+        # between leaves no (or empty) files, which is an empty tier
+        stored_rows = 0
+        if os.path.exists(self.vectors_path):
+            stored_rows = os.path.getsize(self.vectors_path) // (4 * self.dim)
+
+        keys = []
+        if os.path.exists(self.keys_path):
+            with open(self.keys_path) as f:
+                for line in f:
+                    if len(keys) >= stored_rows or not line.endswith("\n"):
+                        break
+                    keys.append(line[:-1])
+
+        # Vectors are written before keys, so a torn write leaves unused rows (or a
+        # partial key line); drop them so that later appends stay aligned
+        with open(self.vectors_path, "ab") as f:
+            f.truncate(len(keys) * 4 * self.dim)
+        with open(self.keys_path, "ab") as f:
+            f.truncate(sum(len(key.encode("utf-8")) + 1 for key in keys))
+
+        self.rows = {key: row for row, key in enumerate(keys)}
+
+    def _matrix(self) -> np.memmap:
+        """Memory-map the vectors file, remapping if it has grown."""
+        if self._mmap is None or len(self._mmap) < len(self.rows):
+            self._mmap = np.memmap(
+                self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.rows), self.dim)
+            )
+        return self._mmap
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        return np.array(self._matrix()[row])
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        new = [i for i, key in enumerate(keys) if key not in self.rows]
+        if not new:
+            return
+
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            with open(self.meta_path, "w") as f:
+                json.dump({"dim": self.dim}, f)
+
+        with open(self.vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors[new], dtype=np.float32).tobytes())
+        with open(self.keys_path, "a") as f:
+            f.write("".join(f"{keys[i]}\n" for i in new))
+
+        start = len(self.rows)
+        for offset, i in enumerate(new):
+            self.rows[keys[i]] = start + offset
+
+
+class EmbeddingCache:
+    """Two-tier (memory LRU + optional disk) embedding cache."""
+
+    def __init__(self, max_entries: int, directory: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of embeddings kept in memory
+            directory: Root directory of the on-disk tier (disabled if None)
+        """
+        self.max_entries = max_entries
+        self.directory = directory
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def bind(self, fingerprint: str):
+        """
+        Attach the cache to a model fingerprint, dropping embeddings of other weights.
+
+        Args:
+            fingerprint: Identifier of the model weights
+        """
+        with self._lock:
+            self._memory.clear()
+            self._disk = None
+            if self.directory:
+                namespace = hashlib.sha256(fingerprint.encode("utf-8")).hexdigest()[:16]
+                self._disk = _DiskTier(os.path.join(self.directory, namespace))
+
+    def get_many(self, keys: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up embeddings by key.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached embeddings, with None for misses
+        """
+        results = []
+        with self._lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                elif self._disk is not None and (vector := self._disk.get(key)) is not None:
+                    self.disk_hits += 1
+                    self._remember(key, vector)
+                else:
+                    self.misses += 1
+                results.append(vector)
+        return results
+
+    def put_many(self, keys: List[str], vectors: np.ndarray):
+        """
+        Store embeddings.
+
+        Args:
+            keys: Cache keys, aligned with vectors
+            vectors: Embeddings of shape (len(keys), dim)
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if self._disk is not None:
+                self._disk.put_many(keys, vectors)
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the memory tier, evicting least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        # A row view would keep its whole encode batch (or disk page) alive
+        self._memory[key] = np.array(vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Drop all in-memory embeddings (the disk tier is left untouched)."""
+        with self._lock:
+            self._memory.clear()
+
+    def stats(self) -> dict:
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hit, miss and eviction counters and current sizes
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk.rows) if self._disk is not None else 0,
+            }
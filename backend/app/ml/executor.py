@@ -0,0 +1,146 @@
+"""Dedicated executor for CPU-bound model inference.
+
+Transformer forward passes must never run on the asyncio event loop: while
+one runs, every other request (including ``/health``) stalls. Endpoints
+submit inference here instead. The pool is sized so that concurrent
+workers times torch intra-op threads roughly matches the CPU count, and a
+bound on pending calls provides backpressure.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+
+
+class InferenceOverloadedError(RuntimeError):
+    """Raised when too many inference calls are already pending."""
+
+
+class InferenceExecutor:
+    """Bounded thread pool for model inference."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Concurrent inference calls (defaults to CPUs / torch threads)
+            max_pending: Maximum calls running or queued before new ones are rejected
+        """
+        import torch
+
+        if settings.TORCH_NUM_THREADS:
+            torch.set_num_threads(settings.TORCH_NUM_THREADS)
+
+        self.max_workers = (
+            max_workers
+            or settings.INFERENCE_WORKERS
+            or max(1, (os.cpu_count() or 1) // torch.get_num_threads())
+        )
+        self.max_pending = max_pending or settings.INFERENCE_MAX_PENDING
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="inference"
+        )
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a function on the inference pool, waiting for a free worker.
+
+        Unlike run(), this never rejects: streams that were already admitted
+        and background jobs queue instead.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future: Future of the function's return value
+        """
+        with self._lock:
+            self.pending += 1
+        try:
+            future = self._executor.submit(functools.partial(func, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future=None):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    async def run(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a function on the inference pool without blocking the event loop.
+
+        Args:
+            func: Function to call
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            The function's return value
+
+        Raises:
+            InferenceOverloadedError: If max_pending calls are already running or queued
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise InferenceOverloadedError(
+                    f"Inference queue is full ({self.max_pending} pending calls)"
+                )
+
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def stats(self) -> dict:
+        """
+        Get executor counters.
+
+        Returns:
+            dict: Pool size, pending, completed and rejected calls
+        """
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self):
+        """Stop the pool once queued calls finish."""
+        self._executor.shutdown(wait=False)
+
+
+# Global executor instance
+_executor_instance = None
+
+
+def get_inference_executor() -> InferenceExecutor:
+    """
+    Get or create the global inference executor.
+
+    Returns:
+        InferenceExecutor: The global executor
+    """
+    global _executor_instance
+
+    if _executor_instance is None:
+        _executor_instance = InferenceExecutor()
+
+    return _executor_instance
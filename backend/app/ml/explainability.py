@@ -1,14 +1,117 @@
-"""Explainability utilities using SHAP."""
+"""Explainability utilities using SHAP.
+
+Field-level KernelSHAP: the players are the fields of a record pair and the
+value of a coalition is the model similarity of both records reduced to the
+coalition's fields. A masked field is removed from both records before
+serialization; a coalition leaving either record empty has value 0 (no
+evidence of a match), so the contributions of all fields sum to the
+similarity of the full pair.
+
+Coalitions are enumerated when there are at most ``num_samples`` of them,
+and otherwise sampled from the Shapley kernel in complementary pairs. Every
+masked variant of both records is encoded in one deduplicated batch through
+the embedding cache, and the weighted regression is solved with NumPy.
+
+Token-level attributions are computed separately, on request, by occlusion:
+each whitespace token of the serialized records is removed in turn and its
+contribution is the similarity lost without it. Occluded texts are encoded
+in batches until the token count or time budget runs out.
+"""
+
+import time
+from math import comb
+from typing import List, Optional, Tuple
 
 import numpy as np
 
+from app.core.config import settings
 from app.models.schemas import (
+    RecordBase,
     RecordPair,
     Explanation,
     FeatureContribution,
+    TokenAttributionResult,
+    TokenContribution,
 )
-from app.ml.preprocessing import extract_field_pairs
+from app.ml.preprocessing import extract_field_pairs, serialize_record, serialize_record_pair
 from app.ml.model import EntityMatchingModel
+from app.ml.similarity import normalize_embeddings
+
+
+def field_coalitions(
+    num_fields: int, num_samples: int, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Choose the field coalitions to evaluate and their regression weights.
+
+    The empty and full coalitions are excluded: they are fixed by the
+    efficiency constraint of the regression.
+
+    Args:
+        num_fields: Number of fields (players)
+        num_samples: Maximum number of coalitions
+        seed: Seed of coalition sampling
+
+    Returns:
+        Tuple of (boolean coalition matrix of shape (n, num_fields), weight of each coalition)
+    """
+    sizes = np.arange(1, num_fields)
+    if len(sizes) == 0:
+        return np.zeros((0, num_fields), dtype=bool), np.zeros(0)
+
+    # Shapley kernel weight of a single coalition of each size
+    kernel = (num_fields - 1) / (sizes * (num_fields - sizes))
+
+    if 2**num_fields - 2 <= num_samples:
+        codes = np.arange(1, 2**num_fields - 1)
+        masks = (codes[:, None] >> np.arange(num_fields)) & 1 == 1
+        sizes_of = masks.sum(axis=1)
+        weights = kernel[sizes_of - 1] / np.array([comb(num_fields, int(s)) for s in sizes_of])
+        return masks, weights
+
+    # Sample sizes from the kernel's total weight per size, then uniform subsets of that
+    # size; every coalition comes with its complement to reduce variance
+    rng = np.random.default_rng(seed)
+    num_pairs = max(num_samples // 2, 1)
+    sampled_sizes = rng.choice(sizes, size=num_pairs, p=kernel / kernel.sum())
+    ranks = rng.random((num_pairs, num_fields)).argsort(axis=1).argsort(axis=1)
+    masks = ranks < sampled_sizes[:, None]
+    masks = np.concatenate([masks, ~masks])
+
+    # Sampled with kernel probability: duplicates count once with their frequency
+    masks, counts = np.unique(masks, axis=0, return_counts=True)
+    return masks, counts.astype(np.float64)
+
+
+def solve_shapley_values(
+    masks: np.ndarray, weights: np.ndarray, values: np.ndarray, full_value: float, base_value: float
+) -> np.ndarray:
+    """
+    Solve the KernelSHAP weighted regression under the efficiency constraint.
+
+    Args:
+        masks: Boolean coalition matrix of shape (n, num_fields)
+        weights: Regression weight of each coalition
+        values: Value of each coalition
+        full_value: Value of the coalition of all fields
+        base_value: Value of the empty coalition
+
+    Returns:
+        np.ndarray: Contribution of each field, summing to full_value - base_value
+    """
+    num_fields = masks.shape[1]
+    total = full_value - base_value
+    if num_fields <= 1 or len(masks) == 0:
+        return np.full(num_fields, total / max(num_fields, 1))
+
+    # Eliminate the last field with the constraint sum(phi) == total
+    z = masks.astype(np.float64)
+    targets = values - base_value - z[:, -1] * total
+    design = z[:, :-1] - z[:, -1:]
+
+    scale = np.sqrt(weights)[:, None]
+    head, *_ = np.linalg.lstsq(design * scale, targets * scale[:, 0], rcond=None)
+    return np.append(head, total - head.sum())
 
 
 class RecordLinkageExplainer:
@@ -23,64 +126,78 @@ class RecordLinkageExplainer:
         """
         self.model = model
 
-    def explain_with_shap(self, record_pair: RecordPair, num_samples: int = 100) -> Explanation:
+    def _coalition_values(
+        self, record_pair: RecordPair, fields: List[str], masks: np.ndarray
+    ) -> np.ndarray:
+        """Similarity of the pair reduced to each coalition, from one batched encode."""
+        sides = (record_pair.record_a.fields, record_pair.record_b.fields)
+        texts = [
+            [
+                serialize_record(
+                    RecordBase(
+                        fields={
+                            field: side[field]
+                            for field, kept in zip(fields, mask)
+                            if kept and field in side
+                        }
+                    )
+                )
+                for mask in masks
+            ]
+            for side in sides
+        ]
+
+        embeddings = normalize_embeddings(self.model.encode_unique(texts[0] + texts[1]))
+        embeddings = embeddings.cpu().numpy()
+        values = np.einsum("ij,ij->i", embeddings[: len(masks)], embeddings[len(masks) :])
+
+        # Without any field on one side there is nothing to match on
+        empty = np.array([not text_a or not text_b for text_a, text_b in zip(*texts)])
+        return np.where(empty, 0.0, np.clip(values, 0.0, 1.0))
+
+    def explain_with_shap(
+        self, record_pair: RecordPair, num_samples: Optional[int] = None
+    ) -> Explanation:
         """
         Generate SHAP-based explanation for a prediction.
 
         Args:
             record_pair: Pair of records to explain
-            num_samples: Number of samples for SHAP
+            num_samples: Maximum number of field coalitions to evaluate
+                (settings.SHAP_MAX_SAMPLES if None)
 
         Returns:
             Explanation: SHAP-based explanation
         """
-        # Get field pairs for field-level attribution
         field_pairs = extract_field_pairs(record_pair)
+        fields = [field_name for field_name, _, _ in field_pairs]
 
-        # TODO: Implement actual SHAP explanation
-        # For now, use field-based heuristics as placeholder
-
-        feature_contributions = []
-        top_positive = []
-        top_negative = []
-
-        for field_name, value_a, value_b in field_pairs:
-            # Simple similarity heuristic
-            value_a_norm = value_a.lower().strip()
-            value_b_norm = value_b.lower().strip()
-
-            if value_a_norm == value_b_norm:
-                contribution = 0.8
-                top_positive.append(field_name)
-            elif value_a_norm in value_b_norm or value_b_norm in value_a_norm:
-                contribution = 0.4
-                if contribution > 0.3:
-                    top_positive.append(field_name)
-            else:
-                # Use actual model to compute field contribution
-                field_text = f"{value_a} [SEP] {value_b}"
-                try:
-                    embeddings = self.model.encode([field_text])
-                    # Normalize to contribution range
-                    contribution = float(np.mean(embeddings.cpu().numpy())) * 0.1
-                except Exception:
-                    contribution = -0.2
-
-                if contribution < 0:
-                    top_negative.append(field_name)
-
-            feature_contributions.append(
-                FeatureContribution(
-                    field_name=field_name,
-                    contribution=contribution,
-                    value_a=value_a,
-                    value_b=value_b,
-                )
-            )
+        num_samples = min(num_samples or settings.SHAP_MAX_SAMPLES, settings.SHAP_MAX_SAMPLES)
+        masks, weights = field_coalitions(len(fields), num_samples)
+
+        # The full coalition is evaluated in the same batch as the masked ones
+        all_masks = np.vstack([masks, np.ones((1, len(fields)), dtype=bool)])
+        values = self._coalition_values(record_pair, fields, all_masks)
+        contributions = solve_shapley_values(
+            masks, weights, values[:-1], full_value=values[-1], base_value=0.0
+        )
 
+        feature_contributions = [
+            FeatureContribution(
+                field_name=field_name,
+                contribution=float(contribution),
+                value_a=value_a,
+                value_b=value_b,
+            )
+            for (field_name, value_a, value_b), contribution in zip(field_pairs, contributions)
+        ]
         # Sort by absolute contribution
         feature_contributions.sort(key=lambda x: abs(x.contribution), reverse=True)
 
+        order = np.argsort(-contributions, kind="stable")
+        top_positive = [fields[i] for i in order if contributions[i] > 0]
+        top_negative = [fields[i] for i in order[::-1] if contributions[i] < 0]
+
         return Explanation(
             method="SHAP",
             feature_contributions=feature_contributions,
@@ -88,6 +205,80 @@ class RecordLinkageExplainer:
             top_negative_features=top_negative[:5],
         )
 
+    def explain_tokens(
+        self,
+        record_pair: RecordPair,
+        max_tokens: Optional[int] = None,
+        time_budget: Optional[float] = None,
+    ) -> TokenAttributionResult:
+        """
+        Attribute the similarity of a pair to its tokens by occlusion.
+
+        Tokens of record_a are evaluated before those of record_b; when the
+        budget runs out, the remaining tokens are left out of the result.
+
+        Args:
+            record_pair: Pair of records to explain
+            max_tokens: Maximum number of tokens to occlude
+                (settings.TOKEN_ATTRIBUTION_MAX_TOKENS if None)
+            time_budget: Seconds after which no further batch is started
+                (settings.TOKEN_ATTRIBUTION_TIME_BUDGET if None)
+
+        Returns:
+            TokenAttributionResult: Contribution of each evaluated token
+        """
+        start_time = time.time()
+        max_tokens = min(
+            max_tokens or settings.TOKEN_ATTRIBUTION_MAX_TOKENS,
+            settings.TOKEN_ATTRIBUTION_MAX_TOKENS,
+        )
+        time_budget = min(
+            time_budget or settings.TOKEN_ATTRIBUTION_TIME_BUDGET,
+            settings.TOKEN_ATTRIBUTION_TIME_BUDGET,
+        )
+        batch_size = settings.TOKEN_ATTRIBUTION_BATCH_SIZE
+
+        texts = serialize_record_pair(record_pair, add_sep=False)
+        tokens = [text.split() for text in texts]
+        full = normalize_embeddings(self.model.encode(list(texts))).cpu().numpy()
+        similarity = float(full[0] @ full[1])
+
+        # (side, position) of every token; occluding a token of one side compares with the other
+        positions = [(side, i) for side in (0, 1) for i in range(len(tokens[side]))]
+        budget = positions[:max_tokens]
+
+        contributions = []
+        for start in range(0, len(budget), batch_size):
+            if start and time.time() - start_time > time_budget:
+                break
+            batch = budget[start : start + batch_size]
+            occluded = [" ".join(tokens[side][:i] + tokens[side][i + 1 :]) for side, i in batch]
+            # Occluded texts are one-offs: keep them out of the embedding cache
+            embeddings = normalize_embeddings(self.model.encode_uncached(occluded)).cpu().numpy()
+            others = full[[1 - side for side, _ in batch]]
+            occluded_similarity = np.einsum("ij,ij->i", embeddings, others)
+
+            for (side, i), value in zip(batch, occluded_similarity.tolist()):
+                contributions.append(
+                    TokenContribution(
+                        token=tokens[side][i],
+                        contribution=similarity - value,
+                        position=i,
+                        side="ab"[side],
+                    )
+                )
+
+        tokens_evaluated = len(contributions)
+        contributions.sort(key=lambda x: abs(x.contribution), reverse=True)
+        return TokenAttributionResult(
+            similarity_score=min(max(similarity, 0.0), 1.0),
+            token_contributions=contributions,
+            num_tokens=len(positions),
+            tokens_evaluated=tokens_evaluated,
+            complete=tokens_evaluated == len(positions),
+            processing_time=time.time() - start_time,
+        )
+
     def explain(self, record_pair: RecordPair) -> Explanation:
         """
         Generate explanation using SHAP.
@@ -0,0 +1,169 @@
+"""Deferred explanations for batch matching.
+
+Explaining a match costs a batched encode of every masked variant of the
+pair, so batch matching does not explain matches inline. Each match gets an
+explanation handle instead: the pair is registered here under an ID derived
+from its content and the model fingerprint, and its explanation is computed
+on the first request for it and memoized.
+
+Registered pairs are kept in a bounded LRU; a handle whose pair was evicted
+no longer resolves. Explanations of the most uncertain matches of a run
+(closest to its threshold) can be precomputed in the background.
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.models.schemas import Explanation, RecordPair
+from app.ml.executor import get_inference_executor
+from app.ml.explainability import RecordLinkageExplainer
+from app.ml.model import get_model
+
+logger = logging.getLogger(__name__)
+
+
+class ExplanationStore:
+    """Registered record pairs and their memoized explanations."""
+
+    def __init__(self, max_pairs: Optional[int] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_pairs: Maximum number of registered pairs (least recently used are evicted)
+        """
+        self.max_pairs = max_pairs or settings.EXPLANATION_STORE_MAX_PAIRS
+        # Reentrant: a precomputation that already finished runs its callback immediately
+        self._lock = threading.RLock()
+        self._pairs: "OrderedDict[str, RecordPair]" = OrderedDict()
+        self._explanations: Dict[str, Explanation] = {}
+        self._futures: Dict[str, Future] = {}
+
+    def register(self, record_pair: RecordPair) -> str:
+        """
+        Register a pair whose explanation may be requested later.
+
+        Args:
+            record_pair: Pair of records
+
+        Returns:
+            str: Explanation ID of the pair
+        """
+        identity = f"{get_model().fingerprint}:{record_pair.model_dump_json()}"
+        explanation_id = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:24]
+
+        with self._lock:
+            if explanation_id in self._pairs:
+                self._pairs.move_to_end(explanation_id)
+                return explanation_id
+            self._pairs[explanation_id] = record_pair
+            while len(self._pairs) > self.max_pairs:
+                evicted, _ = self._pairs.popitem(last=False)
+                self._explanations.pop(evicted, None)
+        return explanation_id
+
+    def explain(self, explanation_id: str) -> Explanation:
+        """
+        Get the explanation of a registered pair, computing it if needed.
+
+        Args:
+            explanation_id: ID returned by register
+
+        Returns:
+            Explanation: Explanation of the pair
+
+        Raises:
+            KeyError: If the ID is unknown or its pair was evicted
+        """
+        with self._lock:
+            explanation = self._explanations.get(explanation_id)
+            if explanation is not None:
+                return explanation
+            record_pair = self._pairs[explanation_id]
+
+        explanation = RecordLinkageExplainer(get_model()).explain(record_pair)
+        with self._lock:
+            if explanation_id in self._pairs:
+                self._explanations[explanation_id] = explanation
+        return explanation
+
+    async def get(self, explanation_id: str) -> Explanation:
+        """
+        Resolve an explanation ID off the event loop.
+
+        A memoized explanation is returned directly; a running precomputation
+        of the same pair is awaited instead of being repeated.
+
+        Args:
+            explanation_id: ID returned by register
+
+        Returns:
+            Explanation: Explanation of the pair
+
+        Raises:
+            KeyError: If the ID is unknown or its pair was evicted
+            InferenceOverloadedError: If the explanation cannot be admitted for computation
+        """
+        with self._lock:
+            explanation = self._explanations.get(explanation_id)
+            if explanation is not None:
+                return explanation
+            if explanation_id not in self._pairs:
+                raise KeyError(explanation_id)
+            future = self._futures.get(explanation_id)
+
+        if future is not None:
+            return await asyncio.wrap_future(future)
+        return await get_inference_executor().run(self.explain, explanation_id)
+
+    def precompute(self, explanation_ids: Iterable[str]):
+        """
+        Compute explanations in the background, queueing behind request inference.
+
+        Args:
+            explanation_ids: IDs of the pairs to explain
+        """
+        with self._lock:
+            pending = [
+                explanation_id
+                for explanation_id in explanation_ids
+                if explanation_id in self._pairs
+                and explanation_id not in self._explanations
+                and explanation_id not in self._futures
+            ]
+            for explanation_id in pending:
+                future = get_inference_executor().submit(self.explain, explanation_id)
+                self._futures[explanation_id] = future
+                future.add_done_callback(
+                    lambda done, explanation_id=explanation_id: self._finished(explanation_id, done)
+                )
+
+    def _finished(self, explanation_id: str, future: Future):
+        """Forget a finished precomputation, logging its error if it failed."""
+        with self._lock:
+            self._futures.pop(explanation_id, None)
+        if future.exception() is not None and not isinstance(future.exception(), KeyError):
+            logger.error(f"Precomputing explanation {explanation_id} failed: {future.exception()}")
+
+
+# Global explanation store
+_store_instance = None
+
+
+def get_explanation_store() -> ExplanationStore:
+    """
+    Get or create the global explanation store.
+
+    Returns:
+        ExplanationStore: The global store
+    """
+    global _store_instance
+    if _store_instance is None:
+        _store_instance = ExplanationStore()
+    return _store_instance
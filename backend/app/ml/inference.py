@@ -1,20 +1,40 @@
 """Inference pipeline for entity matching."""
 
+import heapq
+import os
 import time
-from typing import List, Optional
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Iterator, List, Optional, Tuple, Union
 
 from app.models.schemas import (
     RecordPair,
     RecordBase,
     MatchResult,
     MatchPrediction,
+    BatchMatchProgress,
+    BatchMatchRequest,
     BatchMatchResult,
-    Explanation,
-    FeatureContribution,
+    BlockingConfig,
+    ClusteringConfig,
+    EntityCluster,
 )
 from app.core.config import settings
-from app.ml.model import get_model
-from app.ml.preprocessing import serialize_record_pair
+from app.ml.model import EntityMatchingModel, get_model
+from app.ml.ann_index import RecordIndex
+from app.ml.clustering import MatchGraph
+from app.ml.dataset_embeddings import DatasetEmbeddings, load_dataset_embeddings
+from app.ml.executor import get_inference_executor
+from app.ml.explainability import RecordLinkageExplainer
+from app.ml.explanation_store import get_explanation_store
+from app.ml.micro_batching import get_micro_batcher
+from app.ml.blocking import CandidatePair, FullBlocker, get_blocker
+from app.ml.prefilter import ACCEPT, AMBIGUOUS, PrefilterCascade
+from app.ml.preprocessing import serialize_record, serialize_record_pair, serialize_records
+from app.utils.data_loader import load_records_from_csv, resolve_dataset_file
+from app.utils.dataset_catalog import get_dataset_catalog
+from app.utils.record_store import RecordStore, as_record_store
+from app.ml.similarity import ScoredPair, normalize_embeddings, score_pairs, threshold_matches
 
 
 async def predict_match(
@@ -38,19 +58,44 @@ async def predict_match(
     # Returns tuple of (text_a, text_b) when add_sep=False
     text_a, text_b = serialize_record_pair(record_pair, add_sep=False)
 
-    # Compute BERT-based similarity
-    similarity, embedding_a, embedding_b = model.compute_similarity(text_a, text_b)
+    # Clear-cut pairs are settled by classical string metrics alone
+    resolved_by = None
+    if settings.PREFILTER_ENABLED:
+        decision, similarity = PrefilterCascade().classify(
+            record_pair.record_a, record_pair.record_b
+        )
+        if decision != AMBIGUOUS:
+            resolved_by = "prefilter"
+
+    if resolved_by is None:
+        resolved_by = "model"
+        # Compute BERT-based similarity off the event loop, coalescing concurrent requests
+        if settings.MICRO_BATCHING_ENABLED:
+            similarity = await get_micro_batcher().similarity(text_a, text_b)
+        else:
+            similarity, _, _ = await get_inference_executor().run(
+                model.compute_similarity, text_a, text_b
+            )
+    similarity = min(max(similarity, 0.0), 1.0)
 
     prediction = MatchPrediction(
-        is_match=similarity > settings.SIMILARITY_THRESHOLD,
+        # A pair settled by the pre-filter keeps its decision, whatever its classical score
+        is_match=(
+            decision == ACCEPT
+            if resolved_by == "prefilter"
+            else similarity > settings.SIMILARITY_THRESHOLD
+        ),
         match_probability=similarity,
         confidence=_get_confidence_level(similarity),
         similarity_score=similarity,
+        resolved_by=resolved_by,
     )
 
     explanation = None
     if include_explanation:
-        explanation = _generate_placeholder_explanation(record_pair)
+        explanation = await get_inference_executor().run(
+            RecordLinkageExplainer(model).explain, record_pair
+        )
 
     return MatchResult(
         prediction=prediction,
@@ -59,95 +104,573 @@ async def predict_match(
     )
 
 
+SCORING_MODES = ("record", "pair", "ann")
+
+
+def check_scoring_mode(scoring_mode: str):
+    """
+    Check that a batch scoring mode exists.
+
+    Args:
+        scoring_mode: Scoring mode name
+
+    Raises:
+        ValueError: If the scoring mode is unknown
+    """
+    if scoring_mode not in SCORING_MODES:
+        raise ValueError(
+            f"Unknown scoring mode '{scoring_mode}'. "
+            f"Available: {', '.join(sorted(SCORING_MODES))}"
+        )
+
+
+class BatchMatchRun:
+    """
+    Chunked execution of batch matching between two datasets.
+
+    Records of dataset_a are processed in chunks of rows and every chunk
+    yields its above-threshold pairs as soon as it is scored, so callers
+    can stream results or checkpoint progress without holding all matches.
+    """
+
+    def __init__(
+        self,
+        dataset_a: List[RecordBase],
+        dataset_b: List[RecordBase],
+        threshold: Optional[float] = None,
+        blocking: Optional[BlockingConfig] = None,
+        scoring_mode: Optional[str] = None,
+        top_k: Optional[int] = None,
+        chunk_size: Optional[int] = None,
+        model: Optional[EntityMatchingModel] = None,
+        prefilter: Optional[bool] = None,
+        embeddings_b: Optional[DatasetEmbeddings] = None,
+    ):
+        """
+        Initialize a batch matching run.
+
+        Args:
+            dataset_a: First dataset (records or a RecordStore)
+            dataset_b: Second dataset (records or a RecordStore)
+            threshold: Optional custom threshold
+            blocking: Optional blocking configuration (settings defaults if None)
+            scoring_mode: "record" to encode each record once, "pair" to encode per pair,
+                "ann" to only score the nearest neighbours of each record
+            top_k: Keep at most this many matches per record of dataset_a
+            chunk_size: Number of dataset_a records scored per chunk
+            model: Entity matching model (global model if None)
+            prefilter: Resolve clear-cut candidate pairs with classical string metrics
+                before the model (settings default if None; blocked record/pair scoring only)
+            embeddings_b: Precomputed embeddings aligned with the rows of dataset_b, used
+                instead of encoding it (record and ann scoring)
+
+        Raises:
+            ValueError: If the scoring mode or blocking method is unknown
+        """
+        # Records are held column-wise; pydantic records are only built for results
+        self.dataset_a = as_record_store(dataset_a)
+        self.dataset_b = as_record_store(dataset_b)
+        self.threshold = threshold or settings.SIMILARITY_THRESHOLD
+        self.scoring_mode = scoring_mode or settings.BATCH_SCORING_MODE
+        self.top_k = top_k
+        self.chunk_size = chunk_size or settings.BATCH_CHUNK_SIZE
+        self.model = model or get_model()
+        self.embeddings_b = embeddings_b
+        # Most uncertain explained matches: heap of (-distance to threshold, explanation ID)
+        self._uncertain: List[Tuple[float, str]] = []
+
+        if embeddings_b is not None and len(embeddings_b) != len(self.dataset_b):
+            raise ValueError("Precomputed embeddings do not match the rows of dataset_b")
+
+        check_scoring_mode(self.scoring_mode)
+
+        if self.scoring_mode == "ann":
+            # The index itself generates candidates: top-k neighbours per record
+            self.blocker = None
+            self.blocking_method = "ann"
+            self.retrieval_k = top_k or settings.ANN_TOP_K
+        else:
+            self.blocker = get_blocker(blocking)
+            self.blocking_method = self.blocker.method
+
+        # Full blocking is scored as a dense matrix, never materializing n * m pairs
+        self._dense = self.blocking_method == FullBlocker.method and self.scoring_mode == "record"
+        self._candidate_pairs: Optional[List[CandidatePair]] = None
+        self._accepted_pairs: Optional[List[ScoredPair]] = None
+        self._rejected_pairs: Optional[List[CandidatePair]] = None
+        self._embeddings_b = None
+        self._position_b = None
+        self._index: Optional[RecordIndex] = None
+        self._prepared = False
+
+        self.total_comparisons = 0
+        self.comparisons_done = 0
+        self.matches_found = 0
+        self.chunks_done = 0
+        self.prefilter_accepted = 0
+        self.prefilter_rejected = 0
+
+        # Only explicit candidate pairs go through the cascade: dense and ANN scoring
+        # never enumerate pairs before the model sees them
+        if prefilter is None:
+            prefilter = settings.PREFILTER_ENABLED
+        self.prefilter = (
+            PrefilterCascade()
+            if prefilter and self.blocker is not None and not self._dense
+            else None
+        )
+
+    @property
+    def num_chunks(self) -> int:
+        """Number of dataset_a chunks in the run."""
+        return -(-len(self.dataset_a) // self.chunk_size)
+
+    @property
+    def pairs_pruned(self) -> int:
+        """Number of cartesian-product pairs never scored."""
+        return len(self.dataset_a) * len(self.dataset_b) - self.total_comparisons
+
+    @property
+    def model_scored(self) -> int:
+        """Number of pairs scored so far by the model rather than the pre-filter."""
+        return self.comparisons_done - self.prefilter_accepted - self.prefilter_rejected
+
+    def progress(self, elapsed_time: float) -> BatchMatchProgress:
+        """
+        Report progress of the run.
+
+        Args:
+            elapsed_time: Seconds spent on the run so far
+
+        Returns:
+            BatchMatchProgress: Chunks and pairs scored, matches and throughput
+        """
+        return BatchMatchProgress(
+            chunks_done=self.chunks_done,
+            total_chunks=self.num_chunks,
+            pairs_scored=self.comparisons_done,
+            total_comparisons=self.total_comparisons,
+            matches_found=self.matches_found,
+            elapsed_time=elapsed_time,
+            pairs_per_second=self.comparisons_done / elapsed_time if elapsed_time > 0 else 0.0,
+        )
+
+    def prepare(self):
+        """Generate candidate pairs and encode/index dataset_b. Called once, lazily."""
+        if self._prepared:
+            return
+
+        if self.scoring_mode == "ann":
+            self.total_comparisons = len(self.dataset_a) * min(
+                self.retrieval_k, len(self.dataset_b)
+            )
+            if len(self.dataset_b):
+                if self.embeddings_b is not None:
+                    embeddings = self.embeddings_b.rows()
+                else:
+                    embeddings = self.model.encode_unique(serialize_records(self.dataset_b))
+                self._index = RecordIndex()
+                self._index.build(
+                    [str(j) for j in range(len(self.dataset_b))], embeddings.cpu().numpy()
+                )
+        elif self._dense:
+            self.total_comparisons = len(self.dataset_a) * len(self.dataset_b)
+            used_b = list(range(len(self.dataset_b)))
+            self._encode_b(used_b)
+        else:
+            self._candidate_pairs = self.blocker.candidate_pairs(self.dataset_a, self.dataset_b)
+            self.total_comparisons = len(self._candidate_pairs)
+            if self.prefilter is not None:
+                # Accepted pairs are matches and rejected ones are not, whatever the
+                # threshold; only ambiguous pairs are left for the model
+                self._accepted_pairs, self._rejected_pairs, self._candidate_pairs = (
+                    self.prefilter.split(self.dataset_a, self.dataset_b, self._candidate_pairs)
+                )
+            if self.scoring_mode == "record":
+                # Only encode records that take part in at least one candidate pair
+                self._encode_b(sorted({j for _, j in self._candidate_pairs}))
+
+        self._prepared = True
+
+    def _encode_b(self, used_b: List[int]):
+        """Encode the used records of dataset_b once for the whole run."""
+        self._position_b = {j: column for column, j in enumerate(used_b)}
+        if not used_b:
+            return
+        if self.embeddings_b is not None:
+            embeddings = self.embeddings_b.rows(used_b)
+        else:
+            embeddings = self.model.encode_unique(serialize_records(self.dataset_b, used_b))
+        self._embeddings_b = normalize_embeddings(embeddings).to(self.model.device)
+
+    def chunks(self, start_chunk: int = 0) -> Iterator[List[ScoredPair]]:
+        """
+        Score dataset_a chunk by chunk.
+
+        Args:
+            start_chunk: Index of the first chunk to score (to resume a run)
+
+        Yields:
+            List of (index_a, index_b, similarity) matches for each chunk: pairs scoring
+            at least the threshold and pairs accepted by the pre-filter (with their
+            classical score)
+        """
+        self.prepare()
+        self.chunks_done = start_chunk
+
+        for chunk in range(start_chunk, self.num_chunks):
+            start = chunk * self.chunk_size
+            end = min(start + self.chunk_size, len(self.dataset_a))
+
+            scored_pairs = self._score_rows(start, end)
+            if self.top_k is not None:
+                scored_pairs = _keep_top_k(scored_pairs, self.top_k)
+
+            self.matches_found += len(scored_pairs)
+            self.chunks_done = chunk + 1
+            yield scored_pairs
+
+        if self.scoring_mode == "ann" and start_chunk == 0:
+            # Probing may return fewer than k neighbours; report what was scored
+            self.total_comparisons = self.comparisons_done
+
+    def _score_rows(self, start: int, end: int) -> List[ScoredPair]:
+        """Get the matches among the candidate pairs of dataset_a rows [start, end)."""
+        if self._dense:
+            # Thresholded while scoring
+            return self._score_dense(start, end)
+
+        if self.scoring_mode == "ann":
+            scored_pairs = self._score_by_retrieval(start, end)
+        else:
+            candidate_pairs = _row_slice(self._candidate_pairs, start, end)
+            self.comparisons_done += len(candidate_pairs)
+            if self.scoring_mode == "pair":
+                scored_pairs = _score_by_pair(
+                    self.model, self.dataset_a, self.dataset_b, candidate_pairs
+                )
+            else:
+                scored_pairs = self._score_sparse(candidate_pairs)
+
+        scored_pairs = [pair for pair in scored_pairs if pair[2] >= self.threshold]
+        if self._accepted_pairs is None:
+            return scored_pairs
+        return sorted(scored_pairs + self._take_resolved(start, end))
+
+    def _take_resolved(self, start: int, end: int) -> List[ScoredPair]:
+        """Count the pairs of dataset_a rows [start, end) resolved by the pre-filter
+        and get the accepted ones."""
+        accepted = _row_slice(self._accepted_pairs, start, end)
+        rejected = _row_slice(self._rejected_pairs, start, end)
+        self.prefilter_accepted += len(accepted)
+        self.prefilter_rejected += len(rejected)
+        self.comparisons_done += len(accepted) + len(rejected)
+        return accepted
+
+    def _prefilter_accepted(self, i: int, j: int) -> bool:
+        """Whether the pre-filter resolved a pair as a match."""
+        if not self._accepted_pairs:
+            return False
+        position = bisect_left(self._accepted_pairs, (i, j))
+        return position < len(self._accepted_pairs) and self._accepted_pairs[position][:2] == (i, j)
+
+    def _encode_a(self, rows: List[int]):
+        """Encode and normalize records of dataset_a."""
+        return normalize_embeddings(
+            self.model.encode_unique(serialize_records(self.dataset_a, rows))
+        )
+
+    def _score_dense(self, start: int, end: int) -> List[ScoredPair]:
+        """Score rows against all of dataset_b with a chunked similarity matrix."""
+        self.comparisons_done += (end - start) * len(self.dataset_b)
+        if self._embeddings_b is None:
+            return []
+
+        matches = threshold_matches(
+            self._encode_a(list(range(start, end))),
+            self._embeddings_b,
+            self.threshold,
+            top_k=self.top_k,
+        )
+        return [(start + row, column, score) for row, column, score in matches]
+
+    def _score_sparse(self, candidate_pairs: List[CandidatePair]) -> List[ScoredPair]:
+        """Score explicit candidate pairs from per-record embeddings."""
+        if not candidate_pairs:
+            return []
+
+        used_a = sorted({i for i, _ in candidate_pairs})
+        position_a = {i: row for row, i in enumerate(used_a)}
+        similarities = score_pairs(
+            self._encode_a(used_a),
+            self._embeddings_b,
+            [(position_a[i], self._position_b[j]) for i, j in candidate_pairs],
+        )
+
+        return [(i, j, similarity) for (i, j), similarity in zip(candidate_pairs, similarities)]
+
+    def _score_by_retrieval(self, start: int, end: int) -> List[ScoredPair]:
+        """Score only the approximate nearest neighbours in dataset_b of each row."""
+        if self._index is None:
+            return []
+
+        embeddings = self.model.encode_unique(serialize_records(self.dataset_a, range(start, end)))
+        neighbours = self._index.search(embeddings.cpu().numpy(), self.retrieval_k)
+
+        scored_pairs = [
+            (start + row, int(record_id), similarity)
+            for row, row_neighbours in enumerate(neighbours)
+            for record_id, similarity in row_neighbours
+        ]
+        self.comparisons_done += len(scored_pairs)
+        return scored_pairs
+
+    def to_match_result(
+        self, scored_pair: ScoredPair, include_explanation: bool = False
+    ) -> MatchResult:
+        """
+        Build the API result of a scored pair.
+
+        Args:
+            scored_pair: (index_a, index_b, similarity)
+            include_explanation: Whether to include an explanation handle
+
+        Returns:
+            MatchResult: Match result for the pair
+        """
+        i, j, similarity = scored_pair
+        record_pair = RecordPair(
+            record_a=self.dataset_a.record(i), record_b=self.dataset_b.record(j)
+        )
+
+        # Pre-filter matches carry their classical score, not a model similarity
+        accepted = self._prefilter_accepted(i, j)
+        prediction = MatchPrediction(
+            is_match=accepted or similarity >= self.threshold,
+            match_probability=similarity,
+            confidence=_get_confidence_level(similarity),
+            similarity_score=similarity,
+            resolved_by="prefilter" if accepted else "model",
+        )
+
+        explanation_id = None
+        if include_explanation:
+            # Explanations are computed on request; the result carries a handle to resolve
+            explanation_id = get_explanation_store().register(record_pair)
+        if include_explanation and not accepted:
+            # Clear-cut pre-filter matches are never uncertain
+            uncertainty = (-abs(similarity - self.threshold), explanation_id)
+            if len(self._uncertain) < settings.EXPLANATION_PRECOMPUTE_TOP_N:
+                heapq.heappush(self._uncertain, uncertainty)
+            elif self._uncertain:
+                heapq.heappushpop(self._uncertain, uncertainty)
+
+        return MatchResult(
+            prediction=prediction,
+            explanation_id=explanation_id,
+            record_pair=record_pair,
+        )
+
+    def precompute_explanations(self):
+        """Explain the matches closest to the threshold in the background."""
+        get_explanation_store().precompute(
+            explanation_id for _, explanation_id in sorted(self._uncertain, reverse=True)
+        )
+        self._uncertain = []
+
+
+def _row_slice(pairs: List[tuple], start: int, end: int) -> List[tuple]:
+    """Get the pairs of dataset_a rows [start, end) from pairs sorted by row."""
+    low = bisect_left(pairs, (start, -1))
+    high = bisect_left(pairs, (end, -1))
+    return pairs[low:high]
+
+
 async def batch_predict(
     dataset_a: List[RecordBase],
     dataset_b: List[RecordBase],
     threshold: Optional[float] = None,
     include_explanations: bool = False,
+    blocking: Optional[BlockingConfig] = None,
+    scoring_mode: Optional[str] = None,
+    top_k: Optional[int] = None,
+    prefilter: Optional[bool] = None,
+    embeddings_b: Optional[DatasetEmbeddings] = None,
+    clustering: Optional[ClusteringConfig] = None,
 ) -> BatchMatchResult:
     """
     Perform batch matching between two datasets using BERT.
 
-    This implementation uses batch encoding for better performance.
+    Candidate pairs are generated by a blocking stage first, so only
+    plausible pairs are encoded and scored.
 
     Args:
-        dataset_a: First dataset
-        dataset_b: Second dataset
+        dataset_a: First dataset (records or a RecordStore)
+        dataset_b: Second dataset (records or a RecordStore)
         threshold: Optional custom threshold
-        include_explanations: Whether to include explanations
+        include_explanations: Whether to return explanation handles
+        blocking: Optional blocking configuration (settings defaults if None)
+        scoring_mode: "record" to encode each record once, "pair" to encode per pair,
+            "ann" to only score the nearest neighbours of each record
+        top_k: Keep at most this many matches per record of dataset_a
+        prefilter: Resolve clear-cut pairs with classical string metrics first
+        embeddings_b: Precomputed embeddings aligned with the rows of dataset_b
+        clustering: Also resolve the matches into entity clusters (skipped if None)
 
     Returns:
         BatchMatchResult: Results of all comparisons
     """
     start_time = time.time()
 
-    match_results = []
-    matches_found = 0
+    run = BatchMatchRun(
+        dataset_a,
+        dataset_b,
+        threshold=threshold,
+        blocking=blocking,
+        scoring_mode=scoring_mode,
+        top_k=top_k,
+        prefilter=prefilter,
+        embeddings_b=embeddings_b,
+    )
 
-    # Use custom threshold or default
-    match_threshold = threshold or settings.SIMILARITY_THRESHOLD
+    graph = MatchGraph(run.dataset_a.ids, run.dataset_b.ids, clustering) if clustering else None
 
-    # Get the BERT model
-    model = get_model()
+    # Score off the event loop
+    match_results, clusters = await get_inference_executor().run(
+        _collect_batch_results, run, include_explanations, graph
+    )
 
-    # Limit comparisons for demo (avoid O(n²) explosion)
-    max_comparisons = 1000
-    comparison_count = 0
-
-    # Prepare batch of record pairs
-    record_pairs = []
-    for record_a in dataset_a:
-        for record_b in dataset_b:
-            if comparison_count >= max_comparisons:
-                break
-            record_pairs.append(RecordPair(record_a=record_a, record_b=record_b))
-            comparison_count += 1
-        if comparison_count >= max_comparisons:
-            break
-
-    # Batch encode all pairs for efficiency
-    text_pairs = []
-    for record_pair in record_pairs:
-        text_a, text_b = serialize_record_pair(record_pair, add_sep=False)
-        text_pairs.append((text_a, text_b))
+    processing_time = time.time() - start_time
 
-    # Compute similarities in batch
-    similarities = model.predict_batch(text_pairs)
+    return BatchMatchResult(
+        total_comparisons=run.total_comparisons,
+        matches_found=run.matches_found,
+        match_results=match_results,
+        processing_time=processing_time,
+        pairs_pruned=run.pairs_pruned,
+        blocking_method=run.blocking_method,
+        prefilter_accepted=run.prefilter_accepted,
+        prefilter_rejected=run.prefilter_rejected,
+        model_scored=run.model_scored,
+        clusters=clusters,
+    )
 
-    # Process results
-    for i, (record_pair, similarity) in enumerate(zip(record_pairs, similarities)):
-        is_match = similarity >= match_threshold
 
-        prediction = MatchPrediction(
-            is_match=is_match,
-            match_probability=similarity,
-            confidence=_get_confidence_level(similarity),
-            similarity_score=similarity,
+def resolve_dataset_b(
+    request: BatchMatchRequest, model: Optional[EntityMatchingModel] = None
+) -> Tuple[Union[List[RecordBase], RecordStore], Optional[DatasetEmbeddings]]:
+    """
+    Get dataset_b of a batch request, loading its reference dataset if it names one.
+
+    Args:
+        request: Batch matching request
+        model: Model whose precomputed embeddings are looked up (global model if None)
+
+    Returns:
+        Tuple of (dataset_b, its precomputed embeddings or None)
+
+    Raises:
+        ValueError: If the request has both dataset_b records and a reference dataset
+        FileNotFoundError: If the reference dataset does not exist
+    """
+    if request.reference_dataset is None:
+        return request.dataset_b, None
+    if request.dataset_b:
+        raise ValueError("Give either dataset_b or reference_dataset, not both")
+
+    file_name = resolve_dataset_file(request.reference_dataset)
+    dataset_b = load_records_from_csv(os.path.join(get_dataset_catalog().data_dir, file_name))
+    return dataset_b, load_dataset_embeddings(request.reference_dataset, model)
+
+
+def validate_batch_request(request: BatchMatchRequest):
+    """
+    Check a batch request without loading its datasets or the model.
+
+    Args:
+        request: Batch matching request
+
+    Raises:
+        ValueError: If the scoring mode or blocking method is unknown, or the request
+            has both dataset_b records and a reference dataset
+        FileNotFoundError: If the reference dataset does not exist
+    """
+    scoring_mode = request.scoring_mode or settings.BATCH_SCORING_MODE
+    check_scoring_mode(scoring_mode)
+    if scoring_mode != "ann":
+        get_blocker(request.blocking)
+
+    if request.reference_dataset is None:
+        return
+    if request.dataset_b:
+        raise ValueError("Give either dataset_b or reference_dataset, not both")
+    file_name = resolve_dataset_file(request.reference_dataset)
+    if not os.path.exists(os.path.join(get_dataset_catalog().data_dir, file_name)):
+        raise FileNotFoundError(f"Dataset '{request.reference_dataset}' not found")
+
+
+def _collect_batch_results(
+    run: BatchMatchRun, include_explanations: bool, graph: Optional[MatchGraph]
+) -> Tuple[List[MatchResult], Optional[List[EntityCluster]]]:
+    """Score every chunk of a run and collect its match results and entity clusters."""
+    match_results = []
+    for scored_pairs in run.chunks():
+        if graph is not None:
+            graph.add(scored_pairs)
+        match_results.extend(
+            run.to_match_result(scored_pair, include_explanation=include_explanations)
+            for scored_pair in scored_pairs
         )
+    run.precompute_explanations()
 
-        explanation = None
-        if include_explanations and is_match:
-            # Only generate explanations for matches to save time
-            explanation = _generate_placeholder_explanation(record_pair)
+    if graph is None:
+        return match_results, None
+    return match_results, list(graph.clusters())
 
-        result = MatchResult(
-            prediction=prediction,
-            explanation=explanation,
-            record_pair=record_pair,
+
+def _score_by_pair(
+    model: EntityMatchingModel,
+    dataset_a: RecordStore,
+    dataset_b: RecordStore,
+    candidate_pairs: List[CandidatePair],
+) -> List[ScoredPair]:
+    """
+    Score candidate pairs by serializing and encoding each pair.
+
+    Args:
+        model: Entity matching model
+        dataset_a: First dataset
+        dataset_b: Second dataset
+        candidate_pairs: (index_a, index_b) pairs to score
+
+    Returns:
+        List of (index_a, index_b, similarity) for every candidate pair
+    """
+    text_pairs = []
+    for i, j in candidate_pairs:
+        record_a, record_b = dataset_a[i], dataset_b[j]
+        # Same texts as serialize_record_pair, without building a RecordPair
+        fields_order = sorted(set(record_a.fields) | set(record_b.fields))
+        text_pairs.append(
+            (serialize_record(record_a, fields_order), serialize_record(record_b, fields_order))
         )
+    similarities = model.predict_batch(text_pairs) if text_pairs else []
 
-        if is_match:
-            matches_found += 1
-            match_results.append(result)
+    return [(i, j, similarity) for (i, j), similarity in zip(candidate_pairs, similarities)]
 
-    processing_time = time.time() - start_time
 
-    return BatchMatchResult(
-        total_comparisons=comparison_count,
-        matches_found=matches_found,
-        match_results=match_results,
-        processing_time=processing_time,
-    )
+def _keep_top_k(scored_pairs: List[ScoredPair], top_k: int) -> List[ScoredPair]:
+    """Keep the top_k highest-scoring pairs per record of dataset_a."""
+    ranked = sorted(scored_pairs, key=lambda pair: (pair[0], -pair[2]))
+
+    kept = []
+    counts = defaultdict(int)
+    for pair in ranked:
+        if counts[pair[0]] < top_k:
+            counts[pair[0]] += 1
+            kept.append(pair)
+
+    return kept
 
 
 def _compute_placeholder_similarity(record_pair: RecordPair) -> float:
@@ -195,52 +718,3 @@ def _get_confidence_level(similarity: float) -> str:
         return "Medium"
     else:
         return "Low"
-
-
-def _generate_placeholder_explanation(record_pair: RecordPair) -> Explanation:
-    """
-    Generate a placeholder explanation.
-    This will be replaced with actual SHAP explanations.
-
-    Args:
-        record_pair: Pair of records
-
-    Returns:
-        Explanation: Placeholder SHAP explanation
-    """
-    fields_a = record_pair.record_a.fields
-    fields_b = record_pair.record_b.fields
-
-    feature_contributions = []
-    top_positive = []
-    top_negative = []
-
-    for field in set(fields_a.keys()) | set(fields_b.keys()):
-        value_a = fields_a.get(field, "")
-        value_b = fields_b.get(field, "")
-
-        # Placeholder contribution calculation
-        if value_a.lower() == value_b.lower():
-            contribution = 0.8
-            top_positive.append(field)
-        elif value_a.lower() in value_b.lower() or value_b.lower() in value_a.lower():
-            contribution = 0.4
-        else:
-            contribution = -0.3
-            top_negative.append(field)
-
-        feature_contributions.append(
-            FeatureContribution(
-                field_name=field,
-                contribution=contribution,
-                value_a=value_a,
-                value_b=value_b,
-            )
-        )
-
-    return Explanation(
-        method="SHAP",
-        feature_contributions=feature_contributions,
-        top_positive_features=top_positive[:5],
-        top_negative_features=top_negative[:5],
-    )
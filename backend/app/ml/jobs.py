@@ -0,0 +1,396 @@
+"""Background jobs for large batch matching runs.
+
+Jobs run on a local thread pool, with no external broker. Each job keeps
+its request, state and results under ``PROCESSED_DATA_DIR/jobs/<job_id>``:
+
+- ``request.json``: the BatchMatchRequest
+- ``state.json``: status and progress, rewritten atomically after every chunk
+- ``results.ndjson``: one MatchResult per line
+
+The state records how many chunks and result bytes are committed, so an
+interrupted job resumes from its last completed chunk.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.models.schemas import BatchMatchProgress, BatchMatchRequest, MatchJob, MatchResult
+from app.ml.executor import get_inference_executor
+from app.ml.explanation_store import get_explanation_store
+from app.ml.inference import BatchMatchRun, resolve_dataset_b, validate_batch_request
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+class MatchJobManager:
+    """Runs batch matching jobs in the background and persists their progress."""
+
+    def __init__(self, directory: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the job manager.
+
+        Args:
+            directory: Directory where job state and results are stored
+            max_workers: Number of jobs run concurrently
+        """
+        self.directory = directory or os.path.join(settings.PROCESSED_DATA_DIR, "jobs")
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or settings.JOB_WORKERS, thread_name_prefix="match-job"
+        )
+        # Guards the futures and every terminal status transition of a job
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._stopping = threading.Event()
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.directory, job_id)
+
+    def _read_state(self, job_id: str) -> dict:
+        path = os.path.join(self._job_dir(job_id), "state.json")
+        if not os.path.exists(path):
+            raise KeyError(job_id)
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_state(self, job_id: str, state: dict):
+        state["updated_at"] = time.time()
+        path = os.path.join(self._job_dir(job_id), "state.json")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def _read_request(self, job_id: str) -> BatchMatchRequest:
+        with open(os.path.join(self._job_dir(job_id), "request.json")) as f:
+            return BatchMatchRequest.model_validate_json(f.read())
+
+    def submit(self, request: BatchMatchRequest) -> MatchJob:
+        """
+        Queue a batch matching job.
+
+        Args:
+            request: Batch matching request
+
+        Returns:
+            MatchJob: The queued job
+
+        Raises:
+            ValueError: If the request has an unknown scoring mode or blocking method,
+                or asks for clustering
+            FileNotFoundError: If the request names an unknown reference dataset
+        """
+        if request.clustering is not None:
+            # A resumed job no longer has the pairs of its earlier chunks to cluster
+            raise ValueError(
+                "Jobs do not cluster their matches; "
+                "cluster the job results with POST /match/cluster instead"
+            )
+        # Validate up front so bad requests fail synchronously; loading the datasets
+        # is left to the worker
+        validate_batch_request(request)
+
+        job_id = uuid.uuid4().hex
+        os.makedirs(self._job_dir(job_id), exist_ok=True)
+        with open(os.path.join(self._job_dir(job_id), "request.json"), "w") as f:
+            f.write(request.model_dump_json())
+
+        now = time.time()
+        state = {
+            "job_id": job_id,
+            "status": QUEUED,
+            "created_at": now,
+            "updated_at": now,
+            "error": None,
+            "chunks_done": 0,
+            "total_chunks": 0,
+            "pairs_scored": 0,
+            "total_comparisons": 0,
+            "matches_found": 0,
+            "elapsed_time": 0.0,
+            "results_bytes": 0,
+        }
+        self._write_state(job_id, state)
+        self._schedule(job_id)
+
+        return _to_job(state)
+
+    def _schedule(self, job_id: str):
+        with self._lock:
+            self._cancel_events[job_id] = threading.Event()
+            self._futures[job_id] = self._executor.submit(self._run, job_id)
+
+    def get(self, job_id: str) -> MatchJob:
+        """
+        Get the status and progress of a job.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            MatchJob: Current job state
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        return _to_job(self._read_state(job_id))
+
+    def cancel(self, job_id: str) -> MatchJob:
+        """
+        Cancel a job. Running jobs stop after their current chunk.
+
+        Args:
+            job_id: Job identifier
+
+        Returns:
+            MatchJob: Job state after the cancellation request
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        # Workers record their final status under the same lock, so a job finishing
+        # concurrently is either seen as finished here or still has its future
+        with self._lock:
+            state = self._read_state(job_id)
+            if state["status"] not in ACTIVE_STATUSES:
+                return _to_job(state)
+
+            event = self._cancel_events.get(job_id)
+            future = self._futures.get(job_id)
+            if event is not None:
+                event.set()
+
+            # A job that never started has no worker to record the cancellation
+            if future is None or future.cancel():
+                state["status"] = CANCELLED
+                self._write_state(job_id, state)
+
+        return _to_job(state)
+
+    def iter_results(self, job_id: str) -> Iterator[str]:
+        """
+        Iterate over the committed result lines of a job.
+
+        Explanation handles only resolve while their pair is in the in-memory
+        explanation store, so the pair stored with each result is registered
+        again as it is read; the handle stays valid after a restart or eviction.
+
+        Args:
+            job_id: Job identifier
+
+        Yields:
+            NDJSON lines, one MatchResult each
+
+        Raises:
+            KeyError: If the job does not exist
+        """
+        committed = self._read_state(job_id)["results_bytes"]
+        path = os.path.join(self._job_dir(job_id), "results.ndjson")
+        if not committed or not os.path.exists(path):
+            return iter(())
+        explained = self._read_request(job_id).include_explanations
+
+        def lines():
+            remaining = committed
+            with open(path, "rb") as f:
+                for line in f:
+                    if remaining <= 0:
+                        break
+                    remaining -= len(line)
+                    yield _reregister_explanation(line) if explained else line.decode("utf-8")
+
+        return lines()
+
+    def resume_interrupted(self) -> List[str]:
+        """
+        Re-schedule jobs left queued or running by a previous process.
+
+        Returns:
+            List of resumed job ids
+        """
+        if not os.path.isdir(self.directory):
+            return []
+
+        resumed = []
+        for job_id in sorted(os.listdir(self.directory)):
+            with self._lock:
+                if job_id in self._futures:
+                    continue
+            try:
+                state = self._read_state(job_id)
+            except (KeyError, ValueError):
+                continue
+            if state["status"] in ACTIVE_STATUSES:
+                self._schedule(job_id)
+                resumed.append(job_id)
+
+        return resumed
+
+    def _run(self, job_id: str):
+        """Run (or resume) a job, checkpointing after every chunk."""
+        state = self._read_state(job_id)
+        if state["status"] not in ACTIVE_STATUSES:
+            return
+
+        cancel_event = self._cancel_events[job_id]
+        results_path = os.path.join(self._job_dir(job_id), "results.ndjson")
+
+        try:
+            request = self._read_request(job_id)
+            run = _build_run(request)
+
+            # Inference shares the request executor's workers; jobs queue, never get rejected
+            executor = get_inference_executor()
+            executor.submit(run.prepare).result()
+
+            state["status"] = RUNNING
+            state["total_chunks"] = run.num_chunks
+            state["total_comparisons"] = max(state["total_comparisons"], run.total_comparisons)
+            self._write_state(job_id, state)
+
+            session_start = time.time()
+            elapsed_before = state["elapsed_time"]
+
+            # Drop results of a chunk that was written but never committed
+            with open(results_path, "ab") as f:
+                f.truncate(state["results_bytes"])
+
+            with open(results_path, "ab") as f:
+                scored_before = run.comparisons_done
+                chunks = run.chunks(start_chunk=state["chunks_done"])
+                while (scored_pairs := executor.submit(next, chunks, None).result()) is not None:
+                    for scored_pair in scored_pairs:
+                        result = run.to_match_result(
+                            scored_pair, include_explanation=request.include_explanations
+                        )
+                        f.write((result.model_dump_json() + "\n").encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                    state["chunks_done"] = run.chunks_done
+                    state["pairs_scored"] += run.comparisons_done - scored_before
+                    state["matches_found"] += len(scored_pairs)
+                    state["results_bytes"] = f.tell()
+                    state["elapsed_time"] = elapsed_before + time.time() - session_start
+                    self._write_state(job_id, state)
+                    scored_before = run.comparisons_done
+
+                    if cancel_event.is_set():
+                        self._finish(job_id, state, CANCELLED)
+                        return
+                    if self._stopping.is_set():
+                        # Leave the job "running" so the next process resumes it
+                        return
+
+            run.precompute_explanations()
+            if run.scoring_mode == "ann":
+                # Probing may return fewer than k neighbours; report what was scored
+                state["total_comparisons"] = state["pairs_scored"]
+            self._finish(job_id, state, COMPLETED)
+        except Exception as e:
+            if self._stopping.is_set():
+                # Interrupted by shutdown: leave the job resumable
+                return
+            state["error"] = str(e)
+            self._finish(job_id, state, FAILED)
+        finally:
+            with self._lock:
+                self._futures.pop(job_id, None)
+                self._cancel_events.pop(job_id, None)
+
+    def _finish(self, job_id: str, state: dict, status: str):
+        """Record the final status of a job and forget its worker, atomically."""
+        with self._lock:
+            state["status"] = status
+            self._write_state(job_id, state)
+            self._futures.pop(job_id, None)
+            self._cancel_events.pop(job_id, None)
+
+    def wait(self, job_id: str, timeout: Optional[float] = None):
+        """Block until a scheduled job finishes (mainly for scripts and tests)."""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            future.result(timeout=timeout)
+
+    def shutdown(self):
+        """Stop the worker pool; running jobs stop after their current chunk and stay resumable."""
+        self._stopping.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _reregister_explanation(line: bytes) -> str:
+    """Register the pair of a stored result, updating its handle if the model changed."""
+    result = MatchResult.model_validate_json(line)
+    explanation_id = get_explanation_store().register(result.record_pair)
+    if explanation_id == result.explanation_id:
+        return line.decode("utf-8")
+    result.explanation_id = explanation_id
+    return result.model_dump_json() + "\n"
+
+
+def _build_run(request: BatchMatchRequest) -> BatchMatchRun:
+    """Create the batch matching run of a job request."""
+    dataset_b, embeddings_b = resolve_dataset_b(request)
+    return BatchMatchRun(
+        dataset_a=request.dataset_a,
+        dataset_b=dataset_b,
+        threshold=request.threshold,
+        blocking=request.blocking,
+        scoring_mode=request.scoring_mode,
+        top_k=request.top_k,
+        prefilter=request.prefilter,
+        embeddings_b=embeddings_b,
+    )
+
+
+def _to_job(state: dict) -> MatchJob:
+    """Convert a persisted job state into its API model."""
+    elapsed_time = state["elapsed_time"]
+    return MatchJob(
+        job_id=state["job_id"],
+        status=state["status"],
+        created_at=state["created_at"],
+        updated_at=state["updated_at"],
+        error=state["error"],
+        progress=BatchMatchProgress(
+            chunks_done=state["chunks_done"],
+            total_chunks=state["total_chunks"],
+            pairs_scored=state["pairs_scored"],
+            total_comparisons=state["total_comparisons"],
+            matches_found=state["matches_found"],
+            elapsed_time=elapsed_time,
+            pairs_per_second=state["pairs_scored"] / elapsed_time if elapsed_time > 0 else 0.0,
+        ),
+    )
+
+
+# Global job manager instance
+_job_manager = None
+
+
+def get_job_manager() -> MatchJobManager:
+    """
+    Get or create the global job manager.
+
+    Returns:
+        MatchJobManager: The global job manager
+    """
+    global _job_manager
+
+    if _job_manager is None:
+        _job_manager = MatchJobManager()
+
+    return _job_manager
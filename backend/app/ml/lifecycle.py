@@ -0,0 +1,180 @@
+"""Model lifecycle: startup preload, warm-up and readiness.
+
+Loading the sentence transformer (and downloading it on a fresh host) takes
+seconds, and the first forward passes at each sequence length are slower
+still while kernels and allocator pools warm up. The lifecycle manager does
+both in a background thread when the application starts; requests wait on
+its readiness event instead of loading the model themselves.
+
+States: idle -> loading -> warming -> ready, or failed. A failed load is
+retried by the next request once MODEL_RETRY_BACKOFF seconds have passed.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Optional
+
+from app.core.config import settings
+from app.ml.model import EntityMatchingModel, get_model
+
+IDLE = "idle"
+LOADING = "loading"
+WARMING = "warming"
+READY = "ready"
+FAILED = "failed"
+
+
+class ModelNotReadyError(RuntimeError):
+    """Raised when the model is still loading after the wait timeout, or failed to load."""
+
+
+def warm_up(model: EntityMatchingModel, seq_lengths=None, batch_size: Optional[int] = None):
+    """
+    Run dummy batches through the model at typical sequence lengths.
+
+    Args:
+        model: Loaded entity matching model
+        seq_lengths: Approximate token counts of the dummy texts
+            (settings.MODEL_WARMUP_SEQ_LENGTHS if None)
+        batch_size: Texts per dummy batch (settings.BATCH_SIZE if None)
+    """
+    seq_lengths = settings.MODEL_WARMUP_SEQ_LENGTHS if seq_lengths is None else seq_lengths
+    batch_size = batch_size or settings.BATCH_SIZE
+    for seq_length in seq_lengths:
+        # One word is about one token; stay within the model's maximum length
+        text = " ".join(["record"] * min(seq_length, settings.MAX_SEQ_LENGTH))
+        model.encode_uncached([text] * batch_size, batch_size=batch_size)
+
+
+class ModelLifecycle:
+    """Loads and warms up the global model once, in the background."""
+
+    def __init__(self):
+        """Initialize an idle lifecycle."""
+        self._lock = threading.Lock()
+        self._future: Future = Future()
+        self.state = IDLE
+        self.error: Optional[str] = None
+        self.failed_at: Optional[float] = None
+        self.device: Optional[str] = None
+        self.load_time: Optional[float] = None
+        self.warmup_time: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        """Whether the model is loaded and warmed up."""
+        return self.state == READY
+
+    def start(self):
+        """
+        Start loading the model in the background, unless already started.
+
+        A failed load is started again, with a new future, once the retry
+        backoff has passed; until then waiters get the failure immediately.
+        """
+        with self._lock:
+            if self.state == FAILED:
+                if time.time() - self.failed_at < settings.MODEL_RETRY_BACKOFF:
+                    return
+                self._future = Future()
+                self.error = None
+            elif self.state != IDLE:
+                return
+            self.state = LOADING
+            future = self._future
+        threading.Thread(
+            target=self._load, args=(future,), name="model-lifecycle", daemon=True
+        ).start()
+
+    def _load(self, future: Future):
+        """Load and warm up the global model, then resolve future."""
+        try:
+            model = get_model()
+            start_time = time.time()
+            model.ensure_loaded()
+            self.load_time = time.time() - start_time
+            self.device = model.device
+
+            self.state = WARMING
+            start_time = time.time()
+            warm_up(model)
+            self.warmup_time = time.time() - start_time
+
+            self.state = READY
+            future.set_result(model)
+        except Exception as e:
+            with self._lock:
+                self.error = str(e)
+                self.failed_at = time.time()
+                self.state = FAILED
+            future.set_exception(e)
+
+    def _unavailable(self, timeout: float) -> ModelNotReadyError:
+        if self.state == FAILED:
+            return ModelNotReadyError(f"Model failed to load: {self.error}")
+        return ModelNotReadyError(f"Model is not ready after {timeout}s (state: {self.state})")
+
+    def wait(self, timeout: Optional[float] = None) -> EntityMatchingModel:
+        """
+        Block until the model is ready, starting the load if needed.
+
+        Args:
+            timeout: Seconds to wait (settings.MODEL_READY_TIMEOUT if None)
+
+        Returns:
+            EntityMatchingModel: The ready global model
+
+        Raises:
+            ModelNotReadyError: If the model is not ready in time or failed to load
+        """
+        self.start()
+        timeout = settings.MODEL_READY_TIMEOUT if timeout is None else timeout
+        try:
+            return self._future.result(timeout)
+        except Exception:
+            raise self._unavailable(timeout)
+
+    async def wait_ready(self, timeout: Optional[float] = None) -> EntityMatchingModel:
+        """
+        Wait on the event loop until the model is ready, starting the load if needed.
+
+        Args:
+            timeout: Seconds to wait (settings.MODEL_READY_TIMEOUT if None)
+
+        Returns:
+            EntityMatchingModel: The ready global model
+
+        Raises:
+            ModelNotReadyError: If the model is not ready in time or failed to load
+        """
+        if self.ready:
+            return self._future.result()
+
+        self.start()
+        timeout = settings.MODEL_READY_TIMEOUT if timeout is None else timeout
+        try:
+            # Shielded: a timed-out waiter must not cancel the shared load
+            return await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(self._future)), timeout
+            )
+        except Exception:
+            raise self._unavailable(timeout)
+
+
+# Global model lifecycle
+_lifecycle_instance = None
+
+
+def get_model_lifecycle() -> ModelLifecycle:
+    """
+    Get or create the global model lifecycle.
+
+    Returns:
+        ModelLifecycle: The global lifecycle
+    """
+    global _lifecycle_instance
+    if _lifecycle_instance is None:
+        _lifecycle_instance = ModelLifecycle()
+    return _lifecycle_instance
@@ -0,0 +1,514 @@
+"""Incremental linkage against a persistent corpus.
+
+A corpus holds linked records together with everything needed to match new
+records against it: their normalized embeddings, their blocking keys and
+the current links. A delta of upserted and deleted records is matched only
+against the records it can link to, so the cost of a delta scales with its
+size rather than with the corpus.
+
+Each corpus lives in ``PROCESSED_DATA_DIR/corpora/<name>``:
+
+- ``config.json``: the LinkageCorpusConfig, model fingerprint and embedding size
+- ``vectors.f32``: append-only float32 matrix, read through ``np.memmap``
+- ``records.jsonl``: log of upserts (id, fields, blocking keys, vector row) and deletes
+- ``links.jsonl``: log of added, updated and removed links
+
+Vectors are written before the record log, so a torn write leaves only
+unused rows. Updated and deleted records leave dead rows in the vector file.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import (
+    LinkageCorpusConfig,
+    LinkageCorpusInfo,
+    LinkageDelta,
+    LinkageDeltaResult,
+    LinkChange,
+)
+from app.ml.ann_index import RecordIndex
+from app.ml.blocking import FullBlocker, SortedNeighbourhoodBlocker, get_blocker
+from app.ml.model import EntityMatchingModel, get_model
+from app.ml.preprocessing import serialize_records
+from app.ml.similarity import normalize_embeddings
+
+CORPUS_SCORING_MODES = ("record", "ann")
+
+_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Links are (smaller record id, larger record id)
+Link = Tuple[str, str]
+
+
+def _link(id_a: str, id_b: str) -> Link:
+    """Canonical key of the link between two records."""
+    return (id_a, id_b) if id_a <= id_b else (id_b, id_a)
+
+
+class LinkageCorpus:
+    """Persistent set of linked records, updated by deltas."""
+
+    def __init__(
+        self,
+        directory: str,
+        config: Optional[LinkageCorpusConfig] = None,
+        model: Optional[EntityMatchingModel] = None,
+    ):
+        """
+        Open a corpus, creating it if the directory holds none.
+
+        Args:
+            directory: Directory of the corpus
+            config: Configuration of a new corpus (ignored when opening an existing one)
+            model: Entity matching model (global model if None)
+
+        Raises:
+            ValueError: If the configuration is invalid, or the corpus was embedded
+                by different model weights
+        """
+        self.directory = directory
+        self.model = model or get_model()
+
+        self._config_path = os.path.join(directory, "config.json")
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._records_path = os.path.join(directory, "records.jsonl")
+        self._links_path = os.path.join(directory, "links.jsonl")
+
+        stored = {}
+        if os.path.exists(self._config_path):
+            with open(self._config_path) as f:
+                stored = json.load(f)
+            if stored["fingerprint"] != self.model.fingerprint:
+                raise ValueError(
+                    f"Corpus was embedded with '{stored['fingerprint']}', "
+                    f"not the current model '{self.model.fingerprint}'"
+                )
+            config = LinkageCorpusConfig(**stored["config"])
+
+        self.config = config or LinkageCorpusConfig()
+        self.threshold = self.config.threshold or settings.SIMILARITY_THRESHOLD
+        self.scoring_mode = self.config.scoring_mode or "record"
+        self.dim: Optional[int] = stored.get("dim")
+
+        if self.scoring_mode not in CORPUS_SCORING_MODES:
+            raise ValueError(
+                f"Unknown corpus scoring mode '{self.scoring_mode}'. "
+                f"Available: {', '.join(CORPUS_SCORING_MODES)}"
+            )
+
+        self.blocker = None
+        if self.scoring_mode == "record":
+            self.blocker = get_blocker(self.config.blocking)
+            if isinstance(self.blocker, (FullBlocker, SortedNeighbourhoodBlocker)):
+                # Neither has keys an inverted index can look up per record
+                raise ValueError(
+                    f"Blocking method '{self.blocker.method}' cannot be used incrementally; "
+                    "use a key-based method or scoring_mode 'ann'"
+                )
+
+        self.records: Dict[str, Dict[str, str]] = {}
+        self._rows: Dict[str, int] = {}
+        self._keys: Dict[str, List[str]] = {}
+        self._blocks: Dict[str, Set[str]] = defaultdict(set)
+        self._links: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._index: Optional[RecordIndex] = None
+        self._num_rows = 0
+        self._mmap: Optional[np.memmap] = None
+        self._lock = threading.Lock()
+
+        if stored:
+            self._load()
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self._save_config()
+
+    def _save_config(self):
+        """Persist the configuration, model fingerprint and embedding size."""
+        tmp_path = f"{self._config_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "config": self.config.model_dump(),
+                    "fingerprint": self.model.fingerprint,
+                    "dim": self.dim,
+                },
+                f,
+                indent=2,
+            )
+        os.replace(tmp_path, self._config_path)
+
+    def _load(self):
+        """Replay the record and link logs written by a previous process."""
+        if self.dim is None:
+            return
+
+        row_bytes = 4 * self.dim
+        self._num_rows = os.path.getsize(self._vectors_path) // row_bytes
+        if os.path.getsize(self._vectors_path) > self._num_rows * row_bytes:
+            # Drop a torn trailing row so appended rows stay aligned
+            os.truncate(self._vectors_path, self._num_rows * row_bytes)
+
+        for op in _read_log(self._records_path):
+            if op["op"] == "delete":
+                self._remove(op["id"])
+            elif op["row"] < self._num_rows:
+                self._remove(op["id"])
+                self._insert(op["id"], op["fields"], op["row"], op["keys"])
+
+        for event in _read_log(self._links_path):
+            id_a, id_b, similarity = event["id_a"], event["id_b"], event["similarity"]
+            if similarity is None:
+                self._unlink(id_a, id_b)
+            elif id_a in self.records and id_b in self.records:
+                self._links[id_a][id_b] = self._links[id_b][id_a] = similarity
+
+        if self.scoring_mode == "ann" and self.records:
+            ids = list(self.records)
+            self._index = RecordIndex()
+            self._index.build(ids, self._vectors([self._rows[i] for i in ids]))
+
+    def _insert(self, record_id: str, fields: Dict[str, str], row: int, keys: List[str]):
+        self.records[record_id] = fields
+        self._rows[record_id] = row
+        self._keys[record_id] = keys
+        for key in keys:
+            self._blocks[key].add(record_id)
+
+    def _remove(self, record_id: str):
+        if self.records.pop(record_id, None) is None:
+            return
+        del self._rows[record_id]
+        for key in self._keys.pop(record_id):
+            block = self._blocks[key]
+            block.discard(record_id)
+            if not block:
+                del self._blocks[key]
+
+    def _unlink(self, id_a: str, id_b: str):
+        self._links.get(id_a, {}).pop(id_b, None)
+        self._links.get(id_b, {}).pop(id_a, None)
+
+    def _vectors(self, rows: List[int]) -> np.ndarray:
+        """Read rows of the vector file, remapping it if it has grown."""
+        if self._mmap is None or len(self._mmap) < self._num_rows:
+            self._mmap = np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._num_rows, self.dim),
+            )
+        return self._mmap[rows]
+
+    def _append_vectors(self, vectors: np.ndarray) -> int:
+        """Append vectors to the vector file and return the row of the first one."""
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._save_config()
+
+        with open(self._vectors_path, "ab") as f:
+            f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+
+        first_row = self._num_rows
+        self._num_rows += len(vectors)
+        return first_row
+
+    def apply_delta(self, delta: LinkageDelta) -> LinkageDeltaResult:
+        """
+        Apply upserts and deletes, and re-link only the records they touch.
+
+        Deletes are applied before upserts. Links of changed records are
+        recomputed; the result lists the links that were added, updated
+        (score changed) or removed as a consequence.
+
+        Args:
+            delta: Records to upsert and IDs to delete
+
+        Returns:
+            LinkageDeltaResult: Counts and link changes
+
+        Raises:
+            ValueError: If an upserted record has no id
+        """
+        start_time = time.time()
+        if any(not record.id for record in delta.upserts):
+            raise ValueError("Every upserted record needs an id")
+
+        with self._lock:
+            # The last upsert of an id wins
+            upserts = list({record.id: record for record in delta.upserts}.values())
+            deletes = [i for i in dict.fromkeys(delta.deletes) if i in self.records]
+            updated = sum(1 for record in upserts if record.id in self.records)
+
+            before: Dict[Link, float] = {}
+            for record_id in set(deletes) | {record.id for record in upserts}:
+                for other, similarity in self._links.pop(record_id, {}).items():
+                    before[_link(record_id, other)] = similarity
+                    self._links.get(other, {}).pop(record_id, None)
+
+            ops = []
+            for record_id in deletes:
+                self._remove(record_id)
+                ops.append({"op": "delete", "id": record_id})
+            if self._index is not None:
+                self._index.remove(deletes)
+
+            after: Dict[Link, float] = {}
+            pairs_scored = 0
+            if upserts:
+                vectors = (
+                    normalize_embeddings(self.model.encode_unique(serialize_records(upserts)))
+                    .cpu()
+                    .numpy()
+                )
+                first_row = self._append_vectors(vectors)
+
+                for offset, record in enumerate(upserts):
+                    keys = sorted(self.blocker.block_keys(record)) if self.blocker else []
+                    self._remove(record.id)
+                    self._insert(record.id, dict(record.fields), first_row + offset, keys)
+                    ops.append(
+                        {
+                            "op": "upsert",
+                            "id": record.id,
+                            "fields": record.fields,
+                            "keys": keys,
+                            "row": first_row + offset,
+                        }
+                    )
+                if self.scoring_mode == "ann":
+                    if self._index is None:
+                        self._index = RecordIndex()
+                    self._index.add([record.id for record in upserts], vectors)
+
+                after, pairs_scored = self._match([record.id for record in upserts], vectors)
+
+            for (id_a, id_b), similarity in after.items():
+                self._links[id_a][id_b] = self._links[id_b][id_a] = similarity
+
+            link_changes = _diff_links(before, after)
+            _append_log(self._records_path, ops)
+            _append_log(
+                self._links_path,
+                [
+                    {
+                        "id_a": change.id_a,
+                        "id_b": change.id_b,
+                        "similarity": (None if change.change == "removed" else change.similarity),
+                    }
+                    for change in link_changes
+                ],
+            )
+
+            return LinkageDeltaResult(
+                inserted=len(upserts) - updated,
+                updated=updated,
+                deleted=len(deletes),
+                pairs_scored=pairs_scored,
+                num_records=len(self.records),
+                link_changes=link_changes,
+                processing_time=time.time() - start_time,
+            )
+
+    def _match(self, record_ids: List[str], vectors: np.ndarray) -> Tuple[Dict[Link, float], int]:
+        """Find the links of changed records among the whole corpus."""
+        links: Dict[Link, float] = {}
+        pairs_scored = 0
+
+        for record_id, vector in zip(record_ids, vectors):
+            if self._index is not None:
+                # One extra neighbour: the record finds itself
+                k = (self.config.top_k or settings.ANN_TOP_K) + 1
+                scored = [
+                    (other, similarity)
+                    for other, similarity in self._index.search(vector, k)[0]
+                    if other != record_id
+                ]
+            else:
+                candidates: Set[str] = set()
+                for key in self._keys[record_id]:
+                    block = self._blocks[key]
+                    if len(block) <= self.blocker.max_block_size:
+                        candidates |= block
+                candidates.discard(record_id)
+                candidates = sorted(candidates)
+                similarities = (
+                    np.clip(
+                        self._vectors([self._rows[i] for i in candidates]) @ vector,
+                        0.0,
+                        1.0,
+                    )
+                    if candidates
+                    else []
+                )
+                scored = list(zip(candidates, np.asarray(similarities).tolist()))
+
+            pairs_scored += len(scored)
+            matches = sorted(
+                (pair for pair in scored if pair[1] >= self.threshold),
+                key=lambda pair: -pair[1],
+            )
+            for other, similarity in matches[: self.config.top_k]:
+                links[_link(record_id, other)] = similarity
+
+        return links, pairs_scored
+
+    def links_of(self, record_id: str) -> Dict[str, float]:
+        """
+        Get the current links of a record.
+
+        Args:
+            record_id: Record ID
+
+        Returns:
+            Dict of linked record ID to similarity
+
+        Raises:
+            KeyError: If the record is not in the corpus
+        """
+        with self._lock:
+            if record_id not in self.records:
+                raise KeyError(record_id)
+            return dict(self._links.get(record_id, {}))
+
+    def info(self, name: str) -> LinkageCorpusInfo:
+        """
+        Summarize the corpus.
+
+        Args:
+            name: Name of the corpus
+
+        Returns:
+            LinkageCorpusInfo: Record and link counts and configuration
+        """
+        with self._lock:
+            return LinkageCorpusInfo(
+                name=name,
+                num_records=len(self.records),
+                num_links=sum(len(links) for links in self._links.values()) // 2,
+                config=self.config,
+            )
+
+
+def _diff_links(before: Dict[Link, float], after: Dict[Link, float]) -> List[LinkChange]:
+    """List links that were added, updated or removed between two link sets."""
+    changes = []
+    for id_a, id_b in sorted(set(before) | set(after)):
+        old, new = before.get((id_a, id_b)), after.get((id_a, id_b))
+        if new is None:
+            changes.append(LinkChange(id_a=id_a, id_b=id_b, similarity=old, change="removed"))
+        elif old is None:
+            changes.append(LinkChange(id_a=id_a, id_b=id_b, similarity=new, change="added"))
+        elif abs(new - old) > 1e-6:
+            changes.append(LinkChange(id_a=id_a, id_b=id_b, similarity=new, change="updated"))
+    return changes
+
+
+def _read_log(path: str):
+    """Yield the entries of a JSON-lines log, stopping at a torn last line."""
+    if not os.path.exists(path):
+        return
+    with open(path) as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                return
+
+
+def _append_log(path: str, entries: List[dict]):
+    """Append entries to a JSON-lines log."""
+    if not entries:
+        return
+    with open(path, "a") as f:
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+
+
+class CorpusRegistry:
+    """Opens linkage corpora by name and keeps them in memory."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            directory: Directory holding one subdirectory per corpus
+        """
+        self.directory = directory or os.path.join(settings.PROCESSED_DATA_DIR, "corpora")
+        self._corpora: Dict[str, LinkageCorpus] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> str:
+        if not _NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid corpus name '{name}': use letters, digits, '-' and '_'")
+        return os.path.join(self.directory, name)
+
+    def create(self, name: str, config: Optional[LinkageCorpusConfig] = None) -> LinkageCorpus:
+        """
+        Create an empty corpus.
+
+        Args:
+            name: Name of the corpus
+            config: Configuration of the corpus (settings defaults if None)
+
+        Returns:
+            LinkageCorpus: The new corpus
+
+        Raises:
+            FileExistsError: If a corpus with that name exists
+            ValueError: If the name or configuration is invalid
+        """
+        path = self._path(name)
+        with self._lock:
+            if name in self._corpora or os.path.exists(os.path.join(path, "config.json")):
+                raise FileExistsError(f"Corpus '{name}' already exists")
+            corpus = LinkageCorpus(path, config=config)
+            self._corpora[name] = corpus
+            return corpus
+
+    def get(self, name: str) -> LinkageCorpus:
+        """
+        Get a corpus, loading it from disk on first use.
+
+        Args:
+            name: Name of the corpus
+
+        Returns:
+            LinkageCorpus: The corpus
+
+        Raises:
+            FileNotFoundError: If no corpus has that name
+            ValueError: If the name is invalid or the corpus was embedded by another model
+        """
+        path = self._path(name)
+        with self._lock:
+            if name not in self._corpora:
+                if not os.path.exists(os.path.join(path, "config.json")):
+                    raise FileNotFoundError(f"Corpus '{name}' not found")
+                self._corpora[name] = LinkageCorpus(path)
+            return self._corpora[name]
+
+
+# Global corpus registry
+_registry_instance = None
+
+
+def get_corpus_registry() -> CorpusRegistry:
+    """
+    Get or create the global corpus registry.
+
+    Returns:
+        CorpusRegistry: The global registry
+    """
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = CorpusRegistry()
+    return _registry_instance
@@ -0,0 +1,133 @@
+"""Classification metrics of similarity scores against labels."""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from app.models.schemas import ThresholdPoint
+
+
+def metrics_at_threshold(scores: np.ndarray, labels: np.ndarray, threshold: float) -> Dict:
+    """
+    Compute classification metrics at a single threshold.
+
+    Args:
+        scores: Similarity of each pair
+        labels: 1 for matching pairs, 0 otherwise
+        threshold: Pairs scoring at least this are predicted as matches
+
+    Returns:
+        dict: Accuracy, precision, recall, F1 and the confusion counts
+    """
+    predicted = np.asarray(scores) >= threshold
+    actual = np.asarray(labels).astype(bool)
+
+    true_positives = int(np.sum(predicted & actual))
+    false_positives = int(np.sum(predicted & ~actual))
+    false_negatives = int(np.sum(~predicted & actual))
+    true_negatives = int(np.sum(~predicted & ~actual))
+
+    precision = true_positives / max(true_positives + false_positives, 1)
+    recall = true_positives / max(true_positives + false_negatives, 1)
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall > 0 else 0
+    return {
+        "accuracy": (true_positives + true_negatives) / max(len(actual), 1),
+        "precision": precision,
+        "recall": recall,
+        "f1_score": f1,
+        "true_positives": true_positives,
+        "false_positives": false_positives,
+        "false_negatives": false_negatives,
+        "true_negatives": true_negatives,
+    }
+
+
+def threshold_sweep(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    false_positive_cost: float = 1.0,
+    false_negative_cost: float = 1.0,
+    max_points: Optional[int] = None,
+) -> Dict:
+    """
+    Evaluate every distinct threshold in one vectorized pass.
+
+    The minimum-cost point also considers a threshold above every score,
+    predicting no match at all (precision 1, recall 0).
+
+    Args:
+        scores: Similarity of each pair
+        labels: 1 for matching pairs, 0 otherwise
+        false_positive_cost: Cost of predicting a non-matching pair as a match
+        false_negative_cost: Cost of missing a matching pair
+        max_points: Thin the returned curve to at most this many thresholds
+
+    Returns:
+        dict: ROC AUC, average precision, the best-F1 and minimum-cost
+        ThresholdPoints, and the curve of ThresholdPoints by descending threshold
+
+    Raises:
+        ValueError: If the labels hold no matching or no non-matching pair
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    actual = np.asarray(labels).astype(bool)
+    num_positives = int(actual.sum())
+    num_negatives = len(actual) - num_positives
+    if num_positives == 0 or num_negatives == 0:
+        raise ValueError("Labeled pairs must contain both matching and non-matching pairs")
+
+    order = np.argsort(-scores, kind="stable")
+    sorted_scores = scores[order]
+    sorted_labels = actual[order]
+
+    # Last position of each distinct score: predicting >= that score as matches
+    last = np.r_[np.flatnonzero(np.diff(sorted_scores)), len(sorted_scores) - 1]
+    thresholds = sorted_scores[last]
+    true_positives = np.cumsum(sorted_labels)[last]
+    false_positives = np.cumsum(~sorted_labels)[last]
+    false_negatives = num_positives - true_positives
+
+    precision = true_positives / (true_positives + false_positives)
+    recall = true_positives / num_positives
+    false_positive_rate = false_positives / num_negatives
+    f1 = 2 * true_positives / (2 * true_positives + false_positives + false_negatives)
+    cost = false_positives * false_positive_cost + false_negatives * false_negative_cost
+
+    def point(i: int) -> ThresholdPoint:
+        return ThresholdPoint(
+            threshold=float(thresholds[i]),
+            precision=float(precision[i]),
+            recall=float(recall[i]),
+            f1_score=float(f1[i]),
+            false_positive_rate=float(false_positive_rate[i]),
+            cost=float(cost[i]),
+        )
+
+    # Predicting no match only misses every matching pair; ties go to observed thresholds
+    min_cost = int(np.argmin(cost))
+    reject_all_cost = num_positives * false_negative_cost
+    if reject_all_cost < cost[min_cost]:
+        min_cost_point = ThresholdPoint(
+            threshold=float(np.nextafter(sorted_scores[0], np.inf)),
+            precision=1.0,
+            recall=0.0,
+            f1_score=0.0,
+            false_positive_rate=0.0,
+            cost=float(reject_all_cost),
+        )
+    else:
+        min_cost_point = point(min_cost)
+
+    points = np.arange(len(thresholds))
+    if max_points is not None and len(points) > max_points:
+        points = np.unique(np.linspace(0, len(thresholds) - 1, max_points).round().astype(int))
+
+    roc_fpr = np.r_[0.0, false_positive_rate]
+    roc_tpr = np.r_[0.0, recall]
+    return {
+        "roc_auc": float(np.sum(np.diff(roc_fpr) * (roc_tpr[1:] + roc_tpr[:-1]) / 2)),
+        "average_precision": float(np.sum(np.diff(np.r_[0.0, recall]) * precision)),
+        "best_f1": point(int(np.argmax(f1))),
+        "min_cost": min_cost_point,
+        "curve": [point(i) for i in points.tolist()],
+    }
@@ -0,0 +1,160 @@
+"""Dynamic micro-batching of single-pair similarity requests.
+
+Each ``/match/predict`` call only encodes two strings, which wastes most of
+the batched throughput of the sentence transformer. The micro-batcher
+collects concurrent requests and scores them with one ``predict_batch``
+call, flushing when ``max_batch_size`` requests are waiting or the oldest
+has waited ``max_wait_ms``, then fans the scores back out.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter, deque
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.ml.executor import get_inference_executor
+from app.ml.model import get_model
+
+# Pending requests are (text_a, text_b, future, enqueue time)
+_PendingRequest = Tuple[str, str, asyncio.Future, float]
+
+
+class MicroBatcher:
+    """Coalesces concurrent similarity requests into batched encoder calls."""
+
+    def __init__(self, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None):
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            max_batch_size: Flush as soon as this many requests are waiting
+            max_wait_ms: Flush once the oldest request has waited this long
+        """
+        self.max_batch_size = max_batch_size or settings.MICRO_BATCH_MAX_SIZE
+        self.max_wait_ms = (
+            max_wait_ms if max_wait_ms is not None else settings.MICRO_BATCH_MAX_WAIT_MS
+        )
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: List[_PendingRequest] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        self._metrics_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self._queue_delays_ms = deque(maxlen=1000)
+        self._requests = 0
+
+    async def similarity(self, text_a: str, text_b: str) -> float:
+        """
+        Compute the similarity of one text pair as part of a micro-batch.
+
+        Args:
+            text_a: First text
+            text_b: Second text
+
+        Returns:
+            float: Cosine similarity of the pair
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Pending state belongs to a single event loop
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((text_a, text_b, future, time.perf_counter()))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+        return await future
+
+    def _flush(self):
+        """Hand the pending requests to a scoring task."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._score(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _score(self, batch: List[_PendingRequest]):
+        """Score one micro-batch and resolve its futures."""
+        flushed_at = time.perf_counter()
+        with self._metrics_lock:
+            self._requests += len(batch)
+            self._batch_sizes[len(batch)] += 1
+            self._queue_delays_ms.extend(
+                (flushed_at - enqueued_at) * 1000 for _, _, _, enqueued_at in batch
+            )
+
+        try:
+            similarities = await get_inference_executor().run(
+                get_model().predict_batch, [(text_a, text_b) for text_a, text_b, _, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, _, future, _), similarity in zip(batch, similarities):
+            if not future.done():
+                future.set_result(similarity)
+
+    def stats(self) -> dict:
+        """
+        Get micro-batching metrics.
+
+        Returns:
+            dict: Batch-size distribution and queueing delay percentiles (ms)
+        """
+        with self._metrics_lock:
+            batches = sum(self._batch_sizes.values())
+            delays = np.asarray(self._queue_delays_ms, dtype=np.float64)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "requests": self._requests,
+                "batches": batches,
+                "mean_batch_size": self._requests / batches if batches else 0.0,
+                "batch_size_distribution": dict(sorted(self._batch_sizes.items())),
+                "queue_delay_ms": {
+                    "p50": float(np.percentile(delays, 50)) if len(delays) else 0.0,
+                    "p95": float(np.percentile(delays, 95)) if len(delays) else 0.0,
+                    "p99": float(np.percentile(delays, 99)) if len(delays) else 0.0,
+                    "max": float(delays.max()) if len(delays) else 0.0,
+                },
+            }
+
+
+# Global micro-batcher instance
+_micro_batcher = None
+
+
+def get_micro_batcher() -> MicroBatcher:
+    """
+    Get or create the global micro-batcher.
+
+    Returns:
+        MicroBatcher: The global micro-batcher
+    """
+    global _micro_batcher
+
+    if _micro_batcher is None:
+        _micro_batcher = MicroBatcher()
+
+    return _micro_batcher
@@ -1,49 +1,84 @@
 """BERT-based entity matching model."""
 
-import torch
-from sentence_transformers import SentenceTransformer
-from typing import Tuple, List
+import numpy as np
+from typing import TYPE_CHECKING, Tuple, List
 import os
+import threading
 
 from app.core.config import settings
+from app.ml.backends import load_sentence_transformer
+from app.ml.embedding_cache import EmbeddingCache, make_cache_key
+
+if TYPE_CHECKING:
+    import torch
 
 
 class EntityMatchingModel:
     """BERT-based entity matching model using sentence transformers."""
 
-    def __init__(self, model_name: str = None, device: str = None):
+    def __init__(self, model_name: str = None, device: str = None, backend: str = None):
         """
         Initialize the entity matching model.
 
         Args:
             model_name: Name of the pre-trained model
             device: Device to run on (cpu/cuda)
+            backend: Inference backend (torch, torch-int8, onnx or onnx-int8)
         """
         self.model_name = model_name or settings.MODEL_NAME
+        self.backend = backend or settings.MODEL_BACKEND
         self.device = device or self._get_device()
         self.model = None
         self.is_loaded = False
+        self._load_lock = threading.Lock()
+
+        # Identifies the current weights; part of every embedding cache key
+        self.fingerprint = _backend_fingerprint(self.model_name, self.backend)
+        self.embedding_cache = None
+        if settings.EMBEDDING_CACHE_SIZE > 0 or settings.EMBEDDING_CACHE_DIR:
+            self.embedding_cache = EmbeddingCache(
+                max_entries=settings.EMBEDDING_CACHE_SIZE,
+                directory=settings.EMBEDDING_CACHE_DIR,
+            )
+            self.embedding_cache.bind(self.fingerprint)
 
     def _get_device(self) -> str:
         """Get the appropriate device (CPU or CUDA)."""
-        if settings.DEVICE == "cuda" and torch.cuda.is_available():
+        if self.backend == "torch-int8":
+            return "cpu"
+        if settings.DEVICE != "cuda":
+            return "cpu"
+
+        import torch
+
+        if torch.cuda.is_available():
             return "cuda"
         return "cpu"
 
+    def ensure_loaded(self):
+        """Load the model on first use, only once even if called from several threads."""
+        if not self.is_loaded:
+            with self._load_lock:
+                if not self.is_loaded:
+                    self.load_model()
+
     def load_model(self):
         """Load the pre-trained sentence transformer model."""
         print(f"Loading model: {self.model_name}")
         print(f"Device: {self.device}")
+        print(f"Backend: {self.backend}")
 
         try:
-            self.model = SentenceTransformer(self.model_name, device=self.device)
+            self.model = load_sentence_transformer(
+                self.model_name, self.device, self.backend, fingerprint=self.fingerprint
+            )
             self.is_loaded = True
             print("Model loaded successfully!")
         except Exception as e:
             print(f"Error loading model: {e}")
             raise
 
-    def encode(self, texts: List[str], batch_size: int = None) -> torch.Tensor:
+    def encode(self, texts: List[str], batch_size: int = None) -> "torch.Tensor":
         """
         Encode texts into embeddings.
 
@@ -54,23 +89,84 @@ class EntityMatchingModel:
         Returns:
             torch.Tensor: Embeddings
         """
-        if not self.is_loaded:
-            self.load_model()
+        self.ensure_loaded()
 
         batch_size = batch_size or settings.BATCH_SIZE
 
-        embeddings = self.model.encode(
+        if self.embedding_cache is None or not texts:
+            return self.encode_uncached(texts, batch_size)
+
+        max_seq_length = getattr(self.model, "max_seq_length", settings.MAX_SEQ_LENGTH)
+        keys = [make_cache_key(self.fingerprint, max_seq_length, text) for text in texts]
+        vectors = self.embedding_cache.get_many(keys)
+
+        # Encode each missing text once, even if it occurs several times
+        missing = {}
+        for i, vector in enumerate(vectors):
+            if vector is None:
+                missing.setdefault(keys[i], i)
+
+        if missing:
+            new_vectors = (
+                self.encode_uncached([texts[i] for i in missing.values()], batch_size).cpu().numpy()
+            )
+            self.embedding_cache.put_many(list(missing), new_vectors)
+
+            new_by_key = dict(zip(missing, new_vectors))
+            vectors = [
+                new_by_key[key] if vector is None else vector for key, vector in zip(keys, vectors)
+            ]
+
+        import torch
+
+        return torch.from_numpy(np.stack(vectors)).to(self.device)
+
+    def encode_uncached(self, texts: List[str], batch_size: int = None) -> "torch.Tensor":
+        """
+        Run texts through the underlying sentence transformer, bypassing the cache.
+
+        Args:
+            texts: List of texts to encode
+            batch_size: Batch size for encoding
+
+        Returns:
+            torch.Tensor: Embeddings
+        """
+        self.ensure_loaded()
+
+        return self.model.encode(
             texts,
-            batch_size=batch_size,
+            batch_size=batch_size or settings.BATCH_SIZE,
             convert_to_tensor=True,
             show_progress_bar=False,
         )
 
-        return embeddings
+    def encode_unique(self, texts: List[str], batch_size: int = None) -> "torch.Tensor":
+        """
+        Encode texts, running each distinct text through the encoder only once.
+
+        Args:
+            texts: List of texts to encode (may contain duplicates)
+            batch_size: Batch size for encoding
+
+        Returns:
+            torch.Tensor: Embeddings aligned with texts
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        embeddings = self.encode(unique_texts, batch_size=batch_size)
+
+        if len(unique_texts) == len(texts):
+            return embeddings
+
+        import torch
+
+        positions = {text: i for i, text in enumerate(unique_texts)}
+        index = torch.tensor([positions[text] for text in texts], device=embeddings.device)
+        return embeddings.index_select(0, index)
 
     def compute_similarity(
         self, text_a: str, text_b: str
-    ) -> Tuple[float, torch.Tensor, torch.Tensor]:
+    ) -> Tuple[float, "torch.Tensor", "torch.Tensor"]:
         """
         Compute similarity between two texts.
 
@@ -81,8 +177,9 @@ class EntityMatchingModel:
         Returns:
             Tuple of (similarity_score, embedding_a, embedding_b)
         """
-        if not self.is_loaded:
-            self.load_model()
+        import torch
+
+        self.ensure_loaded()
 
         # Encode both texts
         embeddings = self.encode([text_a, text_b])
@@ -104,16 +201,18 @@ class EntityMatchingModel:
         Returns:
             List of similarity scores
         """
-        if not self.is_loaded:
-            self.load_model()
+        import torch
+
+        self.ensure_loaded()
 
         # Separate texts
         texts_a = [pair[0] for pair in text_pairs]
         texts_b = [pair[1] for pair in text_pairs]
 
-        # Encode all texts
-        embeddings_a = self.encode(texts_a)
-        embeddings_b = self.encode(texts_b)
+        # Encode every distinct text once, across both sides
+        embeddings = self.encode_unique(texts_a + texts_b)
+        embeddings_a = embeddings[: len(texts_a)]
+        embeddings_b = embeddings[len(texts_a) :]
 
         # Compute similarities
         similarities = torch.cosine_similarity(embeddings_a, embeddings_b)
@@ -147,11 +246,31 @@ class EntityMatchingModel:
             raise FileNotFoundError(f"Model not found at: {path}")
 
         print(f"Loading fine-tuned model from: {path}")
-        self.model = SentenceTransformer(path, device=self.device)
+        # New weights: embeddings cached for the previous weights no longer apply
+        self.fingerprint = _backend_fingerprint(_path_fingerprint(path), self.backend)
+        self.model = load_sentence_transformer(
+            path, self.device, self.backend, fingerprint=self.fingerprint
+        )
         self.is_loaded = True
+
+        if self.embedding_cache is not None:
+            self.embedding_cache.bind(self.fingerprint)
         print("Fine-tuned model loaded successfully!")
 
 
+def _path_fingerprint(path: str) -> str:
+    """Identify model weights on disk by path and latest modification time."""
+    mtimes = [os.path.getmtime(path)]
+    for root, _, files in os.walk(path):
+        mtimes.extend(os.path.getmtime(os.path.join(root, name)) for name in files)
+    return f"{os.path.abspath(path)}@{max(mtimes)}"
+
+
+def _backend_fingerprint(weights: str, backend: str) -> str:
+    """Qualify a weights identifier with the backend, whose embeddings differ slightly."""
+    return weights if backend == "torch" else f"{weights}#{backend}"
+
+
 # Global model instance
 _model_instance = None
 
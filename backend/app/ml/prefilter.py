@@ -0,0 +1,273 @@
+"""Classical string-metric pre-filter for candidate pairs.
+
+Most candidate pairs are either near-identical or clearly different, and a
+cheap comparison settles them without running the transformer. Each field
+present in both records is compared with:
+
+- numeric equality, if both values are numbers
+- date equality, if both values are dates
+- otherwise the mean of Jaro-Winkler, token Jaccard and normalized
+  Levenshtein similarity
+
+The pair score is the mean over compared fields. Pairs scoring at least
+the accept threshold are resolved as matches, pairs scoring at most the
+reject threshold as non-matches, and the rest are left to the model.
+"""
+
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+
+import jellyfish
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import RecordBase
+from app.ml.blocking import CandidatePair, field_value
+from app.ml.similarity import ScoredPair
+from app.utils.record_store import RecordStore
+
+ACCEPT = "accept"
+REJECT = "reject"
+AMBIGUOUS = "ambiguous"
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+_NUMBER_PATTERN = re.compile(r"[-+]?\d+(?:[.,]\d+)?")
+_DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%d/%m/%Y", "%m/%d/%Y", "%d.%m.%Y", "%Y%m%d")
+
+
+def jaro_winkler(value_a: str, value_b: str) -> float:
+    """Jaro-Winkler similarity of two strings."""
+    return jellyfish.jaro_winkler_similarity(value_a, value_b)
+
+
+def token_jaccard(value_a: str, value_b: str) -> float:
+    """Jaccard similarity of the word token sets of two strings."""
+    tokens_a = set(_TOKEN_PATTERN.findall(value_a))
+    tokens_b = set(_TOKEN_PATTERN.findall(value_b))
+    if not tokens_a and not tokens_b:
+        return 1.0 if value_a == value_b else 0.0
+    return len(tokens_a & tokens_b) / len(tokens_a | tokens_b)
+
+
+def levenshtein_similarity(value_a: str, value_b: str) -> float:
+    """Levenshtein distance normalized by the longer string, as a similarity."""
+    longest = max(len(value_a), len(value_b))
+    if longest == 0:
+        return 1.0
+    return 1.0 - jellyfish.levenshtein_distance(value_a, value_b) / longest
+
+
+def _parse_number(value: str) -> Optional[float]:
+    """Parse a value that is a single number, else None."""
+    if not _NUMBER_PATTERN.fullmatch(value):
+        return None
+    return float(value.replace(",", "."))
+
+
+def _parse_date(value: str) -> Optional[date]:
+    """Parse a value in one of the common date formats, else None."""
+    for date_format in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
+
+
+def field_similarity(value_a: str, value_b: str) -> float:
+    """
+    Compare two normalized field values.
+
+    Args:
+        value_a: Value from the first record
+        value_b: Value from the second record
+
+    Returns:
+        float: Similarity between 0 and 1
+    """
+    if value_a == value_b:
+        return 1.0
+
+    number_a, number_b = _parse_number(value_a), _parse_number(value_b)
+    if number_a is not None and number_b is not None:
+        return 1.0 if number_a == number_b else 0.0
+
+    date_a, date_b = _parse_date(value_a), _parse_date(value_b)
+    if date_a is not None and date_b is not None:
+        return 1.0 if date_a == date_b else 0.0
+
+    return (
+        jaro_winkler(value_a, value_b)
+        + token_jaccard(value_a, value_b)
+        + levenshtein_similarity(value_a, value_b)
+    ) / 3
+
+
+class PrefilterCascade:
+    """First stage of the scoring cascade: resolves clear-cut pairs without the model."""
+
+    def __init__(
+        self,
+        accept_threshold: Optional[float] = None,
+        reject_threshold: Optional[float] = None,
+        min_fields: Optional[int] = None,
+        fields: Optional[List[str]] = None,
+    ):
+        """
+        Initialize the pre-filter.
+
+        Args:
+            accept_threshold: Pairs scoring at least this are resolved as matches
+            reject_threshold: Pairs scoring at most this are resolved as non-matches
+            min_fields: Pairs with fewer comparable fields are always left to the model
+            fields: Fields to compare (all fields if None)
+
+        Raises:
+            ValueError: If the reject threshold is not below the accept threshold
+        """
+        self.accept_threshold = (
+            accept_threshold
+            if accept_threshold is not None
+            else settings.PREFILTER_ACCEPT_THRESHOLD
+        )
+        self.reject_threshold = (
+            reject_threshold
+            if reject_threshold is not None
+            else settings.PREFILTER_REJECT_THRESHOLD
+        )
+        self.min_fields = min_fields if min_fields is not None else settings.PREFILTER_MIN_FIELDS
+        self.fields = fields
+
+        if self.reject_threshold >= self.accept_threshold:
+            raise ValueError(
+                f"Pre-filter reject threshold ({self.reject_threshold}) must be below "
+                f"the accept threshold ({self.accept_threshold})"
+            )
+
+    def score_pairs(
+        self,
+        dataset_a: List[RecordBase],
+        dataset_b: List[RecordBase],
+        pairs: List[CandidatePair],
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Compute classical similarity scores of candidate pairs.
+
+        Each distinct (value_a, value_b) combination of a field is compared
+        once; per-field scores are then averaged with NumPy.
+
+        Args:
+            dataset_a: First dataset
+            dataset_b: Second dataset
+            pairs: (index_a, index_b) pairs to score
+
+        Returns:
+            Tuple of (scores, compared field counts), each of shape (len(pairs),)
+        """
+        if self.fields:
+            fields = self.fields
+        elif isinstance(dataset_a, RecordStore) and isinstance(dataset_b, RecordStore):
+            fields = sorted(set(dataset_a.fields) & set(dataset_b.fields))
+        else:
+            fields = sorted(
+                {field for i, _ in pairs for field in dataset_a[i].fields}
+                & {field for _, j in pairs for field in dataset_b[j].fields}
+            )
+
+        totals = np.zeros(len(pairs), dtype=np.float64)
+        counts = np.zeros(len(pairs), dtype=np.int64)
+
+        used_a = {i for i, _ in pairs}
+        used_b = {j for _, j in pairs}
+
+        for field in fields:
+            # Normalize each record's value once, however many pairs it is in
+            values_a = {i: field_value(dataset_a[i], field) for i in used_a}
+            values_b = {j: field_value(dataset_b[j], field) for j in used_b}
+
+            cache: Dict[Tuple[str, str], float] = {}
+            scores = np.full(len(pairs), np.nan, dtype=np.float64)
+            for position, (i, j) in enumerate(pairs):
+                value_a, value_b = values_a[i], values_b[j]
+                if not value_a or not value_b:
+                    continue
+                key = (value_a, value_b)
+                if key not in cache:
+                    cache[key] = field_similarity(value_a, value_b)
+                scores[position] = cache[key]
+
+            compared = ~np.isnan(scores)
+            totals += np.where(compared, scores, 0.0)
+            counts += compared
+
+        scores = np.divide(totals, counts, out=np.zeros_like(totals), where=counts > 0)
+        return scores, counts
+
+    def decisions(self, scores: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """
+        Decide which pairs the pre-filter resolves.
+
+        Args:
+            scores: Classical pair scores
+            counts: Number of fields compared per pair
+
+        Returns:
+            Array of ACCEPT, REJECT or AMBIGUOUS per pair
+        """
+        decisions = np.full(len(scores), AMBIGUOUS, dtype=object)
+        enough_fields = counts >= self.min_fields
+        decisions[enough_fields & (scores >= self.accept_threshold)] = ACCEPT
+        decisions[enough_fields & (scores <= self.reject_threshold)] = REJECT
+        return decisions
+
+    def split(
+        self,
+        dataset_a: List[RecordBase],
+        dataset_b: List[RecordBase],
+        pairs: List[CandidatePair],
+    ) -> Tuple[List[ScoredPair], List[CandidatePair], List[CandidatePair]]:
+        """
+        Resolve clear-cut pairs and pass the rest on.
+
+        Args:
+            dataset_a: First dataset
+            dataset_b: Second dataset
+            pairs: Sorted (index_a, index_b) candidate pairs
+
+        Returns:
+            Tuple of (accepted pairs with their classical score, rejected pairs,
+            ambiguous pairs); all lists keep the input order
+        """
+        if not pairs:
+            return [], [], []
+
+        scores, counts = self.score_pairs(dataset_a, dataset_b, pairs)
+        decisions = self.decisions(scores, counts)
+
+        accepted = []
+        rejected = []
+        ambiguous = []
+        for (i, j), score, decision in zip(pairs, scores.tolist(), decisions):
+            if decision == ACCEPT:
+                accepted.append((i, j, score))
+            elif decision == REJECT:
+                rejected.append((i, j))
+            else:
+                ambiguous.append((i, j))
+
+        return accepted, rejected, ambiguous
+
+    def classify(self, record_a: RecordBase, record_b: RecordBase) -> Tuple[str, float]:
+        """
+        Classify a single record pair.
+
+        Args:
+            record_a: First record
+            record_b: Second record
+
+        Returns:
+            Tuple of (ACCEPT, REJECT or AMBIGUOUS, classical score)
+        """
+        scores, counts = self.score_pairs([record_a], [record_b], [(0, 0)])
+        return self.decisions(scores, counts)[0], float(scores[0])
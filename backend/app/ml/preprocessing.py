@@ -1,9 +1,10 @@
 """Data preprocessing utilities for entity matching."""
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import re
 
 from app.models.schemas import RecordBase, RecordPair
+from app.utils.record_store import RecordStore
 
 
 def serialize_record(record: RecordBase, fields_order: List[str] = None) -> str:
@@ -37,6 +38,29 @@ def serialize_record(record: RecordBase, fields_order: List[str] = None) -> str:
     return " | ".join(parts)
 
 
+def serialize_records(
+    records: Sequence[RecordBase], indices: Optional[Sequence[int]] = None
+) -> List[str]:
+    """
+    Serialize several records for BERT encoding.
+
+    Record stores are serialized column by column; other sequences record by record.
+
+    Args:
+        records: A RecordStore or a sequence of records
+        indices: Positions of the records to serialize (all if None)
+
+    Returns:
+        List[str]: Serialized record texts
+    """
+    if isinstance(records, RecordStore):
+        return records.serialize(indices)
+
+    if indices is None:
+        return [serialize_record(record) for record in records]
+    return [serialize_record(records[i]) for i in indices]
+
+
 def serialize_record_pair(record_pair: RecordPair, add_sep: bool = True) -> str:
     """
     Serialize a record pair for BERT encoding.
@@ -0,0 +1,108 @@
+"""Vectorized cosine similarity scoring over record embeddings."""
+
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    import torch
+
+# Scored pairs are (index in dataset_a, index in dataset_b, similarity)
+ScoredPair = Tuple[int, int, float]
+
+
+def normalize_embeddings(embeddings: "torch.Tensor") -> "torch.Tensor":
+    """
+    L2-normalize embeddings so that dot products are cosine similarities.
+
+    Args:
+        embeddings: Embeddings of shape (n, dim)
+
+    Returns:
+        torch.Tensor: Normalized embeddings
+    """
+    import torch.nn.functional as F
+
+    return F.normalize(embeddings.float(), p=2, dim=1)
+
+
+def score_pairs(
+    embeddings_a: "torch.Tensor",
+    embeddings_b: "torch.Tensor",
+    pairs: List[Tuple[int, int]],
+    chunk_size: Optional[int] = None,
+) -> List[float]:
+    """
+    Compute cosine similarity for explicit (index_a, index_b) pairs.
+
+    Args:
+        embeddings_a: Normalized embeddings of dataset_a
+        embeddings_b: Normalized embeddings of dataset_b
+        pairs: Candidate pairs to score
+        chunk_size: Number of pairs scored per vectorized step
+
+    Returns:
+        List of similarity scores, aligned with pairs
+    """
+    chunk_size = chunk_size or settings.SIMILARITY_CHUNK_SIZE
+    if not pairs:
+        return []
+
+    import torch
+
+    index = torch.tensor(pairs, dtype=torch.long, device=embeddings_a.device)
+
+    scores = []
+    for start in range(0, len(pairs), chunk_size):
+        chunk = index[start : start + chunk_size]
+        rows_a = embeddings_a.index_select(0, chunk[:, 0])
+        rows_b = embeddings_b.index_select(0, chunk[:, 1])
+        scores.append((rows_a * rows_b).sum(dim=1))
+
+    return torch.cat(scores).clamp(0.0, 1.0).tolist()
+
+
+def threshold_matches(
+    embeddings_a: "torch.Tensor",
+    embeddings_b: "torch.Tensor",
+    threshold: float,
+    top_k: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> List[ScoredPair]:
+    """
+    Find all pairs above a threshold with a chunked similarity matrix product.
+
+    Only ``chunk_size x len(embeddings_b)`` scores are held in memory at a time.
+
+    Args:
+        embeddings_a: Normalized embeddings of dataset_a
+        embeddings_b: Normalized embeddings of dataset_b
+        threshold: Minimum similarity to keep a pair
+        top_k: Keep at most this many matches per record of dataset_a
+        chunk_size: Number of dataset_a rows scored per matrix product
+
+    Returns:
+        List of (index_a, index_b, similarity) for pairs at or above threshold
+    """
+    chunk_size = chunk_size or settings.SIMILARITY_CHUNK_SIZE
+    if len(embeddings_a) == 0 or len(embeddings_b) == 0:
+        return []
+
+    matches: List[ScoredPair] = []
+    for start in range(0, len(embeddings_a), chunk_size):
+        scores = embeddings_a[start : start + chunk_size] @ embeddings_b.T
+        scores = scores.clamp(0.0, 1.0)
+
+        if top_k is not None and top_k < scores.shape[1]:
+            top_scores, top_columns = scores.topk(k=top_k, dim=1)
+            keep = top_scores >= threshold
+            rows = keep.nonzero(as_tuple=True)[0]
+            columns = top_columns[keep]
+            values = top_scores[keep]
+        else:
+            rows, columns = (scores >= threshold).nonzero(as_tuple=True)
+            values = scores[rows, columns]
+
+        matches.extend(zip((rows + start).tolist(), columns.tolist(), values.tolist()))
+
+    return matches
@@ -0,0 +1,244 @@
+"""Similarity threshold optimization on labeled pair datasets.
+
+A labeled dataset is scored once: every distinct serialized record is
+encoded a single time (through the embedding cache), and the similarity of
+each pair is a row-wise dot product. Every threshold is then evaluated in
+one pass: pairs are sorted by descending score and cumulative sums of the
+labels give the true and false positives at each distinct score.
+
+Results are stored under ``PROCESSED_DATA_DIR/thresholds``, keyed by the
+dataset's content hash, the model fingerprint and the error costs.
+Datasets too large to score within a request are optimized in the
+background; polling the endpoint returns the result once it is stored.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.models.schemas import ThresholdOptimizationResult
+from app.ml.executor import get_inference_executor
+from app.ml.metrics import threshold_sweep
+from app.ml.model import EntityMatchingModel, get_model
+from app.ml.similarity import normalize_embeddings
+from app.utils.data_loader import resolve_dataset_file
+from app.utils.dataset_catalog import get_dataset_catalog
+
+logger = logging.getLogger(__name__)
+
+
+def score_labeled_pairs(
+    model: EntityMatchingModel, dataset_path: str, chunk_size: int = 4096
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every pair of a labeled pair file, encoding each distinct text once.
+
+    Args:
+        model: Entity matching model
+        dataset_path: Path to a CSV with a label column and field_a/field_b columns
+        chunk_size: Number of texts encoded per step
+
+    Returns:
+        Tuple of (similarity of each pair, label of each pair)
+    """
+    # The training module pulls in sentence-transformers; only load it when scoring
+    from app.ml.training import load_labeled_pairs
+
+    pairs = load_labeled_pairs(dataset_path)
+    texts_a = pairs.column("text_a").to_pylist()
+    texts_b = pairs.column("text_b").to_pylist()
+
+    unique_texts = list(dict.fromkeys(texts_a + texts_b))
+    rows = {text: row for row, text in enumerate(unique_texts)}
+    embeddings = np.concatenate(
+        [
+            normalize_embeddings(model.encode(unique_texts[start : start + chunk_size]))
+            .cpu()
+            .numpy()
+            for start in range(0, len(unique_texts), chunk_size)
+        ]
+    )
+
+    rows_a = np.fromiter((rows[text] for text in texts_a), dtype=np.int64, count=len(texts_a))
+    rows_b = np.fromiter((rows[text] for text in texts_b), dtype=np.int64, count=len(texts_b))
+    scores = np.clip(np.einsum("ij,ij->i", embeddings[rows_a], embeddings[rows_b]), 0.0, 1.0)
+    return scores, pairs.column("label").to_numpy() >= 0.5
+
+
+def optimize_threshold(
+    dataset_name: str,
+    false_positive_cost: float = 1.0,
+    false_negative_cost: float = 1.0,
+    model: Optional[EntityMatchingModel] = None,
+) -> ThresholdOptimizationResult:
+    """
+    Find the best-F1 and minimum-cost thresholds of a labeled dataset.
+
+    Args:
+        dataset_name: Name of the labeled dataset (built-in or uploaded)
+        false_positive_cost: Cost of predicting a non-matching pair as a match
+        false_negative_cost: Cost of missing a matching pair
+        model: Entity matching model (global model if None)
+
+    Returns:
+        ThresholdOptimizationResult: Curves and optimal thresholds
+
+    Raises:
+        FileNotFoundError: If the dataset does not exist
+        ValueError: If the dataset has no label column or lacks one of the classes
+    """
+    start_time = time.time()
+    model = model or get_model()
+    file_name = resolve_dataset_file(dataset_name)
+
+    scores, labels = score_labeled_pairs(
+        model, os.path.join(get_dataset_catalog().data_dir, file_name)
+    )
+    sweep = threshold_sweep(
+        scores,
+        labels,
+        false_positive_cost=false_positive_cost,
+        false_negative_cost=false_negative_cost,
+        max_points=settings.THRESHOLD_CURVE_POINTS,
+    )
+
+    return ThresholdOptimizationResult(
+        dataset_name=dataset_name,
+        num_pairs=len(scores),
+        num_matches=int(labels.sum()),
+        false_positive_cost=false_positive_cost,
+        false_negative_cost=false_negative_cost,
+        processing_time=time.time() - start_time,
+        **sweep,
+    )
+
+
+class ThresholdOptimizer:
+    """Runs threshold optimizations, in the background for large datasets, and stores them."""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the optimizer.
+
+        Args:
+            directory: Directory where results are stored
+        """
+        self.directory = directory or os.path.join(settings.PROCESSED_DATA_DIR, "thresholds")
+        self._lock = threading.Lock()
+        self._futures: Dict[str, Future] = {}
+
+    def _key(self, dataset_name: str, false_positive_cost: float, false_negative_cost: float):
+        """Identify an optimization by dataset content, model weights and costs."""
+        file_name = resolve_dataset_file(dataset_name)
+        entry = get_dataset_catalog().get(file_name)
+        if entry is None:
+            raise FileNotFoundError(f"Dataset file not found: {file_name}")
+
+        identity = (
+            f"{entry['content_hash']}:{get_model().fingerprint}:"
+            f"{false_positive_cost}:{false_negative_cost}"
+        )
+        return hashlib.sha256(identity.encode("utf-8")).hexdigest()[:24], entry
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _store(self, key: str, result: ThresholdOptimizationResult):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self._path(key)}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(result.model_dump_json())
+        os.replace(tmp_path, self._path(key))
+
+    def _load(self, key: str) -> Optional[ThresholdOptimizationResult]:
+        if not os.path.exists(self._path(key)):
+            return None
+        with open(self._path(key)) as f:
+            return ThresholdOptimizationResult(**json.load(f))
+
+    def _run(self, key: str, *args) -> ThresholdOptimizationResult:
+        result = optimize_threshold(*args)
+        self._store(key, result)
+        return result
+
+    async def get(
+        self, dataset_name: str, false_positive_cost: float = 1.0, false_negative_cost: float = 1.0
+    ) -> Optional[ThresholdOptimizationResult]:
+        """
+        Get the optimization of a dataset, computing it if needed.
+
+        Datasets with at most THRESHOLD_SYNC_MAX_PAIRS pairs are optimized
+        within the call; larger ones are started in the background.
+
+        Args:
+            dataset_name: Name of the labeled dataset
+            false_positive_cost: Cost of predicting a non-matching pair as a match
+            false_negative_cost: Cost of missing a matching pair
+
+        Returns:
+            The result, or None while a background optimization is running
+
+        Raises:
+            FileNotFoundError: If the dataset does not exist
+            ValueError: If the dataset cannot be optimized
+            InferenceOverloadedError: If a small dataset cannot be admitted for scoring
+        """
+        # The catalog hashes and counts new or modified dataset files
+        key, entry = await asyncio.to_thread(
+            self._key, dataset_name, false_positive_cost, false_negative_cost
+        )
+        stored = await asyncio.to_thread(self._load, key)
+        if stored is not None:
+            with self._lock:
+                self._futures.pop(key, None)
+            return stored
+
+        args = (key, dataset_name, false_positive_cost, false_negative_cost)
+        if entry["num_records"] <= settings.THRESHOLD_SYNC_MAX_PAIRS:
+            return await get_inference_executor().run(self._run, *args)
+
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None:
+                # Background runs queue for a worker instead of being rejected
+                future = get_inference_executor().submit(self._run, *args)
+                future.add_done_callback(lambda done: _log_failure(dataset_name, done))
+                self._futures[key] = future
+            if not future.done():
+                return None
+            del self._futures[key]
+
+        # Raises the error of a failed run; the next call starts a new one
+        return future.result()
+
+
+def _log_failure(dataset_name: str, future: Future):
+    """Log the error of a failed background optimization."""
+    if future.exception() is not None:
+        logger.error(f"Threshold optimization of {dataset_name} failed: {future.exception()}")
+
+
+# Global threshold optimizer
+_optimizer_instance = None
+
+
+def get_threshold_optimizer() -> ThresholdOptimizer:
+    """
+    Get or create the global threshold optimizer.
+
+    Returns:
+        ThresholdOptimizer: The global optimizer
+    """
+    global _optimizer_instance
+    if _optimizer_instance is None:
+        _optimizer_instance = ThresholdOptimizer()
+    return _optimizer_instance
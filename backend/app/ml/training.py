@@ -1,12 +1,33 @@
 """Training pipeline for entity matching model."""
 
+import os
+import random
+import torch
 from torch.utils.data import Dataset, DataLoader
 from sentence_transformers import InputExample, losses
-from typing import List, Tuple
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as pa_ipc
 
+from app.ml.ann_index import RecordIndex
+from app.ml.metrics import metrics_at_threshold
 from app.ml.model import EntityMatchingModel
+from app.ml.similarity import normalize_embeddings
 from app.core.config import settings
+from app.utils.dataset_catalog import file_hash
+from app.utils.record_store import RecordStore
+
+TRAINING_LOSSES = ("cosine", "mnrl")
+
+# Bump when serialization changes, so cached pairs are rebuilt
+_SERIALIZATION_VERSION = 1
+_CHUNK_ROWS = 100_000
+
+_PAIRS_SCHEMA = pa.schema(
+    [("text_a", pa.string()), ("text_b", pa.string()), ("label", pa.float64())]
+)
 
 
 class RecordPairDataset(Dataset):
@@ -28,6 +49,111 @@ class RecordPairDataset(Dataset):
         return self.pairs[idx]
 
 
+def labeled_pair_fields(columns: Sequence[str]) -> List[str]:
+    """
+    Get the fields of a labeled pair file that have a column on both sides.
+
+    Columns are named like field1_a, field1_b, field2_a, field2_b, etc.
+
+    Args:
+        columns: Column names of the file
+
+    Returns:
+        Sorted field names
+    """
+    column_set = set(columns)
+    return sorted(
+        column[:-2]
+        for column in columns
+        if column.endswith("_a") and f"{column[:-2]}_b" in column_set
+    )
+
+
+def labeled_pairs_cache_path(dataset_path: str, content_hash: str) -> str:
+    """
+    Get the path of the serialized pairs cached for a labeled pair file.
+
+    Args:
+        dataset_path: Path to the labeled pair CSV
+        content_hash: SHA-256 of the file's content
+
+    Returns:
+        str: Path under PROCESSED_DATA_DIR/training
+    """
+    stem = os.path.splitext(os.path.basename(dataset_path))[0]
+    return os.path.join(
+        settings.PROCESSED_DATA_DIR,
+        "training",
+        f"{stem}-{content_hash[:16]}-v{_SERIALIZATION_VERSION}.arrow",
+    )
+
+
+def _serialize_side(chunk: pd.DataFrame, fields: List[str], side: str) -> List[str]:
+    """Serialize one side of a chunk of labeled pairs, column by column."""
+    if not fields:
+        return [""] * len(chunk)
+    store = RecordStore.from_columns(
+        {field: chunk[f"{field}_{side}"].to_numpy(dtype=object) for field in fields}
+    )
+    return store.serialize()
+
+
+def _serialize_chunk(chunk: pd.DataFrame, fields: List[str]) -> pa.RecordBatch:
+    """Serialize a chunk of labeled pairs into a record batch."""
+    return pa.record_batch(
+        [
+            pa.array(_serialize_side(chunk, fields, "a"), pa.string()),
+            pa.array(_serialize_side(chunk, fields, "b"), pa.string()),
+            pa.array(chunk["label"].astype(float).to_numpy(), pa.float64()),
+        ],
+        schema=_PAIRS_SCHEMA,
+    )
+
+
+def load_labeled_pairs(dataset_path: str, chunk_size: int = _CHUNK_ROWS) -> pa.Table:
+    """
+    Load the serialized record pairs and labels of a labeled pair CSV file.
+
+    Records are serialized like at inference time (preprocessing.serialize_record),
+    one column at a time. The file is read in chunks of rows and the result
+    is written to an Arrow file keyed by the CSV's content hash, so a file is
+    only serialized once and later loads memory-map the cache.
+
+    Args:
+        dataset_path: Path to a CSV with a label column and field_a/field_b columns
+        chunk_size: Number of rows read and serialized per step
+
+    Returns:
+        pa.Table: Columns text_a, text_b (strings) and label (float)
+
+    Raises:
+        ValueError: If the file has no label column
+    """
+    cache_path = labeled_pairs_cache_path(dataset_path, file_hash(dataset_path))
+    if not os.path.exists(cache_path):
+        columns = pd.read_csv(dataset_path, nrows=0).columns
+        if "label" not in columns:
+            raise ValueError(f"Labeled pair data must have a 'label' column: {dataset_path}")
+        fields = labeled_pair_fields(columns)
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp-{os.getpid()}"
+        try:
+            with pa.OSFile(tmp_path, "wb") as sink:
+                with pa_ipc.new_file(sink, _PAIRS_SCHEMA) as writer:
+                    for chunk in pd.read_csv(
+                        dataset_path, dtype=str, keep_default_na=False, chunksize=chunk_size
+                    ):
+                        writer.write_batch(_serialize_chunk(chunk, fields))
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    with pa.memory_map(cache_path, "r") as source:
+        return pa_ipc.open_file(source).read_all()
+
+
 def load_training_data(
     dataset_path: str,
 ) -> List[InputExample]:
@@ -44,46 +170,112 @@ def load_training_data(
     Returns:
         List of InputExample for training
     """
-    df = pd.read_csv(dataset_path)
+    pairs = load_labeled_pairs(dataset_path)
+    return [
+        InputExample(texts=[text_a, text_b], label=label)
+        for text_a, text_b, label in zip(
+            pairs.column("text_a").to_pylist(),
+            pairs.column("text_b").to_pylist(),
+            pairs.column("label").to_pylist(),
+        )
+    ]
+
+
+def _encode_texts(model: EntityMatchingModel, texts: List[str], chunk_size: int) -> np.ndarray:
+    """Encode texts with the current weights, bypassing the embedding cache."""
+    # The cache is keyed by the model fingerprint, which fine-tuning does not change
+    return np.concatenate(
+        [
+            normalize_embeddings(model.encode_uncached(texts[start : start + chunk_size]))
+            .cpu()
+            .numpy()
+            for start in range(0, len(texts), chunk_size)
+        ]
+    )
+
+
+def mine_hard_negatives(
+    model: EntityMatchingModel,
+    anchors: List[str],
+    positives: List[str],
+    corpus: List[str],
+    num_negatives: int = 1,
+    num_candidates: int = 10,
+    chunk_size: int = 4096,
+) -> List[InputExample]:
+    """
+    Pair every matching pair with the non-matching texts the model finds closest.
 
-    if "label" not in df.columns:
-        raise ValueError("Training data must have a 'label' column")
+    The corpus is encoded with the model's current weights and indexed with
+    an IVF index; the nearest neighbours of each anchor that are not one of
+    its known matches become its hard negatives. Matches are transitive: a
+    text linked to the anchor through other matching pairs is not a negative.
+
+    Args:
+        model: Model being fine-tuned
+        anchors: First text of each matching pair
+        positives: Second text of each matching pair
+        corpus: Texts negatives are drawn from
+        num_negatives: Hard negatives per pair
+        num_candidates: Neighbours retrieved per anchor
+        chunk_size: Number of texts encoded per step
+
+    Returns:
+        List of InputExample with texts [anchor, positive, negative, ...]; pairs
+        with fewer than num_negatives candidates are left out
+    """
+    component_of = _match_components(zip(anchors, positives))
+
+    corpus = list(dict.fromkeys(corpus))
+    unique_anchors = list(dict.fromkeys(anchors))
+    index = RecordIndex()
+    index.build([str(i) for i in range(len(corpus))], _encode_texts(model, corpus, chunk_size))
+    neighbours = index.search(
+        _encode_texts(model, unique_anchors, chunk_size), max(num_candidates, num_negatives + 1)
+    )
 
-    examples = []
+    negatives_of = {}
+    for anchor, hits in zip(unique_anchors, neighbours):
+        texts = (corpus[int(i)] for i, _ in hits)
+        component = component_of[anchor]
+        negatives = [t for t in texts if component_of.get(t) != component]
+        if len(negatives) >= num_negatives:
+            negatives_of[anchor] = negatives[:num_negatives]
 
-    # Group columns into record A and record B
-    # Assume columns are named like: field1_a, field1_b, field2_a, field2_b, etc.
-    field_names = set()
-    for col in df.columns:
-        if col.endswith("_a"):
-            field_name = col[:-2]
-            field_names.add(field_name)
+    return [
+        InputExample(texts=[anchor, positive, *negatives_of[anchor]])
+        for anchor, positive in zip(anchors, positives)
+        if anchor in negatives_of
+    ]
 
-    for _, row in df.iterrows():
-        # Construct record A and B
-        parts_a = []
-        parts_b = []
 
-        for field in sorted(field_names):
-            col_a = f"{field}_a"
-            col_b = f"{field}_b"
+def _match_components(matches: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """
+    Group texts connected by matching pairs.
 
-            if col_a in df.columns and col_b in df.columns:
-                val_a = str(row[col_a])
-                val_b = str(row[col_b])
+    Args:
+        matches: Matching (text, text) pairs
 
-                if val_a and val_a not in ["nan", "None"]:
-                    parts_a.append(f"{field}: {val_a}")
-                if val_b and val_b not in ["nan", "None"]:
-                    parts_b.append(f"{field}: {val_b}")
+    Returns:
+        Dict of text to a representative text of its connected component
+    """
+    parent: Dict[str, str] = {}
 
-        text_a = " | ".join(parts_a)
-        text_b = " | ".join(parts_b)
-        label = float(row["label"])
+    def find(text: str) -> str:
+        root = parent.setdefault(text, text)
+        while parent[root] != root:
+            root = parent[root]
+        # Path compression
+        while parent[text] != root:
+            parent[text], text = root, parent[text]
+        return root
 
-        examples.append(InputExample(texts=[text_a, text_b], label=label))
+    for text_a, text_b in matches:
+        root_a, root_b = find(text_a), find(text_b)
+        if root_a != root_b:
+            parent[root_a] = root_b
 
-    return examples
+    return {text: find(text) for text in parent}
 
 
 def train_model(
@@ -93,10 +285,20 @@ def train_model(
     epochs: int = 10,
     batch_size: int = 32,
     learning_rate: float = 2e-5,
+    loss: str = "cosine",
+    hard_negatives: int = 1,
+    refresh_every: int = 1,
 ):
     """
     Train the entity matching model.
 
+    The "cosine" loss regresses the similarity of every labeled pair. The
+    "mnrl" loss (MultipleNegativesRankingLoss) trains on the matching pairs
+    only: the other records of a batch act as negatives, plus hard negatives
+    mined with the model being trained and refreshed every refresh_every epochs.
+    Refreshes only replace the training examples; one optimizer and one
+    warm-up and linear decay schedule span the whole run.
+
     Args:
         train_data_path: Path to training data CSV
         model_name: Name of pre-trained model to fine-tune
@@ -104,30 +306,45 @@ def train_model(
         epochs: Number of training epochs
         batch_size: Batch size
         learning_rate: Learning rate
+        loss: "cosine" or "mnrl"
+        hard_negatives: Mined hard negatives per matching pair (mnrl; 0 for in-batch only)
+        refresh_every: Epochs between two hard-negative mining passes (mnrl)
+
+    Raises:
+        ValueError: If the loss is unknown
     """
-    print("Loading training data...")
-    train_examples = load_training_data(train_data_path)
-    print(f"Loaded {len(train_examples)} training examples")
+    if loss not in TRAINING_LOSSES:
+        raise ValueError(f"Unknown training loss '{loss}'. Available: {', '.join(TRAINING_LOSSES)}")
 
     print("Initializing model...")
-    model = EntityMatchingModel(model_name=model_name)
+    # Fine-tuning needs trainable PyTorch weights, whatever MODEL_BACKEND serves with
+    model = EntityMatchingModel(model_name=model_name, backend="torch")
     model.load_model()
 
-    # Create data loader
-    train_dataloader = DataLoader(train_examples, shuffle=True, batch_size=batch_size)
-
-    # Define loss function
-    train_loss = losses.CosineSimilarityLoss(model.model)
-
-    # Train the model
-    print("Starting training...")
-    model.model.fit(
-        train_objectives=[(train_dataloader, train_loss)],
-        epochs=epochs,
-        warmup_steps=int(len(train_dataloader) * 0.1),
-        optimizer_params={"lr": learning_rate},
-        show_progress_bar=True,
-    )
+    print("Loading training data...")
+    if loss == "cosine":
+        train_examples = load_training_data(train_data_path)
+        print(f"Loaded {len(train_examples)} training examples")
+        train_dataloader = DataLoader(train_examples, shuffle=True, batch_size=batch_size)
+
+        print("Starting training...")
+        model.model.fit(
+            train_objectives=[(train_dataloader, losses.CosineSimilarityLoss(model.model))],
+            epochs=epochs,
+            warmup_steps=int(len(train_dataloader) * 0.1),
+            optimizer_params={"lr": learning_rate},
+            show_progress_bar=True,
+        )
+    else:
+        _train_ranking(
+            model,
+            train_data_path,
+            epochs,
+            batch_size,
+            learning_rate,
+            hard_negatives,
+            refresh_every,
+        )
 
     # Save the fine-tuned model
     output_path = output_path or f"{settings.MODEL_PATH}/fine_tuned"
@@ -135,6 +352,152 @@ def train_model(
     print(f"Model saved to {output_path}")
 
 
+def _train_ranking(
+    model: EntityMatchingModel,
+    train_data_path: str,
+    epochs: int,
+    batch_size: int,
+    learning_rate: float,
+    hard_negatives: int,
+    refresh_every: int,
+):
+    """
+    Train with the mnrl loss, re-mining hard negatives every refresh_every epochs.
+
+    SentenceTransformer.fit() builds a new optimizer and scheduler on every
+    call, so the rounds are driven by this loop instead: one AdamW optimizer
+    and one linear warm-up/decay schedule carry over between refreshes, with
+    fit()'s weight decay and gradient clipping.
+    """
+    pairs = load_labeled_pairs(train_data_path)
+    texts_a = pairs.column("text_a").to_pylist()
+    texts_b = pairs.column("text_b").to_pylist()
+    matches = [i for i, label in enumerate(pairs.column("label").to_pylist()) if label >= 0.5]
+    print(f"Loaded {len(matches)} matching pairs of {pairs.num_rows} labeled pairs")
+
+    # Similarity is symmetric: train both directions of every match
+    anchors = [texts_a[i] for i in matches] + [texts_b[i] for i in matches]
+    positives = [texts_b[i] for i in matches] + [texts_a[i] for i in matches]
+
+    network = model.model
+    train_loss = losses.MultipleNegativesRankingLoss(network)
+    no_decay = ("bias", "LayerNorm.bias", "LayerNorm.weight")
+    optimizer = torch.optim.AdamW(
+        [
+            {
+                "params": [p for n, p in network.named_parameters() if not n.endswith(no_decay)],
+                "weight_decay": 0.01,
+            },
+            {
+                "params": [p for n, p in network.named_parameters() if n.endswith(no_decay)],
+                "weight_decay": 0.0,
+            },
+        ],
+        lr=learning_rate,
+    )
+    # preprocess() replaces tokenize() in newer sentence-transformers releases
+    preprocess = getattr(network, "preprocess", network.tokenize)
+
+    print("Starting training...")
+    rounds = _ranking_rounds(
+        model, anchors, positives, texts_a + texts_b, epochs, hard_negatives, refresh_every
+    )
+    epoch = 0
+    for examples, round_epochs in rounds:
+        # Mining encodes in eval mode
+        network.train()
+        for _ in range(round_epochs):
+            batches = _no_duplicate_batches(examples, batch_size)
+            for step, batch in enumerate(batches):
+                # The number of batches depends on the mined examples, so the schedule
+                # follows the progress through the epochs rather than a step count
+                progress = (epoch + step / len(batches)) / epochs
+                for group in optimizer.param_groups:
+                    group["lr"] = learning_rate * _learning_rate_factor(progress, 0.1 / epochs)
+
+                features = [
+                    {
+                        name: tensor.to(network.device)
+                        for name, tensor in preprocess(list(texts)).items()
+                    }
+                    for texts in zip(*(example.texts for example in batch))
+                ]
+                train_loss(features, None).backward()
+                torch.nn.utils.clip_grad_norm_(network.parameters(), 1.0)
+                optimizer.step()
+                optimizer.zero_grad()
+            epoch += 1
+    network.eval()
+
+
+def _learning_rate_factor(progress: float, warmup: float) -> float:
+    """Linear warm-up over the first warmup fraction of training, then linear decay to zero."""
+    if progress < warmup:
+        return progress / warmup
+    return max(0.0, (1.0 - progress) / (1.0 - warmup))
+
+
+def _no_duplicate_batches(examples: List[InputExample], batch_size: int) -> List[list]:
+    """
+    Shuffle examples into batches in which no text occurs twice.
+
+    Duplicate texts in a batch would be scored as each other's negatives.
+    An example that clashes with a batch waits for a later one, so a batch
+    is only short when no pending example fits it.
+
+    Args:
+        examples: Training examples
+        batch_size: Maximum examples per batch
+
+    Returns:
+        List of batches (lists of InputExample)
+    """
+    remaining = random.sample(examples, len(examples))
+    batches = []
+    while remaining:
+        batch, texts, deferred = [], set(), []
+        for example in remaining:
+            example_texts = {text.strip().lower() for text in example.texts}
+            if len(batch) < batch_size and texts.isdisjoint(example_texts):
+                batch.append(example)
+                texts |= example_texts
+            else:
+                deferred.append(example)
+        batches.append(batch)
+        remaining = deferred
+    return batches
+
+
+def _ranking_rounds(
+    model: EntityMatchingModel,
+    anchors: List[str],
+    positives: List[str],
+    corpus: List[str],
+    epochs: int,
+    hard_negatives: int,
+    refresh_every: int,
+) -> Iterator[Tuple[List[InputExample], int]]:
+    """
+    Yield the training examples of each mnrl round and its number of epochs.
+
+    Rounds are generated lazily, so each mining pass uses the weights
+    trained by the previous rounds.
+    """
+    if hard_negatives == 0:
+        # Nothing is mined, so every round would train on the same examples
+        refresh_every = epochs
+
+    for start in range(0, epochs, refresh_every):
+        if hard_negatives > 0:
+            print(f"Mining hard negatives for epoch {start + 1}...")
+            examples = mine_hard_negatives(
+                model, anchors, positives, corpus, num_negatives=hard_negatives
+            )
+        else:
+            examples = [InputExample(texts=[a, p]) for a, p in zip(anchors, positives)]
+        yield examples, min(refresh_every, epochs - start)
+
+
 def evaluate_model(
     model: EntityMatchingModel,
     test_data_path: str,
@@ -152,79 +515,15 @@ def evaluate_model(
         dict: Evaluation metrics
     """
     print("Loading test data...")
-    df = pd.read_csv(test_data_path)
-
-    if "label" not in df.columns:
-        raise ValueError("Test data must have a 'label' column")
-
-    # Get field names
-    field_names = set()
-    for col in df.columns:
-        if col.endswith("_a"):
-            field_name = col[:-2]
-            field_names.add(field_name)
-
-    # Prepare test pairs
-    test_pairs = []
-    true_labels = []
-
-    for _, row in df.iterrows():
-        parts_a = []
-        parts_b = []
-
-        for field in sorted(field_names):
-            col_a = f"{field}_a"
-            col_b = f"{field}_b"
-
-            if col_a in df.columns and col_b in df.columns:
-                val_a = str(row[col_a])
-                val_b = str(row[col_b])
-
-                if val_a and val_a not in ["nan", "None"]:
-                    parts_a.append(f"{field}: {val_a}")
-                if val_b and val_b not in ["nan", "None"]:
-                    parts_b.append(f"{field}: {val_b}")
-
-        text_a = " | ".join(parts_a)
-        text_b = " | ".join(parts_b)
-
-        test_pairs.append((text_a, text_b))
-        true_labels.append(int(row["label"]))
+    pairs = load_labeled_pairs(test_data_path)
+    test_pairs = list(zip(pairs.column("text_a").to_pylist(), pairs.column("text_b").to_pylist()))
+    true_labels = [int(label) for label in pairs.column("label").to_pylist()]
 
     # Get predictions
     print("Making predictions...")
     similarities = model.predict_batch(test_pairs)
-    predictions = [1 if sim >= threshold else 0 for sim in similarities]
-
-    # Calculate metrics
-    true_positives = sum(p == 1 and t == 1 for p, t in zip(predictions, true_labels))
-    false_positives = sum(p == 1 and t == 0 for p, t in zip(predictions, true_labels))
-    false_negatives = sum(p == 0 and t == 1 for p, t in zip(predictions, true_labels))
-    true_negatives = sum(p == 0 and t == 0 for p, t in zip(predictions, true_labels))
-
-    precision = (
-        true_positives / (true_positives + false_positives)
-        if (true_positives + false_positives) > 0
-        else 0
-    )
-    recall = (
-        true_positives / (true_positives + false_negatives)
-        if (true_positives + false_negatives) > 0
-        else 0
-    )
-    f1 = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-    accuracy = (true_positives + true_negatives) / len(true_labels)
-
-    metrics = {
-        "accuracy": accuracy,
-        "precision": precision,
-        "recall": recall,
-        "f1_score": f1,
-        "true_positives": true_positives,
-        "false_positives": false_positives,
-        "false_negatives": false_negatives,
-        "true_negatives": true_negatives,
-    }
+
+    metrics = metrics_at_threshold(np.asarray(similarities), np.asarray(true_labels), threshold)
 
     print("\nEvaluation Metrics:")
     for metric, value in metrics.items():
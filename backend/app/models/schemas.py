@@ -25,6 +25,9 @@ class MatchPrediction(BaseModel):
     match_probability: float = Field(..., ge=0.0, le=1.0)
     confidence: str = Field(..., description="High, Medium, or Low")
     similarity_score: float = Field(..., ge=0.0, le=1.0)
+    resolved_by: Optional[str] = Field(
+        None, description="Cascade stage that decided the pair: prefilter or model"
+    )
 
 
 class FeatureContribution(BaseModel):
@@ -42,6 +45,7 @@ class TokenContribution(BaseModel):
     token: str
     contribution: float
     position: int
+    side: Optional[str] = Field(None, description="Record of the token: a or b")
 
 
 class Explanation(BaseModel):
@@ -54,21 +58,120 @@ class Explanation(BaseModel):
     top_negative_features: List[str]
 
 
+class TokenAttributionResult(BaseModel):
+    """Token-level occlusion attributions of a record pair."""
+
+    similarity_score: float
+    token_contributions: List[TokenContribution] = Field(
+        ..., description="Similarity lost when each token is removed, by decreasing magnitude"
+    )
+    num_tokens: int
+    tokens_evaluated: int
+    complete: bool = Field(..., description="False if the compute budget ran out")
+    processing_time: float
+
+
 class MatchResult(BaseModel):
     """Complete match result with prediction and explanation."""
 
     prediction: MatchPrediction
     explanation: Optional[Explanation] = None
+    explanation_id: Optional[str] = Field(
+        None, description="Handle resolving the explanation via /match/explanations/{id}"
+    )
     record_pair: RecordPair
 
 
+class BlockingConfig(BaseModel):
+    """Configuration of the blocking (candidate generation) stage."""
+
+    method: Optional[str] = Field(
+        None, description="full, standard, sorted_neighbourhood, qgram, or token"
+    )
+    fields: Optional[List[str]] = Field(
+        None, description="Fields used to build blocking keys (all fields if omitted)"
+    )
+    window_size: Optional[int] = Field(None, ge=2, description="Sorted-neighbourhood window")
+    q: Optional[int] = Field(None, ge=1, description="Q-gram length")
+    max_block_size: Optional[int] = Field(
+        None, ge=1, description="Blocks larger than this are skipped as uninformative"
+    )
+
+
+class ClusteringConfig(BaseModel):
+    """Configuration of the entity clustering stage over pairwise matches."""
+
+    method: Optional[str] = Field(None, description="connected_components, center, or correlation")
+    threshold: Optional[float] = Field(
+        None, ge=0.0, le=1.0, description="Ignore matches below this similarity"
+    )
+    include_singletons: bool = Field(
+        False, description="Also return clusters of records that matched nothing"
+    )
+
+
 class BatchMatchRequest(BaseModel):
     """Request model for batch matching."""
 
     dataset_a: List[RecordBase]
-    dataset_b: List[RecordBase]
+    dataset_b: List[RecordBase] = Field(
+        default_factory=list, description="Records to match against (omit with reference_dataset)"
+    )
+    reference_dataset: Optional[str] = Field(
+        None,
+        description="Stored dataset used as dataset_b; its precomputed embeddings are "
+        "memory-mapped when available",
+    )
     threshold: Optional[float] = None
-    include_explanations: bool = False
+    include_explanations: bool = Field(
+        False, description="Give every match an explanation handle (explanation_id)"
+    )
+    blocking: Optional[BlockingConfig] = None
+    scoring_mode: Optional[str] = Field(
+        None,
+        description="record (encode each record once), pair (encode per pair), "
+        "or ann (score only the nearest neighbours of each record)",
+    )
+    top_k: Optional[int] = Field(
+        None, ge=1, description="Keep at most this many matches per record of dataset_a"
+    )
+    prefilter: Optional[bool] = Field(
+        None, description="Resolve clear-cut pairs with classical string metrics first"
+    )
+    clustering: Optional[ClusteringConfig] = Field(
+        None, description="Also resolve the matches into entity clusters"
+    )
+
+
+class ClusterMember(BaseModel):
+    """A record assigned to an entity cluster."""
+
+    id: Optional[str] = None
+    dataset: Optional[str] = Field(None, description="a or b (batch matching only)")
+    index: Optional[int] = Field(None, description="Row in its dataset (batch matching only)")
+
+
+class EntityCluster(BaseModel):
+    """Records resolved to the same entity."""
+
+    cluster_id: int
+    size: int
+    members: List[ClusterMember]
+
+
+class MatchEdge(BaseModel):
+    """A scored match between two records, identified by ID."""
+
+    id_a: str
+    id_b: str
+    similarity: float = Field(..., ge=0.0, le=1.0)
+
+
+class ClusterRequest(BaseModel):
+    """Request model for clustering precomputed matches."""
+
+    edges: List[MatchEdge]
+    clustering: Optional[ClusteringConfig] = None
 
 
 class BatchMatchResult(BaseModel):
@@ -78,6 +181,118 @@ class BatchMatchResult(BaseModel):
     matches_found: int
     match_results: List[MatchResult]
     processing_time: float
+    pairs_pruned: int = 0
+    blocking_method: Optional[str] = None
+    prefilter_accepted: int = 0
+    prefilter_rejected: int = 0
+    model_scored: int = 0
+    clusters: Optional[List[EntityCluster]] = None
+
+
+class BatchMatchProgress(BaseModel):
+    """Progress of a chunked batch matching run."""
+
+    chunks_done: int
+    total_chunks: int
+    pairs_scored: int
+    total_comparisons: int
+    matches_found: int
+    elapsed_time: float
+    pairs_per_second: float
+
+
+class MatchJob(BaseModel):
+    """Background batch matching job."""
+
+    job_id: str
+    status: str = Field(..., description="queued, running, completed, failed, or cancelled")
+    created_at: float
+    updated_at: float
+    progress: BatchMatchProgress
+    error: Optional[str] = None
+
+
+class LinkageCorpusConfig(BaseModel):
+    """Configuration of an incremental linkage corpus, fixed when it is created."""
+
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+    blocking: Optional[BlockingConfig] = None
+    scoring_mode: Optional[str] = Field(
+        None,
+        description="record (score records sharing a blocking key) or ann (score the "
+        "nearest neighbours of each record)",
+    )
+    top_k: Optional[int] = Field(
+        None, ge=1, description="Keep at most this many links per changed record"
+    )
+
+
+class LinkageCorpusInfo(BaseModel):
+    """Summary of an incremental linkage corpus."""
+
+    name: str
+    num_records: int
+    num_links: int
+    config: LinkageCorpusConfig
+
+
+class LinkageDelta(BaseModel):
+    """Changes to apply to an incremental linkage corpus."""
+
+    upserts: List[RecordBase] = Field(
+        default_factory=list, description="New or changed records (each needs an id)"
+    )
+    deletes: List[str] = Field(default_factory=list, description="IDs of removed records")
+
+
+class LinkChange(BaseModel):
+    """A link between two corpus records that a delta added, updated or removed."""
+
+    id_a: str
+    id_b: str
+    similarity: float = Field(..., ge=0.0, le=1.0)
+    change: str = Field(..., description="added, updated, or removed")
+
+
+class LinkageDeltaResult(BaseModel):
+    """Result of applying a delta to an incremental linkage corpus."""
+
+    inserted: int
+    updated: int
+    deleted: int
+    pairs_scored: int
+    num_records: int
+    link_changes: List[LinkChange]
+    processing_time: float
+
+
+class ThresholdPoint(BaseModel):
+    """Classification quality when pairs scoring at least a threshold are matches."""
+
+    threshold: float
+    precision: float
+    recall: float
+    f1_score: float
+    false_positive_rate: float
+    cost: float = Field(..., description="Cost-weighted false positives and false negatives")
+
+
+class ThresholdOptimizationResult(BaseModel):
+    """Threshold sweep over a labeled dataset."""
+
+    dataset_name: str
+    num_pairs: int
+    num_matches: int
+    false_positive_cost: float
+    false_negative_cost: float
+    roc_auc: float
+    average_precision: float
+    best_f1: ThresholdPoint
+    min_cost: ThresholdPoint
+    curve: List[ThresholdPoint] = Field(
+        ..., description="ROC and precision-recall curve, by descending threshold"
+    )
+    processing_time: float
 
 
 class DatasetInfo(BaseModel):
@@ -87,6 +302,9 @@ class DatasetInfo(BaseModel):
     description: str
     num_records: int
     fields: List[str]
+    field_types: Optional[Dict[str, str]] = Field(
+        None, description="Inferred type of each field, once the dataset is ingested"
+    )
     sample_records: Optional[List[RecordBase]] = None
 
 
@@ -97,6 +315,13 @@ class HealthCheck(BaseModel):
     version: str
     model_loaded: bool
     device: str
+    live: bool = Field(True, description="The API process is serving requests")
+    ready: bool = Field(False, description="The model is loaded and warmed up")
+    model_state: str = Field("idle", description="idle, loading, warming, ready or failed")
+    backend: Optional[str] = None
+    model_load_time: Optional[float] = None
+    model_warmup_time: Optional[float] = None
+    model_error: Optional[str] = None
 
 
 class ErrorResponse(BaseModel):
@@ -1,74 +1,92 @@
 """Dataset loading utilities."""
 
 import os
-import pandas as pd
-from typing import List
+from typing import Dict, List, Optional
 
-from app.core.config import settings
 from app.models.schemas import DatasetInfo, RecordBase
+from app.utils.dataset_catalog import BUILTIN_DATASETS, get_dataset_catalog
+from app.utils.ingestion import read_arrow_records
+from app.utils.record_store import RecordStore
+
+
+def _dataset_key(dataset_name: str) -> str:
+    """Normalize a dataset name to its catalog key."""
+    return dataset_name.lower().replace(" ", "_").replace("-", "_")
+
+
+def _uploaded_datasets(file_names: List[str]) -> Dict[str, str]:
+    """Map dataset keys of uploaded CSV files (not built-in datasets) to file names."""
+    builtin_files = {config["file"] for config in BUILTIN_DATASETS.values()}
+    return {
+        _dataset_key(os.path.splitext(file_name)[0]): file_name
+        for file_name in file_names
+        if file_name not in builtin_files
+    }
 
 
 def list_available_datasets() -> List[DatasetInfo]:
     """
     List all available datasets in the data directory.
 
+    Metadata comes from the dataset catalog, so only new or modified files
+    are read.
+
     Returns:
         List[DatasetInfo]: List of available datasets
     """
+    entries = get_dataset_catalog().refresh()
     datasets = []
 
-    # Pre-defined datasets
-    dataset_configs = {
-        "uci": {
-            "name": "UCI Record Linkage",
-            "description": "UCI Record Linkage Comparison Patterns (~574K pairs)",
-            "file": "uci_record_linkage.csv",
-        },
-        "dblp_acm": {
-            "name": "DBLP-ACM",
-            "description": "Academic publications from DBLP and ACM (clean data)",
-            "file": "dblp_acm.csv",
-        },
-        "dblp_scholar_dirty": {
-            "name": "DBLP-Scholar (Dirty)",
-            "description": "Academic publications with data quality issues",
-            "file": "dblp_scholar_dirty.csv",
-        },
-        "walmart_amazon": {
-            "name": "Walmart-Amazon",
-            "description": "E-commerce product matching (~10K pairs)",
-            "file": "walmart_amazon.csv",
-        },
-    }
-
-    for dataset_id, config in dataset_configs.items():
-        file_path = os.path.join(settings.RAW_DATA_DIR, config["file"])
-
-        # Check if file exists and get record count
-        num_records = 0
-        fields = []
-
-        if os.path.exists(file_path):
-            try:
-                df = pd.read_csv(file_path, nrows=1)
-                fields = df.columns.tolist()
-                df_full = pd.read_csv(file_path)
-                num_records = len(df_full)
-            except Exception:
-                pass
-
+    for config in BUILTIN_DATASETS.values():
+        entry = entries.get(config["file"], {})
         datasets.append(
             DatasetInfo(
                 name=config["name"],
                 description=config["description"],
-                num_records=num_records,
-                fields=fields,
+                num_records=entry.get("num_records", 0),
+                fields=entry.get("fields", []),
+                field_types=entry.get("ingested", {}).get("field_types"),
+            )
+        )
+
+    for file_name in _uploaded_datasets(list(entries)).values():
+        entry = entries[file_name]
+        datasets.append(
+            DatasetInfo(
+                name=os.path.splitext(file_name)[0],
+                description="Uploaded dataset",
+                num_records=entry["num_records"],
+                fields=entry["fields"],
+                field_types=entry.get("ingested", {}).get("field_types"),
             )
         )
 
     return datasets
 
 
+def resolve_dataset_file(dataset_name: str) -> str:
+    """
+    Get the file name of a built-in or uploaded dataset.
+
+    Args:
+        dataset_name: Name of the dataset
+
+    Returns:
+        str: Name of the CSV file in the raw data directory
+
+    Raises:
+        FileNotFoundError: If no dataset has that name
+    """
+    dataset_key = _dataset_key(dataset_name)
+    if dataset_key in BUILTIN_DATASETS:
+        return BUILTIN_DATASETS[dataset_key]["file"]
+
+    file_name = _uploaded_datasets(get_dataset_catalog().file_names()).get(dataset_key)
+    if file_name is None:
+        raise FileNotFoundError(f"Dataset '{dataset_name}' not found")
+    return file_name
+
+
 def load_dataset(
     dataset_name: str, include_samples: bool = True, num_samples: int = 5
 ) -> DatasetInfo:
@@ -86,77 +104,67 @@ def load_dataset(
     Raises:
         FileNotFoundError: If dataset file doesn't exist
     """
-    # Map dataset names to files
-    dataset_files = {
-        "uci": "uci_record_linkage.csv",
-        "dblp_acm": "dblp_acm.csv",
-        "dblp_scholar_dirty": "dblp_scholar_dirty.csv",
-        "walmart_amazon": "walmart_amazon.csv",
-    }
-
-    # Normalize dataset name
-    dataset_key = dataset_name.lower().replace(" ", "_").replace("-", "_")
+    dataset_key = _dataset_key(dataset_name)
+    catalog = get_dataset_catalog()
+    file_name = resolve_dataset_file(dataset_name)
+    description = BUILTIN_DATASETS.get(dataset_key, {}).get("description", "Uploaded dataset")
 
-    if dataset_key not in dataset_files:
-        raise FileNotFoundError(f"Dataset '{dataset_name}' not found")
-
-    file_path = os.path.join(settings.RAW_DATA_DIR, dataset_files[dataset_key])
-
-    if not os.path.exists(file_path):
+    entry = catalog.get(file_name)
+    if entry is None:
         raise FileNotFoundError(
-            f"Dataset file not found: {file_path}. "
+            f"Dataset file not found: {os.path.join(catalog.data_dir, file_name)}. "
             "Run scripts/download_datasets.py to download datasets."
         )
 
-    # Load dataset
-    df = pd.read_csv(file_path)
-    fields = df.columns.tolist()
-
     # Get sample records if requested
     sample_records = None
     if include_samples:
-        sample_df = df.head(num_samples)
+        samples = entry["samples"]
+        if num_samples > len(samples) and entry["num_records"] > len(samples):
+            import pandas as pd
+
+            samples = pd.read_csv(
+                os.path.join(catalog.data_dir, file_name),
+                nrows=num_samples,
+                dtype=str,
+                keep_default_na=False,
+            ).to_dict(orient="records")
         sample_records = [
-            RecordBase(
-                id=str(idx),
-                fields={col: str(row[col]) for col in df.columns},
-            )
-            for idx, row in sample_df.iterrows()
+            RecordBase(id=str(i), fields=fields) for i, fields in enumerate(samples[:num_samples])
         ]
 
-    # Get dataset description
-    descriptions = {
-        "uci": "UCI Record Linkage Comparison Patterns (~574K pairs)",
-        "dblp_acm": "Academic publications from DBLP and ACM (clean data)",
-        "dblp_scholar_dirty": "Academic publications with data quality issues",
-        "walmart_amazon": "E-commerce product matching (~10K pairs)",
-    }
-
     return DatasetInfo(
         name=dataset_name,
-        description=descriptions.get(dataset_key, "Unknown dataset"),
-        num_records=len(df),
-        fields=fields,
+        description=description,
+        num_records=entry["num_records"],
+        fields=entry["fields"],
+        field_types=entry.get("ingested", {}).get("field_types"),
         sample_records=sample_records,
     )
 
 
-def load_records_from_csv(file_path: str) -> List[RecordBase]:
+def load_records_from_csv(file_path: str, id_column: Optional[str] = None) -> RecordStore:
     """
-    Load records from a CSV file.
+    Load records from a CSV file into a columnar record store.
+
+    Files of the raw data directory that were ingested are read from their
+    memory-mapped Arrow copy instead of being parsed again.
+
+    Indexing the store yields lightweight record views; call
+    ``store.to_records()`` to materialize pydantic records.
 
     Args:
         file_path: Path to the CSV file
+        id_column: Column holding record IDs (the row number if None)
 
     Returns:
-        List[RecordBase]: List of records
+        RecordStore: Records of the file
     """
-    df = pd.read_csv(file_path)
-    records = [
-        RecordBase(
-            id=str(idx),
-            fields={col: str(row[col]) for col in df.columns},
-        )
-        for idx, row in df.iterrows()
-    ]
-    return records
+    catalog = get_dataset_catalog()
+    if os.path.dirname(os.path.abspath(file_path)) == os.path.abspath(catalog.data_dir):
+        entry = catalog.get(os.path.basename(file_path)) or {}
+        ingested = entry.get("ingested")
+        if ingested and os.path.exists(ingested["path"]):
+            return read_arrow_records(ingested["path"], id_column=id_column)
+
+    return RecordStore.from_csv(file_path, id_column=id_column)
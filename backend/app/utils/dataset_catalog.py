@@ -0,0 +1,274 @@
+"""Persisted catalog of dataset file metadata.
+
+Listing datasets used to parse every CSV in full just to count its rows.
+The catalog stores, per file: field names, row count, size, modification
+time, a SHA-256 content hash, a few sample rows and the location of its
+ingested Arrow copy (see ``app.utils.ingestion``). It is kept as JSON so it
+survives restarts. A file is re-indexed only when its size or mtime
+changes, so listing datasets and reading their metadata cost a ``stat``
+per file rather than a parse.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+
+# Datasets fetched by scripts/download_datasets.py
+BUILTIN_DATASETS = {
+    "uci": {
+        "name": "UCI Record Linkage",
+        "description": "UCI Record Linkage Comparison Patterns (~574K pairs)",
+        "file": "uci_record_linkage.csv",
+    },
+    "dblp_acm": {
+        "name": "DBLP-ACM",
+        "description": "Academic publications from DBLP and ACM (clean data)",
+        "file": "dblp_acm.csv",
+    },
+    "dblp_scholar_dirty": {
+        "name": "DBLP-Scholar (Dirty)",
+        "description": "Academic publications with data quality issues",
+        "file": "dblp_scholar_dirty.csv",
+    },
+    "walmart_amazon": {
+        "name": "Walmart-Amazon",
+        "description": "E-commerce product matching (~10K pairs)",
+        "file": "walmart_amazon.csv",
+    },
+}
+
+_HASH_BLOCK_SIZE = 1 << 20
+_COUNT_CHUNK_SIZE = 100_000
+
+
+def file_hash(file_path: str) -> str:
+    """SHA-256 of a file's content, read in blocks."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        while block := f.read(_HASH_BLOCK_SIZE):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def index_csv(file_path: str, num_samples: int) -> dict:
+    """
+    Compute the catalog entry of a CSV file.
+
+    Rows are counted by streaming a single column in chunks, so memory
+    stays bounded on large files. Unreadable files get an entry with no
+    fields and no rows, and are not retried until they change.
+
+    Args:
+        file_path: Path to the CSV file
+        num_samples: Number of leading rows to keep as samples
+
+    Returns:
+        dict: Catalog entry of the file
+    """
+    stat = os.stat(file_path)
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "content_hash": file_hash(file_path),
+        "fields": [],
+        "num_records": 0,
+        "samples": [],
+    }
+
+    import pandas as pd
+
+    try:
+        head = pd.read_csv(file_path, nrows=num_samples, dtype=str, keep_default_na=False)
+        num_records = sum(
+            len(chunk)
+            for chunk in pd.read_csv(file_path, usecols=[0], dtype=str, chunksize=_COUNT_CHUNK_SIZE)
+        )
+    except (pd.errors.EmptyDataError, pd.errors.ParserError, UnicodeDecodeError, ValueError):
+        return entry
+
+    entry["fields"] = [str(field) for field in head.columns]
+    entry["num_records"] = num_records
+    entry["samples"] = head.to_dict(orient="records")
+    return entry
+
+
+def _remove_ingested(entry: Optional[dict]):
+    """Delete the ingested copy of a superseded catalog entry, if any."""
+    ingested = (entry or {}).get("ingested")
+    if ingested:
+        try:
+            os.remove(ingested["path"])
+        except FileNotFoundError:
+            pass
+
+
+class DatasetCatalog:
+    """Metadata of the CSV files in a data directory, persisted as JSON."""
+
+    def __init__(self, data_dir: str, catalog_path: str, num_samples: int = 5):
+        """
+        Initialize the catalog, reading entries persisted by a previous process.
+
+        Args:
+            data_dir: Directory holding the dataset CSV files
+            catalog_path: JSON file the catalog is persisted to
+            num_samples: Number of sample rows stored per dataset
+        """
+        self.data_dir = data_dir
+        self.catalog_path = catalog_path
+        self.num_samples = num_samples
+
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Read the persisted catalog, ignoring a missing or corrupt file."""
+        try:
+            with open(self.catalog_path) as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+
+        # Entries of another data directory or sample count are stale
+        if (
+            stored.get("data_dir") == os.path.abspath(self.data_dir)
+            and stored.get("num_samples") == self.num_samples
+        ):
+            self._entries = stored.get("entries", {})
+
+    def _save(self):
+        """Persist the catalog atomically."""
+        directory = os.path.dirname(self.catalog_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        tmp_path = f"{self.catalog_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "data_dir": os.path.abspath(self.data_dir),
+                    "num_samples": self.num_samples,
+                    "entries": self._entries,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.catalog_path)
+
+    def _refresh_file(self, file_name: str) -> bool:
+        """Re-index a file if it changed. Returns whether the catalog changed."""
+        file_path = os.path.join(self.data_dir, file_name)
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            entry = self._entries.pop(file_name, None)
+            _remove_ingested(entry)
+            return entry is not None
+
+        entry = self._entries.get(file_name)
+        if (
+            entry is not None
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return False
+
+        _remove_ingested(entry)
+        self._entries[file_name] = index_csv(file_path, self.num_samples)
+        return True
+
+    def get(self, file_name: str) -> Optional[dict]:
+        """
+        Get the entry of a file, re-indexing it first if it changed on disk.
+
+        Args:
+            file_name: Name of the CSV file in the data directory
+
+        Returns:
+            The catalog entry, or None if the file does not exist
+        """
+        with self._lock:
+            if self._refresh_file(file_name):
+                self._save()
+            return self._entries.get(file_name)
+
+    def set_ingested(self, file_name: str, content_hash: str, info: dict):
+        """
+        Record the ingested copy of a file, unless the file changed meanwhile.
+
+        Args:
+            file_name: Name of the CSV file in the data directory
+            content_hash: Content hash of the file that was ingested
+            info: Ingestion metadata (path, row count, field types)
+        """
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is None or entry["content_hash"] != content_hash:
+                _remove_ingested({"ingested": info})
+                return
+            entry["ingested"] = info
+            self._save()
+
+    def file_names(self) -> List[str]:
+        """
+        List the CSV files of the data directory.
+
+        Returns:
+            Sorted file names (empty if the directory does not exist)
+        """
+        try:
+            return sorted(name for name in os.listdir(self.data_dir) if name.endswith(".csv"))
+        except FileNotFoundError:
+            return []
+
+    def refresh(self) -> Dict[str, dict]:
+        """
+        Bring the catalog in line with the data directory.
+
+        New and modified CSV files are indexed and removed ones dropped;
+        unchanged files are only stat-ed.
+
+        Returns:
+            Dict of file name to catalog entry
+        """
+        file_names = self.file_names()
+        with self._lock:
+            changed = False
+            for file_name in set(self._entries) - set(file_names):
+                _remove_ingested(self._entries.pop(file_name))
+                changed = True
+            for file_name in file_names:
+                changed |= self._refresh_file(file_name)
+
+            if changed:
+                self._save()
+            return {
+                file_name: self._entries[file_name]
+                for file_name in file_names
+                if file_name in self._entries
+            }
+
+
+# Global catalog instance
+_catalog_instance = None
+
+
+def get_dataset_catalog() -> DatasetCatalog:
+    """
+    Get or create the global dataset catalog instance.
+
+    Returns:
+        DatasetCatalog: Catalog of the raw data directory
+    """
+    global _catalog_instance
+    if _catalog_instance is None:
+        _catalog_instance = DatasetCatalog(
+            data_dir=settings.RAW_DATA_DIR,
+            catalog_path=settings.DATASET_CATALOG_PATH,
+            num_samples=settings.DATASET_CATALOG_SAMPLES,
+        )
+    return _catalog_instance
@@ -0,0 +1,241 @@
+"""Ingestion of dataset CSV files into Arrow IPC files.
+
+Parsing a CSV again on every load is slow. After a dataset is uploaded it
+is converted once into an uncompressed Arrow IPC file under
+``PROCESSED_DATA_DIR/datasets``. Later loads memory-map that file instead
+of parsing the CSV.
+
+Columns are stored as text, since matching works on the raw values and
+typed columns would lose e.g. leading zeros of ZIP codes. The type each
+column could be stored as is inferred and recorded in the catalog.
+
+Ingested files are named after the CSV's content hash, so a modified CSV
+never resolves to a stale conversion.
+
+pyarrow is imported by the functions that need it, so importing this
+module (and the API) does not load it.
+"""
+
+import logging
+import os
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+from app.core.config import settings
+from app.utils.dataset_catalog import get_dataset_catalog
+from app.utils.record_store import RecordStore
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+_BATCH_ROWS = 65536
+
+
+def ingested_path(file_name: str, content_hash: str) -> str:
+    """
+    Get the path of the Arrow file ingested from a CSV file.
+
+    Args:
+        file_name: Name of the CSV file
+        content_hash: SHA-256 of the CSV file's content
+
+    Returns:
+        str: Path under PROCESSED_DATA_DIR/datasets
+    """
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    return os.path.join(
+        settings.PROCESSED_DATA_DIR, "datasets", f"{stem}-{content_hash[:16]}.arrow"
+    )
+
+
+def _value_type(column) -> Optional[str]:
+    """Type of a text column's non-empty values, or None if it has none."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    values = pc.filter(column, pc.not_equal(column, ""))
+    if len(values) == 0:
+        return None
+    if pc.any(pc.match_substring_regex(values, r"^[-+]?0\d")).as_py():
+        return "string"
+
+    for arrow_type, name in (
+        (pa.int64(), "int64"),
+        (pa.float64(), "double"),
+        (pa.timestamp("s"), "timestamp"),
+    ):
+        try:
+            pc.cast(values, arrow_type)
+            return name
+        except pa.ArrowInvalid:
+            continue
+    return "string"
+
+
+def _merge_types(type_a: Optional[str], type_b: Optional[str]) -> Optional[str]:
+    """Type of a column made of two parts of the given types."""
+    if type_a is None or type_a == type_b:
+        return type_b
+    if type_b is None:
+        return type_a
+    if {type_a, type_b} == {"int64", "double"}:
+        return "double"
+    return "string"
+
+
+def infer_type(column: "pa.ChunkedArray") -> str:
+    """
+    Infer the type of a text column from its non-empty values.
+
+    Values with leading zeros, such as ZIP codes, make the column text.
+
+    Args:
+        column: Column of strings
+
+    Returns:
+        str: "int64", "double", "timestamp" or "string"
+    """
+    return _value_type(column) or "string"
+
+
+def csv_to_arrow(csv_path: str, arrow_path: str) -> Dict:
+    """
+    Convert a CSV file into an uncompressed Arrow IPC file of text columns.
+
+    The CSV is read and written batch by batch, so memory stays bounded by
+    the batch size; field types are inferred per batch and merged.
+
+    Args:
+        csv_path: Path to the CSV file
+        arrow_path: Path of the Arrow file to write
+
+    Returns:
+        dict: Row count and inferred type of each field
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.ipc as pa_ipc
+
+    # A first reader only parses the first block, to get the header
+    with pa_csv.open_csv(csv_path) as header_reader:
+        field_names = header_reader.schema.names
+    convert_options = pa_csv.ConvertOptions(
+        column_types={name: pa.string() for name in field_names},
+        strings_can_be_null=False,
+    )
+
+    num_records = 0
+    value_types: Dict[str, Optional[str]] = {name: None for name in field_names}
+
+    os.makedirs(os.path.dirname(arrow_path), exist_ok=True)
+    tmp_path = f"{arrow_path}.tmp"
+    with pa_csv.open_csv(csv_path, convert_options=convert_options) as reader:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa_ipc.new_file(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_table(pa.Table.from_batches([batch]), max_chunksize=_BATCH_ROWS)
+                    num_records += batch.num_rows
+                    for name in field_names:
+                        value_types[name] = _merge_types(
+                            value_types[name], _value_type(batch.column(name))
+                        )
+    os.replace(tmp_path, arrow_path)
+
+    return {
+        "num_records": num_records,
+        "field_types": {name: value_types[name] or "string" for name in field_names},
+    }
+
+
+class ArrowColumn:
+    """
+    Read-only text column backed by a memory-mapped Arrow array.
+
+    Values become Python strings only when read: single values for record
+    views, selected rows for serialization, and the whole column once it is
+    normalized for blocking.
+    """
+
+    def __init__(self, array: "pa.ChunkedArray"):
+        """
+        Initialize the column.
+
+        Args:
+            array: Column of strings
+        """
+        self._array = array
+
+    def __len__(self) -> int:
+        return len(self._array)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self._array[int(index)].as_py()
+        rows = np.asarray(index, dtype=np.int64)
+        return self._array.take(rows).to_numpy(zero_copy_only=False)
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self._array.to_numpy(zero_copy_only=False)
+        return values if dtype is None else values.astype(dtype)
+
+
+def ingest_dataset(file_name: str) -> Optional[Dict]:
+    """
+    Ingest a CSV file of the raw data directory and record it in the catalog.
+
+    Meant to run in the background after an upload; failures are logged and
+    leave the dataset readable from its CSV.
+
+    Args:
+        file_name: Name of the CSV file in the raw data directory
+
+    Returns:
+        The ingestion metadata, or None if the file is missing or unreadable
+    """
+    import pyarrow as pa
+
+    catalog = get_dataset_catalog()
+    entry = catalog.get(file_name)
+    if entry is None:
+        return None
+
+    arrow_path = ingested_path(file_name, entry["content_hash"])
+    try:
+        info = csv_to_arrow(os.path.join(catalog.data_dir, file_name), arrow_path)
+    except (pa.ArrowInvalid, OSError) as e:
+        logger.warning(f"Could not ingest dataset {file_name}: {e}")
+        return None
+
+    info["path"] = arrow_path
+    catalog.set_ingested(file_name, entry["content_hash"], info)
+    return info
+
+
+def read_arrow_records(arrow_path: str, id_column: Optional[str] = None) -> RecordStore:
+    """
+    Load an ingested Arrow file into a record store.
+
+    The file is memory-mapped, so no CSV parsing happens, and columns are
+    only converted to Python strings as they are read (see ArrowColumn).
+
+    Args:
+        arrow_path: Path to the Arrow IPC file
+        id_column: Column holding record IDs (the row number if None)
+
+    Returns:
+        RecordStore: Records of the file
+    """
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+
+    # Buffers of the table keep the memory map open
+    table = pa_ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+
+    columns = {name: ArrowColumn(table.column(name)) for name in table.column_names}
+    if id_column in columns:
+        # Every record view and result reads the IDs: convert them once
+        columns[id_column] = np.asarray(columns[id_column], dtype=object)
+    return RecordStore.from_columns(columns, id_column=id_column)
@@ -0,0 +1,317 @@
+"""Columnar in-memory record store.
+
+Building one pydantic ``RecordBase`` (with its own dict of fields) per row
+dominates load time and memory on large files. A ``RecordStore`` keeps one
+NumPy object array of strings per field plus an ID column instead. Indexing
+returns a lightweight ``RecordView`` exposing ``id`` and ``fields`` like a
+``RecordBase``, so blocking, serialization and encoding run on the store
+directly; pydantic records are only materialized at the API boundary.
+
+A value of ``None`` marks a field the record does not have.
+"""
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.models.schemas import RecordBase
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_NULL_VALUES = {"nan", "none", "null", ""}
+
+
+class _RecordFields(Mapping):
+    """Read-only mapping view over one row of a record store."""
+
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store: "RecordStore", index: int):
+        self._store = store
+        self._index = index
+
+    def __getitem__(self, field: str) -> str:
+        column = self._store.columns.get(field)
+        value = None if column is None else column[self._index]
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return (
+            field
+            for field, column in self._store.columns.items()
+            if column[self._index] is not None
+        )
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class RecordView:
+    """A single record of a RecordStore, read lazily from its columns."""
+
+    __slots__ = ("store", "index")
+
+    def __init__(self, store: "RecordStore", index: int):
+        self.store = store
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return self.store.ids[self.index]
+
+    @property
+    def fields(self) -> Mapping:
+        return _RecordFields(self.store, self.index)
+
+    def normalized_value(self, field: str) -> str:
+        """Get the normalized value of a field, or an empty string if missing or null."""
+        return self.store.normalized(field)[self.index]
+
+    def to_record(self) -> RecordBase:
+        """Materialize the record as a pydantic model."""
+        return self.store.record(self.index)
+
+
+class RecordStore:
+    """Columnar storage of records: an ID column plus one string array per field."""
+
+    def __init__(self, ids: np.ndarray, columns: Dict[str, np.ndarray]):
+        """
+        Initialize the store.
+
+        Args:
+            ids: Object array of record IDs (None for records without one)
+            columns: Object array of string values (None if absent) per field, or a
+                column converting its values on access (see ingestion.ArrowColumn)
+        """
+        self.ids = ids
+        self.columns = columns
+        self._normalized: Dict[str, np.ndarray] = {}
+
+    @classmethod
+    def from_records(cls, records: Sequence[RecordBase]) -> "RecordStore":
+        """
+        Build a store from pydantic records (e.g. an API request).
+
+        Args:
+            records: Records to store
+
+        Returns:
+            RecordStore: Store holding the records
+        """
+        field_names = sorted({field for record in records for field in record.fields})
+        ids = np.array([record.id for record in records], dtype=object)
+        columns = {
+            field: np.array([record.fields.get(field) for record in records], dtype=object)
+            for field in field_names
+        }
+        return cls(ids, columns)
+
+    @classmethod
+    def from_columns(
+        cls, columns: Dict[str, np.ndarray], id_column: Optional[str] = None
+    ) -> "RecordStore":
+        """
+        Build a store from string columns.
+
+        Args:
+            columns: Object array of string values per field
+            id_column: Column holding record IDs (the row number if None)
+
+        Returns:
+            RecordStore: Store holding the columns
+        """
+        columns = dict(columns)
+        if id_column is not None:
+            ids = columns.pop(id_column)
+        else:
+            num_rows = len(next(iter(columns.values()))) if columns else 0
+            ids = np.arange(num_rows).astype(str).astype(object)
+        return cls(ids, columns)
+
+    @classmethod
+    def from_dataframe(cls, df: "pd.DataFrame", id_column: Optional[str] = None) -> "RecordStore":
+        """
+        Build a store from a DataFrame, one column at a time.
+
+        Args:
+            df: DataFrame with one row per record
+            id_column: Column holding record IDs (the DataFrame index if None)
+
+        Returns:
+            RecordStore: Store holding the rows
+        """
+        if id_column is not None:
+            ids = df[id_column].astype(str).to_numpy(dtype=object)
+        else:
+            ids = df.index.astype(str).to_numpy(dtype=object)
+
+        columns = {}
+        for field in df.columns:
+            if field == id_column:
+                continue
+            column = df[field]
+            if column.dtype != object:
+                column = column.astype(str)
+            columns[str(field)] = column.where(column.notna(), "nan").to_numpy(dtype=object)
+
+        return cls(ids, columns)
+
+    @classmethod
+    def from_csv(cls, file_path: str, id_column: Optional[str] = None) -> "RecordStore":
+        """
+        Load a CSV file, keeping every value as its raw text.
+
+        Args:
+            file_path: Path to the CSV file
+            id_column: Column holding record IDs (the row number if None)
+
+        Returns:
+            RecordStore: Store holding the rows
+        """
+        import pandas as pd
+
+        df = pd.read_csv(file_path, dtype=str, keep_default_na=False)
+        return cls.from_dataframe(df, id_column=id_column)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[RecordView, List[RecordView]]:
+        if isinstance(index, slice):
+            return [RecordView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return RecordView(self, index)
+
+    def __iter__(self) -> Iterator[RecordView]:
+        return (RecordView(self, i) for i in range(len(self)))
+
+    @property
+    def fields(self) -> List[str]:
+        """Field names of the store."""
+        return list(self.columns)
+
+    def normalized(self, field: str) -> np.ndarray:
+        """
+        Get a field's values normalized like preprocessing.normalize_text.
+
+        Missing and null values become empty strings. Computed once per field.
+
+        Args:
+            field: Field name
+
+        Returns:
+            Object array of normalized values
+        """
+        if field not in self._normalized:
+            column = self.columns.get(field)
+            if column is None:
+                return np.full(len(self), "", dtype=object)
+
+            import pandas as pd
+
+            values = (
+                pd.Series(np.asarray(column, dtype=object), dtype=object)
+                .fillna("")
+                .astype(str)
+                .str.lower()
+                .str.replace(r"\s+", " ", regex=True)
+                .str.strip()
+            )
+            self._normalized[field] = values.where(~values.isin(_NULL_VALUES), "").to_numpy(
+                dtype=object
+            )
+
+        return self._normalized[field]
+
+    def serialize(
+        self, indices: Optional[Sequence[int]] = None, fields_order: Optional[List[str]] = None
+    ) -> List[str]:
+        """
+        Serialize records for encoding, column by column.
+
+        Produces the same text as preprocessing.serialize_record for each row.
+
+        Args:
+            indices: Rows to serialize (all rows if None)
+            fields_order: Optional order of fields (alphabetical if None)
+
+        Returns:
+            List of serialized record texts
+        """
+        rows = np.arange(len(self)) if indices is None else np.asarray(indices, dtype=np.int64)
+        fields = fields_order or sorted(self.columns)
+
+        parts = [
+            [_serialize_value(field, value) for value in self.columns[field][rows]]
+            for field in fields
+            if field in self.columns
+        ]
+        if not parts:
+            return [""] * len(rows)
+
+        return [" | ".join(part for part in row if part) for row in zip(*parts)]
+
+    def record(self, index: int) -> RecordBase:
+        """
+        Materialize one record as a pydantic model.
+
+        Args:
+            index: Row of the record
+
+        Returns:
+            RecordBase: The record
+        """
+        return RecordBase(
+            id=self.ids[index],
+            fields={
+                field: column[index]
+                for field, column in self.columns.items()
+                if column[index] is not None
+            },
+        )
+
+    def to_records(self, indices: Optional[Sequence[int]] = None) -> List[RecordBase]:
+        """
+        Materialize records as pydantic models.
+
+        Args:
+            indices: Rows to materialize (all rows if None)
+
+        Returns:
+            List of RecordBase
+        """
+        rows = range(len(self)) if indices is None else indices
+        return [self.record(i) for i in rows]
+
+
+def _serialize_value(field: str, value: Optional[str]) -> str:
+    """Serialize one field value, or return an empty string if it is missing or null."""
+    if not value:
+        return ""
+    value = str(value).strip()
+    if not value or value.lower() in _NULL_VALUES:
+        return ""
+    return f"{field}: {value}"
+
+
+def as_record_store(records: Sequence[RecordBase]) -> RecordStore:
+    """
+    Get a record store for records, converting pydantic records if needed.
+
+    Args:
+        records: A RecordStore or a sequence of RecordBase
+
+    Returns:
+        RecordStore: Store holding the records
+    """
+    if isinstance(records, RecordStore):
+        return records
+    return RecordStore.from_records(records)
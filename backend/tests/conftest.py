@@ -1,9 +1,69 @@
 """Pytest configuration and fixtures."""
 
+import zlib
+
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.config import settings
 from app.main import app
+from app.ml import lifecycle, linkage_corpus
+from app.ml import model as model_module
+from app.ml import threshold_optimization
+from app.ml.model import EntityMatchingModel
+from app.utils import dataset_catalog
+
+
+class FakeSentenceTransformer:
+    """Deterministic stand-in for SentenceTransformer (hashed character trigrams)."""
+
+    dimension = 64
+
+    def __init__(self):
+        self.encoded_texts = []
+
+    def encode(
+        self, texts, batch_size=32, convert_to_tensor=True, show_progress_bar=False, **kwargs
+    ):
+        import torch
+
+        self.encoded_texts.extend(texts)
+        embeddings = torch.zeros(len(texts), self.dimension)
+        for row, text in enumerate(texts):
+            text = f"  {text.lower()} "
+            for start in range(len(text) - 2):
+                bucket = zlib.crc32(text[start : start + 3].encode()) % self.dimension
+                embeddings[row, bucket] += 1.0
+        return embeddings
+
+
+@pytest.fixture
+def fake_model(monkeypatch):
+    """Install an EntityMatchingModel backed by a fake encoder as the global model."""
+    model = EntityMatchingModel()
+    model.model = FakeSentenceTransformer()
+    model.is_loaded = True
+    monkeypatch.setattr(model_module, "_model_instance", model)
+    monkeypatch.setattr(lifecycle, "_lifecycle_instance", None)
+    # The fake encoder is slow on long texts; a short warm-up batch is enough
+    monkeypatch.setattr(settings, "MODEL_WARMUP_SEQ_LENGTHS", [8])
+    return model
+
+
+@pytest.fixture
+def data_dirs(tmp_path, monkeypatch):
+    """Point the raw and processed data directories (and what is stored there) at tmp_path."""
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    monkeypatch.setattr(settings, "RAW_DATA_DIR", str(raw_dir))
+    monkeypatch.setattr(settings, "PROCESSED_DATA_DIR", str(tmp_path / "processed"))
+    monkeypatch.setattr(
+        settings, "DATASET_CATALOG_PATH", str(tmp_path / "processed" / "dataset_catalog.json")
+    )
+    monkeypatch.setattr(dataset_catalog, "_catalog_instance", None)
+    monkeypatch.setattr(linkage_corpus, "_registry_instance", None)
+    monkeypatch.setattr(threshold_optimization, "_optimizer_instance", None)
+    return tmp_path
 
 
 @pytest.fixture
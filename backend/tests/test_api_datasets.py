@@ -1,7 +1,13 @@
 """Tests for dataset endpoints."""
 
+import asyncio
+
 import pytest
 
+from app.api.endpoints import datasets
+from app.core.config import settings
+from app.utils import dataset_catalog
+
 
 def test_list_datasets(client):
     """Test listing datasets."""
@@ -25,3 +31,82 @@ def test_get_dataset_info_not_found(client):
     assert response.status_code == 404
     data = response.json()
     assert "detail" in data
+
+
+def test_dataset_indexing_runs_off_the_event_loop(client, data_dirs, monkeypatch):
+    """Test that new files are indexed in a worker thread, not on the event loop."""
+    (data_dirs / "raw" / "people.csv").write_text("name\nJohn Smith\n")
+    on_event_loop = []
+    index_csv = dataset_catalog.index_csv
+
+    def recording_index_csv(*args):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return index_csv(*args)
+
+    monkeypatch.setattr(dataset_catalog, "index_csv", recording_index_csv)
+    assert client.get("/api/v1/datasets/people").json()["num_records"] == 1
+    assert on_event_loop == [False]
+
+
+def test_upload_dataset_is_ingested(client, data_dirs):
+    """Test that an uploaded CSV is stored, ingested and listed."""
+    content = b"name,zip\nJohn Smith,02139\nJane Doe,10001\n"
+    response = client.post(
+        "/api/v1/datasets/upload", files={"file": ("people.csv", content, "text/csv")}
+    )
+    assert response.status_code == 200
+    assert response.json()["size"] == len(content)
+    assert (data_dirs / "raw" / "people.csv").read_bytes() == content
+
+    response = client.get("/api/v1/datasets/people")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["num_records"] == 2
+    assert data["field_types"] == {"name": "string", "zip": "string"}
+    assert data["sample_records"][0]["fields"]["zip"] == "02139"
+
+
+def test_upload_dataset_too_large(client, data_dirs, monkeypatch):
+    """Test that uploads over the size limit are rejected and not kept."""
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_MB", 1)
+    monkeypatch.setattr(settings, "UPLOAD_CHUNK_SIZE", 64 * 1024)
+    content = b"name\n" + b"x" * (2 * 1024 * 1024)
+
+    response = client.post(
+        "/api/v1/datasets/upload", files={"file": ("big.csv", content, "text/csv")}
+    )
+    assert response.status_code == 413
+    assert list((data_dirs / "raw").iterdir()) == []
+
+
+def test_upload_limit_applies_while_receiving(client, data_dirs, monkeypatch):
+    """Test that bodies without a Content-Length are cut off before the upload is handled."""
+    monkeypatch.setattr(settings, "MAX_UPLOAD_SIZE_MB", 1)
+    handled = []
+    monkeypatch.setattr(datasets, "_store_upload", lambda *args: handled.append(args) or 0)
+
+    def body():
+        yield b'--limit\r\nContent-Disposition: form-data; name="file"; filename="big.csv"\r\n\r\n'
+        for _ in range(64):
+            yield b"x" * (64 * 1024)
+        yield b"\r\n--limit--\r\n"
+
+    response = client.post(
+        "/api/v1/datasets/upload",
+        content=body(),
+        headers={"Content-Type": "multipart/form-data; boundary=limit"},
+    )
+    assert response.status_code == 413
+    assert handled == []
+
+
+def test_upload_dataset_rejects_non_csv(client, data_dirs):
+    """Test that only CSV uploads are accepted."""
+    response = client.post(
+        "/api/v1/datasets/upload", files={"file": ("notes.txt", b"hello", "text/plain")}
+    )
+    assert response.status_code == 400
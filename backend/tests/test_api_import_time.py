@@ -0,0 +1,34 @@
+"""Tests for API startup import time."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).parent.parent.parent / "scripts" / "benchmark_import_time.py"
+
+
+@pytest.mark.slow
+def test_app_imports_without_heavy_libraries(tmp_path):
+    """Test that importing the API loads no ML or data library."""
+    output = tmp_path / "import_time.json"
+    # Wall-clock time is noisy on shared runners; CI checks the budget in its own step
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(SCRIPT),
+            "--repeat",
+            "1",
+            "--budget-ms",
+            "inf",
+            "--output",
+            str(output),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    report = json.loads(output.read_text())
+    assert report["heavy_modules"] == []
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -1,7 +1,16 @@
 """Tests for matching endpoints."""
 
+import json
+import os
+import threading
+
 import pytest
 
+from app.core.config import settings
+from app.ml import jobs as jobs_module
+from app.ml import lifecycle as lifecycle_module
+from app.ml.jobs import MatchJobManager
+
 
 @pytest.mark.asyncio
 async def test_predict_match(client, sample_record_pair):
@@ -75,10 +84,153 @@ async def test_batch_match(client, sample_records):
     assert data["matches_found"] >= 0
 
 
-def test_optimize_threshold_not_implemented(client):
-    """Test threshold optimization endpoint (not yet implemented)."""
+def test_batch_match_with_blocking(client, fake_model, sample_records):
+    """Test that blocking prunes pairs and is reported in the response."""
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "threshold": 0.99,
+        "blocking": {"method": "standard", "fields": ["email"]},
+    }
+
+    response = client.post("/api/v1/match/batch", json=request)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert data["blocking_method"] == "standard"
+    assert data["total_comparisons"] == 2
+    assert data["pairs_pruned"] == 2
+    assert data["matches_found"] == 2
+
+
+def test_batch_match_unknown_blocking_method(client, fake_model, sample_records):
+    """Test that an unknown blocking method is a client error."""
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "blocking": {"method": "nonexistent"},
+    }
+
+    response = client.post("/api/v1/match/batch", json=request)
+    assert response.status_code == 400
+
+
+def test_batch_match_stream(client, fake_model, sample_records, monkeypatch):
+    """Test streaming batch matching frames."""
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 1)
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "threshold": 0.99,
+        "blocking": {"method": "full"},
+    }
+
+    response = client.post("/api/v1/match/batch/stream", json=request)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    types = [frame["type"] for frame in frames]
+
+    # Initial progress, then matches and progress per chunk, then the summary
+    assert types[0] == "progress"
+    assert types[-1] == "summary"
+    assert types.count("progress") == 3
+    assert types.count("match") == 2
+
+    match = next(frame for frame in frames if frame["type"] == "match")
+    assert match["result"]["prediction"]["is_match"] is True
+
+    summary = frames[-1]
+    assert summary["total_comparisons"] == 4
+    assert summary["matches_found"] == 2
+    assert frames[-2]["pairs_scored"] == 4
+
+
+def test_batch_match_stream_unknown_scoring_mode(client, fake_model, sample_records):
+    """Test that invalid streaming requests fail before the stream starts."""
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "scoring_mode": "nonexistent",
+    }
+
+    response = client.post("/api/v1/match/batch/stream", json=request)
+    assert response.status_code == 400
+
+
+def test_match_job_lifecycle(client, fake_model, sample_records, tmp_path, monkeypatch):
+    """Test creating a background job, polling it and reading its results."""
+    manager = MatchJobManager(directory=str(tmp_path))
+    monkeypatch.setattr(jobs_module, "_job_manager", manager)
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "threshold": 0.99,
+        "blocking": {"method": "full"},
+    }
+
+    response = client.post("/api/v1/match/jobs", json=request)
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+    manager.wait(job_id, timeout=30)
+
+    response = client.get(f"/api/v1/match/jobs/{job_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["progress"]["pairs_scored"] == 4
+
+    response = client.get(f"/api/v1/match/jobs/{job_id}/results")
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 2
+
+    response = client.delete(f"/api/v1/match/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "completed"
+    manager.shutdown()
+
+
+def test_match_job_waits_for_model(client, fake_model, sample_records, tmp_path, monkeypatch):
+    """Test that no job is queued while the model is not ready."""
+    monkeypatch.setattr(settings, "MODEL_READY_TIMEOUT", 0.05)
+    release = threading.Event()
+    monkeypatch.setattr(lifecycle_module, "warm_up", lambda model: release.wait(5))
+    manager = MatchJobManager(directory=str(tmp_path))
+    monkeypatch.setattr(jobs_module, "_job_manager", manager)
+    request = {"dataset_a": sample_records, "dataset_b": sample_records}
+
+    response = client.post("/api/v1/match/jobs", json=request)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert not os.listdir(tmp_path)
+
+    release.set()
+    lifecycle_module.get_model_lifecycle().wait(timeout=5)
+    manager.shutdown()
+
+
+def test_match_job_not_found(client, tmp_path, monkeypatch):
+    """Test polling an unknown job."""
+    monkeypatch.setattr(jobs_module, "_job_manager", MatchJobManager(directory=str(tmp_path)))
+    response = client.get("/api/v1/match/jobs/missing")
+    assert response.status_code == 404
+
+
+def test_optimize_threshold_dataset_not_found(client, fake_model):
+    """Test threshold optimization of a dataset that does not exist."""
     response = client.get(
         "/api/v1/match/threshold/optimize",
         params={"dataset_name": "test"},
     )
-    assert response.status_code == 501  # Not implemented
+    assert response.status_code == 404
+
+
+def test_matching_metrics(client, fake_model):
+    """Test that inference metrics are exposed."""
+    response = client.get("/api/v1/match/metrics")
+    assert response.status_code == 200
+    data = response.json()
+    assert "batch_size_distribution" in data["micro_batching"]
+    assert "pending" in data["inference_executor"]
+    assert "hits" in data["embedding_cache"]
@@ -0,0 +1,154 @@
+"""Tests for the approximate nearest-neighbour record index."""
+
+import numpy as np
+import pytest
+from app.ml.ann_index import RecordIndex, build_record_index
+from app.ml.inference import batch_predict
+from app.models.schemas import RecordBase
+
+
+@pytest.fixture
+def corpus():
+    """Random corpus of 200 embeddings with string ids."""
+    rng = np.random.default_rng(0)
+    ids = [f"r{i}" for i in range(200)]
+    return ids, rng.normal(size=(200, 32)).astype(np.float32)
+
+
+def _exact_neighbours(embeddings, query, k):
+    """Brute-force cosine nearest neighbours."""
+    vectors = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = vectors @ (query / np.linalg.norm(query))
+    return list(np.argsort(-scores)[:k])
+
+
+def test_search_with_all_lists_is_exact(corpus):
+    """Test that probing every list gives exact nearest neighbours."""
+    ids, embeddings = corpus
+    index = RecordIndex(n_lists=10, n_probe=10)
+    index.build(ids, embeddings)
+
+    neighbours = index.search(embeddings[:3], k=5)
+
+    for query, row in zip(embeddings[:3], neighbours):
+        expected = [ids[i] for i in _exact_neighbours(embeddings, query, 5)]
+        assert [record_id for record_id, _ in row] == expected
+
+
+def test_search_finds_self(corpus):
+    """Test that an indexed vector is its own nearest neighbour with default probing."""
+    ids, embeddings = corpus
+    index = RecordIndex()
+    index.build(ids, embeddings)
+
+    neighbours = index.search(embeddings[:20], k=1)
+
+    assert [row[0][0] for row in neighbours] == ids[:20]
+    assert all(row[0][1] == pytest.approx(1.0, abs=1e-5) for row in neighbours)
+
+
+def test_add_and_remove(corpus):
+    """Test incremental add/remove of records."""
+    ids, embeddings = corpus
+    index = RecordIndex(n_lists=8, n_probe=8)
+    index.build(ids[:100], embeddings[:100])
+
+    index.add(ids[100:], embeddings[100:])
+    assert len(index) == 200
+    assert index.search(embeddings[150:151], k=1)[0][0][0] == "r150"
+
+    index.remove(["r150", "unknown"])
+    assert len(index) == 199
+    assert "r150" not in index
+    assert all(record_id != "r150" for record_id, _ in index.search(embeddings[150:151], k=10)[0])
+
+
+def test_growing_index_is_retrained(corpus):
+    """Test that an index started from a small delta gains lists as it grows."""
+    ids, embeddings = corpus
+    index = RecordIndex()
+    index.add(ids[:4], embeddings[:4])
+    assert index.n_lists == 2
+
+    for start in range(4, 200, 4):
+        index.add(ids[start : start + 4], embeddings[start : start + 4])
+
+    assert len(index) == 200
+    assert index.n_lists >= 8
+    assert [row[0][0] for row in index.search(embeddings[:20], k=1)] == ids[:20]
+
+
+def test_fixed_lists_are_not_retrained(corpus):
+    """Test that an explicit number of lists is kept while records are added."""
+    ids, embeddings = corpus
+    index = RecordIndex(n_lists=2, n_probe=2)
+    index.build(ids[:10], embeddings[:10])
+
+    index.add(ids[10:], embeddings[10:])
+
+    assert index.n_lists == 2
+    assert index.search(embeddings[150:151], k=1)[0][0][0] == "r150"
+
+
+def test_add_existing_id_replaces_vector(corpus):
+    """Test that re-adding an id updates its embedding."""
+    ids, embeddings = corpus
+    index = RecordIndex(n_lists=4, n_probe=4)
+    index.build(ids, embeddings)
+
+    index.add(["r0"], embeddings[1:2])
+
+    assert len(index) == 200
+    np.testing.assert_allclose(index.get_vector("r0"), index.get_vector("r1"), atol=1e-6)
+
+
+def test_save_and_load(corpus, tmp_path):
+    """Test that a saved index answers queries identically after loading."""
+    ids, embeddings = corpus
+    index = RecordIndex(n_lists=8, n_probe=3)
+    index.build(ids, embeddings)
+    index.remove(["r5"])
+
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+    loaded = RecordIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.n_probe == 3
+    assert loaded.search(embeddings[:5], k=4) == index.search(embeddings[:5], k=4)
+    # Record ids are stored without pickling
+    assert np.load(path, allow_pickle=False)["ids"].dtype.kind == "U"
+
+
+def test_load_missing_index(tmp_path):
+    """Test loading a missing index file."""
+    with pytest.raises(FileNotFoundError):
+        RecordIndex.load(str(tmp_path / "missing.npz"))
+
+
+def test_query_record(fake_model):
+    """Test record lookup through the model encoder."""
+    records = [
+        RecordBase(id="1", fields={"name": "John Smith", "city": "New York"}),
+        RecordBase(id="2", fields={"name": "Alice Johnson", "city": "Boston"}),
+        RecordBase(id="3", fields={"name": "Carol White", "city": "Chicago"}),
+    ]
+    index = build_record_index(records, fake_model)
+
+    neighbours = index.query(RecordBase(fields={"name": "Alice Johnson", "city": "Boston"}), k=2)
+
+    assert neighbours[0][0] == "2"
+    assert neighbours[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+async def test_batch_predict_ann_mode(fake_model):
+    """Test that retrieval mode only scores k neighbours per record."""
+    dataset_a = [RecordBase(fields={"name": f"Person {i}"}) for i in range(5)]
+    dataset_b = [RecordBase(fields={"name": f"Person {i}"}) for i in range(10)]
+
+    result = await batch_predict(dataset_a, dataset_b, threshold=0.99, scoring_mode="ann", top_k=2)
+
+    assert result.blocking_method == "ann"
+    assert result.total_comparisons == 10
+    assert result.pairs_pruned == 40
+    assert result.matches_found == 5
@@ -0,0 +1,82 @@
+"""Tests for the alternative inference backends."""
+
+import pytest
+import torch
+from app.core.config import settings
+from app.ml.backends import embedding_parity, load_sentence_transformer, measure_throughput
+from app.ml.model import EntityMatchingModel
+
+TEXTS = ["john smith new york", "jon smyth", "abc 123", "new york 10001"] * 4
+VOCAB = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]", "john", "smith", "new", "york"] + list(
+    "abcdefghijklmnopqrstuvwxyz0123456789"
+)
+
+
+@pytest.fixture(scope="module")
+def tiny_model_path(tmp_path_factory):
+    """A randomly initialised two-layer BERT sentence transformer saved to disk."""
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertModel, BertTokenizer
+
+    root = tmp_path_factory.mktemp("tiny-model")
+    hf_dir = root / "hf"
+    hf_dir.mkdir()
+    (hf_dir / "vocab.txt").write_text("\n".join(VOCAB))
+    BertTokenizer(str(hf_dir / "vocab.txt")).save_pretrained(str(hf_dir))
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=len(VOCAB),
+        hidden_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        intermediate_size=64,
+        max_position_embeddings=64,
+    )
+    BertModel(config).save_pretrained(str(hf_dir))
+
+    transformer = models.Transformer(str(hf_dir), max_seq_length=32)
+    model = SentenceTransformer(modules=[transformer, models.Pooling(32)])
+    model.save(str(root / "model"))
+    return str(root / "model")
+
+
+def test_unknown_backend(tiny_model_path):
+    """Test that an unknown backend is rejected."""
+    with pytest.raises(ValueError, match="Unknown model backend"):
+        load_sentence_transformer(tiny_model_path, "cpu", "tensorrt")
+
+
+def test_fingerprint_includes_backend():
+    """Test that embeddings of different backends are cached separately."""
+    torch_model = EntityMatchingModel(model_name="model", backend="torch")
+    int8_model = EntityMatchingModel(model_name="model", backend="torch-int8")
+
+    assert torch_model.fingerprint == "model"
+    assert int8_model.fingerprint != torch_model.fingerprint
+    assert int8_model.device == "cpu"
+
+
+def test_torch_int8_parity(tiny_model_path):
+    """Test that dynamic INT8 quantization stays close to the torch embeddings."""
+    reference = EntityMatchingModel(model_name=tiny_model_path, backend="torch")
+    quantized = EntityMatchingModel(model_name=tiny_model_path, backend="torch-int8")
+
+    parity = embedding_parity(reference, quantized, TEXTS)
+
+    assert parity["max_cosine_deviation"] < 0.05
+    assert any("quantized" in type(m).__module__ for m in quantized.model.modules())
+    assert measure_throughput(quantized, TEXTS, batch_size=8, repeats=1) > 0
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_parity(tiny_model_path, tmp_path, monkeypatch, backend):
+    """Test that the ONNX backends reproduce the torch embeddings."""
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("optimum.onnxruntime")
+    monkeypatch.setattr(settings, "MODEL_PATH", str(tmp_path))
+
+    reference = EntityMatchingModel(model_name=tiny_model_path, backend="torch")
+    candidate = EntityMatchingModel(model_name=tiny_model_path, backend=backend)
+
+    assert embedding_parity(reference, candidate, TEXTS)["max_cosine_deviation"] < 0.05
@@ -0,0 +1,122 @@
+"""Tests for blocking (candidate pair generation)."""
+
+import pytest
+from app.ml.blocking import (
+    Blocker,
+    FullBlocker,
+    StandardBlocker,
+    TokenBlocker,
+    QGramBlocker,
+    SortedNeighbourhoodBlocker,
+    get_blocker,
+)
+from app.models.schemas import BlockingConfig, RecordBase
+
+
+@pytest.fixture
+def dataset_a():
+    """First dataset for blocking tests."""
+    return [
+        RecordBase(id="a1", fields={"name": "John Smith", "city": "New York"}),
+        RecordBase(id="a2", fields={"name": "Alice Johnson", "city": "Boston"}),
+        RecordBase(id="a3", fields={"name": "Bob Wilson", "city": "nan"}),
+    ]
+
+
+@pytest.fixture
+def dataset_b():
+    """Second dataset for blocking tests."""
+    return [
+        RecordBase(id="b1", fields={"name": "J. Smith", "city": "new york"}),
+        RecordBase(id="b2", fields={"name": "Alicia Johnson", "city": "Seattle"}),
+        RecordBase(id="b3", fields={"name": "Carol White", "city": "Chicago"}),
+    ]
+
+
+def test_full_blocker(dataset_a, dataset_b):
+    """Test that full blocking yields the cartesian product."""
+    pairs = FullBlocker().candidate_pairs(dataset_a, dataset_b)
+    assert len(pairs) == len(dataset_a) * len(dataset_b)
+
+
+def test_standard_blocker(dataset_a, dataset_b):
+    """Test exact key blocking on a single field."""
+    pairs = StandardBlocker(fields=["city"]).candidate_pairs(dataset_a, dataset_b)
+    # Normalization makes "New York" and "new york" share a block
+    assert pairs == [(0, 0)]
+
+
+def test_standard_blocker_ignores_missing_values(dataset_a, dataset_b):
+    """Test that null-like values never form a block."""
+    blocker = StandardBlocker(fields=["city"])
+    assert blocker.block_keys(dataset_a[2]) == set()
+
+
+def test_token_blocker(dataset_a, dataset_b):
+    """Test token blocking on the name field."""
+    pairs = TokenBlocker(fields=["name"]).candidate_pairs(dataset_a, dataset_b)
+    assert (0, 0) in pairs  # shared token "smith"
+    assert (1, 1) in pairs  # shared token "johnson"
+    assert (2, 2) not in pairs
+
+
+def test_token_blocker_keys_are_per_field():
+    """Test that the same token in different fields does not share a block."""
+    record_a = RecordBase(fields={"name": "Jordan", "city": "Paris"})
+    record_b = RecordBase(fields={"name": "Paris", "city": "Jordan"})
+    assert TokenBlocker().candidate_pairs([record_a], [record_b]) == []
+
+
+def test_token_blocker_skips_oversized_blocks():
+    """Test that blocks above max_block_size are dropped."""
+    records = [RecordBase(fields={"name": f"Smith {i}"}) for i in range(5)]
+    pairs = TokenBlocker(fields=["name"], max_block_size=3).candidate_pairs(records, records)
+    # Only the per-record number tokens survive
+    assert pairs == [(i, i) for i in range(5)]
+
+
+def test_qgram_blocker_tolerates_typos():
+    """Test q-gram blocking matches values with small typos."""
+    record_a = RecordBase(fields={"name": "Christopher"})
+    record_b = RecordBase(fields={"name": "Chistopher"})
+    pairs = QGramBlocker(q=3).candidate_pairs([record_a], [record_b])
+    assert pairs == [(0, 0)]
+
+
+def test_sorted_neighbourhood_blocker():
+    """Test sorted-neighbourhood only pairs records within the window."""
+    dataset_a = [RecordBase(fields={"name": n}) for n in ["aaron", "mike", "zoe"]]
+    dataset_b = [RecordBase(fields={"name": n}) for n in ["aaronn", "mikey", "zoey"]]
+
+    pairs = SortedNeighbourhoodBlocker(window_size=2).candidate_pairs(dataset_a, dataset_b)
+    assert pairs == [(0, 0), (1, 0), (1, 1), (2, 1), (2, 2)]
+
+
+def test_get_blocker_uses_config():
+    """Test blocker construction from a blocking config."""
+    blocker = get_blocker(BlockingConfig(method="qgram", fields=["name"], q=2))
+    assert isinstance(blocker, QGramBlocker)
+    assert blocker.q == 2
+    assert blocker.fields == ["name"]
+
+
+def test_get_blocker_unknown_method():
+    """Test that unknown blocking methods are rejected."""
+    with pytest.raises(ValueError):
+        get_blocker(BlockingConfig(method="nonexistent"))
+
+
+def test_sorted_neighbourhood_rejects_max_block_size():
+    """Test that sorted-neighbourhood blocking does not silently ignore max_block_size."""
+    with pytest.raises(ValueError):
+        get_blocker(BlockingConfig(method="sorted_neighbourhood", max_block_size=10))
+
+
+def test_blocker_requires_block_keys():
+    """Test that a blocking strategy must implement block_keys."""
+
+    class KeylessBlocker(Blocker):
+        method = "keyless"
+
+    with pytest.raises(TypeError):
+        KeylessBlocker()
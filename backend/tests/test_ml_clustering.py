@@ -0,0 +1,161 @@
+"""Tests for entity clustering over pairwise matches."""
+
+import json
+
+import numpy as np
+import pytest
+
+from app.ml.clustering import MatchGraph, cluster_edges, cluster_match_edges, group_clusters
+from app.ml.inference import batch_predict
+from app.models.schemas import BlockingConfig, ClusteringConfig, MatchEdge, RecordBase
+
+
+def _cluster(edges, num_nodes, **config):
+    rows, cols, scores = zip(*edges)
+    labels = cluster_edges(num_nodes, rows, cols, scores, ClusteringConfig(**config))
+    return sorted(sorted(nodes.tolist()) for nodes in group_clusters(labels, True))
+
+
+# Two strong pairs joined by one weak link
+CHAIN = [(0, 1, 0.95), (1, 2, 0.6), (2, 3, 0.95), (4, 5, 0.9)]
+
+
+def test_connected_components_is_transitive_closure():
+    """Test that connected components merge every chain of links."""
+    assert _cluster(CHAIN, 7, method="connected_components") == [[0, 1, 2, 3], [4, 5], [6]]
+
+
+def test_threshold_drops_weak_links():
+    """Test that links below the clustering threshold are ignored."""
+    assert _cluster(CHAIN, 6, threshold=0.7) == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_center_clustering_breaks_weak_chains():
+    """Test that center clustering does not merge clusters through a weak link."""
+    assert _cluster(CHAIN, 6, method="center") == [[0, 1], [2, 3], [4, 5]]
+
+
+def test_correlation_clustering_splits_clusters_at_pivots():
+    """Test that pivot clustering keeps cliques and only groups pivot neighbours."""
+    cliques = [(0, 1, 0.9), (0, 2, 0.9), (1, 2, 0.9), (3, 4, 0.9)]
+    assert _cluster(cliques, 5, method="correlation") == [[0, 1, 2], [3, 4]]
+
+    # A path of three links is never one cluster: no record neighbours all others
+    path = [(0, 1, 0.9), (1, 2, 0.9), (2, 3, 0.9)]
+    clusters = _cluster(path, 4, method="correlation")
+    assert len(clusters) >= 2
+    assert sorted(node for cluster in clusters for node in cluster) == [0, 1, 2, 3]
+
+
+def test_labels_are_numbered_by_first_node():
+    """Test that cluster labels are deterministic and dense."""
+    labels = cluster_edges(5, [3, 1], [4, 0], [0.9, 0.9])
+    assert labels.tolist() == [0, 0, 1, 2, 2]
+
+
+def test_unknown_method():
+    """Test that an unknown clustering method is rejected."""
+    with pytest.raises(ValueError):
+        cluster_edges(2, [0], [1], [0.9], ClusteringConfig(method="nonexistent"))
+    with pytest.raises(ValueError):
+        MatchGraph([], [], ClusteringConfig(method="nonexistent"))
+
+
+def test_connected_components_scale():
+    """Test clustering a large shuffled edge list against its known component count."""
+    rng = np.random.default_rng(0)
+    num_nodes = 200_000
+    # Link every node to its successor within blocks of 4: 50,000 components
+    rows = np.arange(num_nodes)[np.arange(num_nodes) % 4 != 3]
+    rows = rng.permutation(rows)
+    labels = cluster_edges(num_nodes, rows, rows + 1, np.full(len(rows), 0.9))
+    assert labels.max() + 1 == num_nodes // 4
+
+
+def test_match_graph_members_from_both_datasets():
+    """Test that batch matches become clusters of records of both datasets."""
+    graph = MatchGraph(["a0", "a1"], ["b0", None, "b2"])
+    graph.add([(0, 1, 0.9), (1, 2, 0.8)])
+    graph.add([(0, 0, 0.85)])
+
+    clusters = list(graph.clusters())
+    assert [cluster.size for cluster in clusters] == [3, 2]
+    assert [(member.dataset, member.index, member.id) for member in clusters[0].members] == [
+        ("a", 0, "a0"),
+        ("b", 0, "b0"),
+        ("b", 1, None),
+    ]
+
+    graph.config = ClusteringConfig(include_singletons=True)
+    assert sum(cluster.size for cluster in graph.clusters()) == 5
+
+
+def test_cluster_match_edges_by_id():
+    """Test clustering matches between record IDs."""
+    edges = [
+        MatchEdge(id_a="x", id_b="y", similarity=0.9),
+        MatchEdge(id_a="y", id_b="z", similarity=0.9),
+        MatchEdge(id_a="u", id_b="v", similarity=0.5),
+    ]
+    clusters = list(cluster_match_edges(edges))
+    assert [[member.id for member in cluster.members] for cluster in clusters] == [
+        ["u", "v"],
+        ["x", "y", "z"],
+    ]
+    assert list(cluster_match_edges([])) == []
+
+
+async def test_batch_predict_with_clustering(fake_model):
+    """Test that batch matching can return entity clusters."""
+    dataset_a = [RecordBase(id=f"a{i}", fields={"name": f"Person {i}"}) for i in range(3)]
+    dataset_b = [RecordBase(id=f"b{i}", fields={"name": f"Person {i}"}) for i in range(2)]
+
+    result = await batch_predict(
+        dataset_a,
+        dataset_b,
+        threshold=0.99,
+        blocking=BlockingConfig(method="full"),
+        clustering=ClusteringConfig(),
+    )
+
+    assert [[member.id for member in cluster.members] for cluster in result.clusters] == [
+        ["a0", "b0"],
+        ["a1", "b1"],
+    ]
+    without = await batch_predict(dataset_a, dataset_b, blocking=BlockingConfig(method="full"))
+    assert without.clusters is None
+
+
+def test_cluster_endpoints(client, fake_model, sample_records):
+    """Test the cluster endpoint and cluster frames of streaming batch matching."""
+    response = client.post(
+        "/api/v1/match/cluster",
+        json={"edges": [{"id_a": "1", "id_b": "2", "similarity": 0.9}]},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [(line["cluster_id"], line["size"]) for line in lines] == [(0, 2)]
+    assert [member["id"] for member in lines[0]["members"]] == ["1", "2"]
+
+    response = client.post(
+        "/api/v1/match/cluster", json={"edges": [], "clustering": {"method": "nonexistent"}}
+    )
+    assert response.status_code == 400
+
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "threshold": 0.99,
+        "blocking": {"method": "full"},
+        "clustering": {"method": "center"},
+    }
+    response = client.post("/api/v1/match/batch/stream", json=request)
+    frames = [json.loads(line) for line in response.text.splitlines()]
+    clusters = [frame["cluster"] for frame in frames if frame["type"] == "cluster"]
+    assert frames[-1]["type"] == "summary"
+    assert [cluster["size"] for cluster in clusters] == [2, 2]
+
+    request["clustering"] = {"method": "nonexistent"}
+    assert client.post("/api/v1/match/batch/stream", json=request).status_code == 400
+    assert client.post("/api/v1/match/batch", json=request).status_code == 400
@@ -0,0 +1,163 @@
+"""Tests for precomputed dataset embeddings."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.ml import lifecycle as lifecycle_module
+from app.ml.dataset_embeddings import load_dataset_embeddings, precompute_dataset_embeddings
+from app.ml.inference import BatchMatchRun, resolve_dataset_b
+from app.ml.preprocessing import serialize_records
+from app.models.schemas import BatchMatchRequest, RecordBase
+
+CSV = (
+    "name,city\n"
+    "John Smith,New York\n"
+    "Jane Doe,Boston\n"
+    "Robert Brown,Chicago\n"
+    "Maria Garcia,Houston\n"
+)
+
+
+@pytest.fixture
+def people(data_dirs):
+    """A stored dataset of four people."""
+    path = data_dirs / "raw" / "people.csv"
+    path.write_text(CSV)
+    return path
+
+
+def _queries():
+    return [
+        RecordBase(id="q1", fields={"name": "Jon Smith", "city": "New York"}),
+        RecordBase(id="q2", fields={"name": "Maria Garcia", "city": "Houston"}),
+    ]
+
+
+def test_precompute_and_mmap(fake_model, people):
+    """Test that embeddings are stored normalized and loaded memory-mapped."""
+    embeddings = precompute_dataset_embeddings("people", model=fake_model, dtype="float16")
+
+    assert embeddings.meta["num_records"] == 4
+    assert embeddings.meta["fingerprint"] == fake_model.fingerprint
+    assert embeddings.matrix.dtype == np.float16
+    assert list(embeddings.ids) == ["0", "1", "2", "3"]
+    assert embeddings.row("2") == 2
+
+    loaded = load_dataset_embeddings("people", model=fake_model)
+    assert isinstance(loaded.matrix, np.memmap)
+    np.testing.assert_allclose(np.linalg.norm(loaded.rows().numpy(), axis=1), 1.0, atol=1e-3)
+
+
+def test_stale_embeddings_are_ignored(fake_model, people):
+    """Test that embeddings of a modified file or another model are not used."""
+    precompute_dataset_embeddings("people", model=fake_model)
+
+    fake_model.fingerprint = "other-weights"
+    assert load_dataset_embeddings("people", model=fake_model) is None
+
+    fake_model.fingerprint = "sentence-transformers/all-MiniLM-L6-v2"
+    people.write_text(CSV + "Ann Lee,Seattle\n")
+    assert load_dataset_embeddings("people", model=fake_model) is None
+
+    with pytest.raises(FileNotFoundError):
+        load_dataset_embeddings("missing", model=fake_model)
+
+
+@pytest.mark.parametrize("scoring_mode", ["record", "ann"])
+def test_run_uses_precomputed_embeddings(fake_model, people, scoring_mode):
+    """Test that a run scores like an encoding run without encoding dataset_b."""
+    precompute_dataset_embeddings("people", model=fake_model, dtype="float32")
+    request = BatchMatchRequest(
+        dataset_a=_queries(), reference_dataset="people", scoring_mode=scoring_mode
+    )
+    dataset_b, embeddings_b = resolve_dataset_b(request, model=fake_model)
+    assert embeddings_b is not None
+
+    def run_matches(embeddings):
+        run = BatchMatchRun(
+            request.dataset_a,
+            dataset_b,
+            threshold=0.5,
+            scoring_mode=scoring_mode,
+            model=fake_model,
+            embeddings_b=embeddings,
+        )
+        return [(i, j, round(score, 4)) for chunk in run.chunks() for i, j, score in chunk]
+
+    fake_model.model.encoded_texts.clear()
+    precomputed = run_matches(embeddings_b)
+    assert set(fake_model.model.encoded_texts) == set(serialize_records(request.dataset_a))
+
+    assert precomputed == run_matches(None)
+    assert (1, 3) in {(i, j) for i, j, _ in precomputed}
+
+
+def test_resolve_dataset_b_validation(people):
+    """Test that a request cannot give both dataset_b and a reference dataset."""
+    request = BatchMatchRequest(
+        dataset_a=_queries(), dataset_b=_queries(), reference_dataset="people"
+    )
+    with pytest.raises(ValueError):
+        resolve_dataset_b(request)
+
+
+def test_embeddings_endpoints(client, fake_model, people):
+    """Test precomputing embeddings through the API and matching against them."""
+    assert client.get("/api/v1/datasets/people/embeddings").status_code == 404
+    assert client.post("/api/v1/datasets/missing/embeddings").status_code == 404
+    assert client.post("/api/v1/datasets/people/embeddings?dtype=int8").status_code == 400
+
+    response = client.post("/api/v1/datasets/people/embeddings")
+    assert response.status_code == 202
+
+    # Precomputation runs on the inference executor
+    for _ in range(100):
+        response = client.get("/api/v1/datasets/people/embeddings")
+        if response.status_code == 200:
+            break
+        time.sleep(0.05)
+    assert response.status_code == 200
+    assert response.json()["num_records"] == 4
+
+    response = client.post(
+        "/api/v1/match/batch",
+        json={
+            "dataset_a": [record.model_dump() for record in _queries()],
+            "reference_dataset": "people",
+            "threshold": 0.9,
+        },
+    )
+    assert response.status_code == 200
+    names = [
+        result["record_pair"]["record_b"]["fields"]["name"]
+        for result in response.json()["match_results"]
+    ]
+    assert "Maria Garcia" in names
+
+    response = client.post(
+        "/api/v1/match/batch",
+        json={
+            "dataset_a": [record.model_dump() for record in _queries()],
+            "reference_dataset": "x",
+        },
+    )
+    assert response.status_code == 404
+
+
+def test_precompute_waits_for_model(client, fake_model, people, monkeypatch):
+    """Test that precomputation is not scheduled while the model is not ready."""
+    monkeypatch.setattr(settings, "MODEL_READY_TIMEOUT", 0.05)
+    release = threading.Event()
+    monkeypatch.setattr(lifecycle_module, "warm_up", lambda model: release.wait(5))
+
+    response = client.post("/api/v1/datasets/people/embeddings")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    release.set()
+    lifecycle_module.get_model_lifecycle().wait(timeout=5)
+    assert client.get("/api/v1/datasets/people/embeddings").status_code == 404
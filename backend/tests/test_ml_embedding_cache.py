@@ -0,0 +1,120 @@
+"""Tests for the embedding cache."""
+
+import os
+
+import numpy as np
+import torch
+from app.ml.embedding_cache import EmbeddingCache, make_cache_key
+
+
+def _vectors(n, dim=4):
+    return np.arange(n * dim, dtype=np.float32).reshape(n, dim)
+
+
+def test_cache_key_depends_on_model_and_length():
+    """Test that keys change with model fingerprint and max sequence length."""
+    key = make_cache_key("model-a", 128, "John Smith")
+    assert key == make_cache_key("model-a", 128, "John Smith")
+    assert key != make_cache_key("model-b", 128, "John Smith")
+    assert key != make_cache_key("model-a", 256, "John Smith")
+
+
+def test_memory_lru_eviction():
+    """Test that the least recently used entry is evicted first."""
+    cache = EmbeddingCache(max_entries=2)
+    cache.bind("model")
+    cache.put_many(["a", "b"], _vectors(2))
+
+    cache.get_many(["a"])  # "b" is now least recently used
+    cache.put_many(["c"], _vectors(1))
+
+    a, b, c = cache.get_many(["a", "b", "c"])
+    assert a is not None and c is not None
+    assert b is None
+
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 3
+    assert stats["misses"] == 1
+
+
+def test_cached_vectors_do_not_reference_their_batch(tmp_path):
+    """Test that cached rows are copies, so a surviving entry does not keep its batch alive."""
+    cache = EmbeddingCache(max_entries=10, directory=str(tmp_path))
+    cache.bind("model")
+    batch = _vectors(3)
+    cache.put_many(["a", "b", "c"], batch)
+
+    assert all(vector.base is None for vector in cache.get_many(["a", "b", "c"]))
+
+    # Rows promoted from the disk tier are copied out of the memory map too
+    restarted = EmbeddingCache(max_entries=10, directory=str(tmp_path))
+    restarted.bind("model")
+    restarted.get_many(["a"])
+    assert restarted.get_many(["a"])[0].base is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that embeddings persisted to disk are found by a new cache."""
+    cache = EmbeddingCache(max_entries=10, directory=str(tmp_path))
+    cache.bind("model")
+    cache.put_many(["a", "b"], _vectors(2))
+
+    restarted = EmbeddingCache(max_entries=10, directory=str(tmp_path))
+    restarted.bind("model")
+    a, b = restarted.get_many(["a", "b"])
+
+    np.testing.assert_array_equal(b, _vectors(2)[1])
+    assert restarted.stats()["disk_hits"] == 2
+
+    # Another fingerprint uses a separate namespace
+    restarted.bind("other-model")
+    assert restarted.get_many(["a"]) == [None]
+
+
+def test_disk_tier_recovers_from_interrupted_writes(tmp_path):
+    """Test that a crash between writing the metadata, vectors and keys loses no alignment."""
+    cache = EmbeddingCache(max_entries=0, directory=str(tmp_path))
+    cache.bind("model")
+    cache.put_many(["a"], _vectors(1))
+    tier = cache._disk
+
+    # Crash after the vectors of "b" were written but before its key
+    with open(tier.vectors_path, "ab") as f:
+        f.write(_vectors(2)[1].tobytes())
+
+    restarted = EmbeddingCache(max_entries=0, directory=str(tmp_path))
+    restarted.bind("model")
+    restarted.put_many(["c"], _vectors(3)[2:])
+    a, b, c = restarted.get_many(["a", "b", "c"])
+    assert b is None
+    np.testing.assert_array_equal(a, _vectors(1)[0])
+    np.testing.assert_array_equal(c, _vectors(3)[2])
+
+    # Crash after the metadata was written but before any vector or key
+    os.remove(tier.vectors_path)
+    os.remove(tier.keys_path)
+    restarted = EmbeddingCache(max_entries=0, directory=str(tmp_path))
+    restarted.bind("model")
+    assert restarted.get_many(["a"]) == [None]
+
+
+def test_bind_drops_memory_tier():
+    """Test that rebinding to new weights invalidates cached embeddings."""
+    cache = EmbeddingCache(max_entries=10)
+    cache.bind("model")
+    cache.put_many(["a"], _vectors(1))
+
+    cache.bind("fine-tuned")
+    assert cache.get_many(["a"]) == [None]
+
+
+def test_model_encode_uses_cache(fake_model):
+    """Test that repeated texts are only run through the encoder once."""
+    first = fake_model.encode(["John Smith", "Alice Johnson"])
+    second = fake_model.encode(["Alice Johnson", "John Smith", "John Smith"])
+
+    assert fake_model.model.encoded_texts == ["John Smith", "Alice Johnson"]
+    assert torch.equal(second[0], first[1])
+    assert torch.equal(second[2], first[0])
+    assert fake_model.embedding_cache.stats()["hits"] == 3
@@ -0,0 +1,60 @@
+"""Tests for the inference executor."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from app.ml.executor import InferenceExecutor, InferenceOverloadedError
+
+
+@pytest.fixture
+def executor():
+    """Single-worker executor with a small pending bound."""
+    executor = InferenceExecutor(max_workers=1, max_pending=2)
+    yield executor
+    executor.shutdown()
+
+
+async def test_run_returns_result(executor):
+    """Test that functions run on the pool and return their value."""
+    assert await executor.run(sum, [1, 2, 3]) == 6
+    assert executor.stats()["completed"] == 1
+    assert executor.stats()["pending"] == 0
+
+
+async def test_run_does_not_block_event_loop(executor):
+    """Test that the event loop keeps serving while inference runs."""
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(executor.run(time.sleep, 0.2), ticker())
+
+    assert len(ticks) == 5
+    assert ticks[-1] - ticks[0] < 0.15
+
+
+async def test_run_rejects_when_overloaded(executor):
+    """Test backpressure once max_pending calls are queued."""
+    release = threading.Event()
+    first = asyncio.ensure_future(executor.run(release.wait))
+    second = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceOverloadedError):
+        await executor.run(sum, [1])
+    assert executor.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(first, second)
+    assert await executor.run(sum, [1]) == 1
+
+
+def test_submit_never_rejects(executor):
+    """Test that queued background work waits instead of being rejected."""
+    futures = [executor.submit(sum, [i]) for i in range(5)]
+    assert [future.result() for future in futures] == list(range(5))
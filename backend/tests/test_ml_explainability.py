@@ -0,0 +1,142 @@
+"""Tests for field-level KernelSHAP and token occlusion explanations."""
+
+from math import comb
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.ml.explainability import RecordLinkageExplainer, field_coalitions, solve_shapley_values
+from app.ml.preprocessing import serialize_record_pair
+from app.models.schemas import RecordBase, RecordPair
+
+
+def _additive_values(masks, field_values):
+    return masks.astype(np.float64) @ field_values
+
+
+def test_enumerated_coalitions_use_shapley_kernel():
+    """Test that small field sets are enumerated with exact kernel weights."""
+    masks, weights = field_coalitions(4, num_samples=100)
+    assert len(masks) == 2**4 - 2
+    assert len({tuple(mask) for mask in masks.tolist()}) == len(masks)
+
+    sizes = masks.sum(axis=1)
+    expected = 3 / (comb(4, 1) * 1 * 3)
+    assert weights[sizes == 1] == pytest.approx(np.full(4, expected))
+
+
+def test_sampled_coalitions_are_bounded_and_paired():
+    """Test that large field sets are sampled in complementary pairs."""
+    masks, weights = field_coalitions(20, num_samples=64)
+    assert len(masks) <= 64
+    assert weights.sum() == 64
+    coalitions = {tuple(mask) for mask in masks.tolist()}
+    assert all(tuple(~np.array(mask)) in coalitions for mask in coalitions)
+    assert not masks.all(axis=1).any() and masks.any(axis=1).all()
+
+
+@pytest.mark.parametrize("num_fields,num_samples", [(1, 100), (3, 100), (12, 200)])
+def test_additive_game_is_recovered_exactly(num_fields, num_samples):
+    """Test that the regression recovers the contributions of an additive value function."""
+    field_values = np.linspace(-0.3, 0.5, num_fields)
+    masks, weights = field_coalitions(num_fields, num_samples)
+
+    contributions = solve_shapley_values(
+        masks,
+        weights,
+        _additive_values(masks, field_values),
+        full_value=field_values.sum(),
+        base_value=0.0,
+    )
+    assert contributions == pytest.approx(field_values)
+
+
+def test_explanation_sums_to_similarity(fake_model, monkeypatch):
+    """Test that field contributions add up to the similarity from one batched encode."""
+    record_pair = RecordPair(
+        record_a=RecordBase(fields={"name": "John Smith", "city": "New York", "zip": "10001"}),
+        record_b=RecordBase(fields={"name": "John Smith", "city": "Boston", "phone": "555"}),
+    )
+    calls = []
+    encode_unique = fake_model.encode_unique
+    monkeypatch.setattr(
+        fake_model, "encode_unique", lambda texts: calls.append(texts) or encode_unique(texts)
+    )
+
+    explanation = RecordLinkageExplainer(fake_model).explain(record_pair)
+    assert len(calls) == 1
+
+    similarity, _, _ = fake_model.compute_similarity(*serialize_record_pair(record_pair, False))
+    contributions = {c.field_name: c.contribution for c in explanation.feature_contributions}
+    assert sum(contributions.values()) == pytest.approx(similarity, abs=1e-5)
+    assert set(contributions) == {"city", "name", "phone", "zip"}
+    assert explanation.top_positive_features[0] == "name"
+    assert contributions["name"] > contributions["city"]
+
+
+def test_explanation_of_records_without_fields(fake_model):
+    """Test explaining a pair that has no fields."""
+    record_pair = RecordPair(record_a=RecordBase(fields={}), record_b=RecordBase(fields={}))
+    explanation = RecordLinkageExplainer(fake_model).explain(record_pair)
+    assert explanation.feature_contributions == []
+
+
+def _name_pair():
+    return RecordPair(
+        record_a=RecordBase(fields={"name": "John Smith", "city": "Boston"}),
+        record_b=RecordBase(fields={"name": "John Smith", "city": "Chicago"}),
+    )
+
+
+def test_token_occlusion_attributions(fake_model, monkeypatch):
+    """Test that occluding tokens is batched and attributes the similarity to tokens."""
+    monkeypatch.setattr(settings, "TOKEN_ATTRIBUTION_BATCH_SIZE", 4)
+    calls = []
+    encode_uncached = fake_model.encode_uncached
+    monkeypatch.setattr(
+        fake_model,
+        "encode_uncached",
+        lambda texts, *a: calls.append(texts) or encode_uncached(texts, *a),
+    )
+
+    result = RecordLinkageExplainer(fake_model).explain_tokens(_name_pair())
+    # "city: Boston | name: John Smith" and "city: Chicago | name: John Smith"
+    assert result.num_tokens == result.tokens_evaluated == 12
+    assert result.complete
+    # The two full texts, then three batches of occluded texts
+    assert [len(texts) for texts in calls] == [2, 4, 4, 4]
+
+    by_token = {(c.side, c.token): c.contribution for c in result.token_contributions}
+    assert by_token[("a", "Smith")] > 0
+    assert by_token[("a", "Boston")] < by_token[("a", "Smith")]
+    assert {c.position for c in result.token_contributions if c.side == "a"} == set(range(6))
+
+
+def test_token_attribution_budget(fake_model, monkeypatch):
+    """Test that token attribution stops at the requested and configured budgets."""
+    explainer = RecordLinkageExplainer(fake_model)
+    result = explainer.explain_tokens(_name_pair(), max_tokens=5)
+    assert (result.tokens_evaluated, result.complete) == (5, False)
+    assert {c.side for c in result.token_contributions} == {"a"}
+
+    monkeypatch.setattr(settings, "TOKEN_ATTRIBUTION_MAX_TOKENS", 3)
+    assert explainer.explain_tokens(_name_pair(), max_tokens=100).tokens_evaluated == 3
+
+    monkeypatch.setattr(settings, "TOKEN_ATTRIBUTION_BATCH_SIZE", 1)
+    result = explainer.explain_tokens(_name_pair(), time_budget=1e-9)
+    assert result.tokens_evaluated == 1
+
+
+def test_token_attribution_endpoint(client, fake_model):
+    """Test that token attributions are served by their own endpoint."""
+    pair = _name_pair().model_dump()
+    response = client.post("/api/v1/match/explain/tokens", json=pair, params={"max_tokens": 2})
+    assert response.status_code == 200
+    assert response.json()["tokens_evaluated"] == 2
+
+    response = client.post("/api/v1/match/explain/tokens", json=pair, params={"max_tokens": 0})
+    assert response.status_code == 400
+
+    response = client.post("/api/v1/match/predict", json=pair)
+    assert response.json()["explanation"]["token_contributions"] is None
@@ -0,0 +1,107 @@
+"""Tests for deferred batch match explanations."""
+
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.ml import explanation_store
+from app.ml.explanation_store import ExplanationStore
+from app.ml.inference import BatchMatchRun
+from app.models.schemas import BlockingConfig, RecordBase, RecordPair
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """A fresh global explanation store."""
+    store = ExplanationStore(max_pairs=2)
+    monkeypatch.setattr(explanation_store, "_store_instance", store)
+    return store
+
+
+def _pair(name_b):
+    return RecordPair(
+        record_a=RecordBase(fields={"name": "John Smith"}),
+        record_b=RecordBase(fields={"name": name_b}),
+    )
+
+
+def test_explanations_are_lazy_and_memoized(fake_model, store, monkeypatch):
+    """Test that an explanation is computed on the first request only."""
+    explanation_id = store.register(_pair("Jon Smith"))
+    assert store.register(_pair("Jon Smith")) == explanation_id
+    assert store._explanations == {}
+
+    calls = []
+    explain = explanation_store.RecordLinkageExplainer.explain
+    monkeypatch.setattr(
+        explanation_store.RecordLinkageExplainer,
+        "explain",
+        lambda self, pair: calls.append(pair) or explain(self, pair),
+    )
+    first = asyncio.run(store.get(explanation_id))
+    assert asyncio.run(store.get(explanation_id)) is first
+    assert len(calls) == 1
+    assert first.feature_contributions[0].field_name == "name"
+
+
+def test_store_evicts_least_recently_registered(fake_model, store):
+    """Test that the store keeps a bounded number of pairs."""
+    first = store.register(_pair("A"))
+    second = store.register(_pair("B"))
+    store.register(_pair("A"))
+    store.register(_pair("C"))
+
+    store.explain(first)
+    with pytest.raises(KeyError):
+        store.explain(second)
+    with pytest.raises(KeyError):
+        asyncio.run(store.get("unknown"))
+
+
+def test_batch_results_carry_handles_and_precompute_uncertain(fake_model, store, monkeypatch):
+    """Test that batch matches get handles and the most uncertain ones are precomputed."""
+    store.max_pairs = 100
+    monkeypatch.setattr(settings, "EXPLANATION_PRECOMPUTE_TOP_N", 1)
+    dataset_a = [RecordBase(fields={"name": "John Smith"})]
+    dataset_b = [RecordBase(fields={"name": name}) for name in ("John Smith", "Jon Smith", "Jo")]
+    run = BatchMatchRun(
+        dataset_a,
+        dataset_b,
+        threshold=0.1,
+        blocking=BlockingConfig(method="full"),
+        model=fake_model,
+    )
+
+    results = [
+        run.to_match_result(scored_pair, include_explanation=True)
+        for scored_pairs in run.chunks()
+        for scored_pair in scored_pairs
+    ]
+    assert len(results) == 3
+    assert all(result.explanation is None and result.explanation_id for result in results)
+
+    run.precompute_explanations()
+    for future in list(store._futures.values()):
+        future.result()
+    closest = min(results, key=lambda result: abs(result.prediction.similarity_score - 0.1))
+    assert list(store._explanations) == [closest.explanation_id]
+
+
+def test_explanation_endpoint(client, fake_model, store, sample_records):
+    """Test resolving the explanation handles of a batch response."""
+    request = {
+        "dataset_a": sample_records,
+        "dataset_b": sample_records,
+        "threshold": 0.99,
+        "blocking": {"method": "full"},
+        "include_explanations": True,
+    }
+    store.max_pairs = 100
+    results = client.post("/api/v1/match/batch", json=request).json()["match_results"]
+    assert results and all(result["explanation"] is None for result in results)
+
+    response = client.get(f"/api/v1/match/explanations/{results[0]['explanation_id']}")
+    assert response.status_code == 200
+    assert response.json()["method"] == "SHAP"
+    assert client.get("/api/v1/match/explanations/unknown").status_code == 404
@@ -0,0 +1,160 @@
+"""Tests for background batch matching jobs."""
+
+import json
+import os
+import threading
+
+import pytest
+from app.core.config import settings
+from app.ml import explanation_store, jobs
+from app.ml.jobs import MatchJobManager
+from app.models.schemas import BatchMatchRequest, ClusteringConfig, MatchResult, RecordBase
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """Job manager storing jobs in a temporary directory."""
+    manager = MatchJobManager(directory=str(tmp_path), max_workers=1)
+    yield manager
+    manager.shutdown()
+
+
+@pytest.fixture
+def request_payload():
+    """Batch request where every record of dataset_a has one exact match."""
+    records = [RecordBase(id=str(i), fields={"name": f"Person {i}"}) for i in range(6)]
+    return BatchMatchRequest(
+        dataset_a=records,
+        dataset_b=records,
+        threshold=0.99,
+        blocking={"method": "full"},
+    )
+
+
+def _result_ids(manager, job_id):
+    return [
+        json.loads(line)["record_pair"]["record_a"]["id"] for line in manager.iter_results(job_id)
+    ]
+
+
+def test_job_runs_to_completion(fake_model, manager, request_payload, monkeypatch):
+    """Test that a job scores every chunk and persists its results."""
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 2)
+
+    job = manager.submit(request_payload)
+    manager.wait(job.job_id, timeout=30)
+
+    job = manager.get(job.job_id)
+    assert job.status == "completed"
+    assert job.progress.chunks_done == job.progress.total_chunks == 3
+    assert job.progress.pairs_scored == 36
+    assert job.progress.matches_found == 6
+    assert _result_ids(manager, job.job_id) == [str(i) for i in range(6)]
+
+
+def test_job_resumes_from_last_chunk(fake_model, manager, request_payload, monkeypatch):
+    """Test that an interrupted job resumes without duplicating results."""
+    monkeypatch.setattr(settings, "BATCH_CHUNK_SIZE", 2)
+
+    job = manager.submit(request_payload)
+    manager.wait(job.job_id, timeout=30)
+    job_dir = os.path.join(manager.directory, job.job_id)
+
+    # Rewind the job to "interrupted after chunk 1, halfway through writing chunk 2"
+    with open(os.path.join(job_dir, "results.ndjson"), "rb") as f:
+        lines = f.readlines()
+    with open(os.path.join(job_dir, "results.ndjson"), "wb") as f:
+        f.write(b"".join(lines[:3]) + b'{"partial')
+    with open(os.path.join(job_dir, "state.json")) as f:
+        state = json.load(f)
+    state.update(
+        status="running",
+        chunks_done=1,
+        pairs_scored=12,
+        matches_found=2,
+        results_bytes=len(b"".join(lines[:2])),
+    )
+    with open(os.path.join(job_dir, "state.json"), "w") as f:
+        json.dump(state, f)
+
+    resumed = MatchJobManager(directory=manager.directory, max_workers=1)
+    assert resumed.resume_interrupted() == [job.job_id]
+    resumed.wait(job.job_id, timeout=30)
+
+    job = resumed.get(job.job_id)
+    assert job.status == "completed"
+    assert job.progress.pairs_scored == 36
+    assert job.progress.matches_found == 6
+    assert _result_ids(resumed, job.job_id) == [str(i) for i in range(6)]
+    resumed.shutdown()
+
+
+def test_job_rejects_invalid_request(fake_model, manager, request_payload):
+    """Test that invalid jobs fail at submission."""
+    request_payload.scoring_mode = "nonexistent"
+    with pytest.raises(ValueError):
+        manager.submit(request_payload)
+
+
+def test_job_rejects_clustering(fake_model, manager, request_payload, tmp_path):
+    """Test that a job asking for clustering is rejected instead of returning unclustered results."""
+    request_payload.clustering = ClusteringConfig()
+    with pytest.raises(ValueError, match="/match/cluster"):
+        manager.submit(request_payload)
+    assert not os.listdir(tmp_path)
+
+
+def test_submit_only_validates(fake_model, manager, request_payload, monkeypatch):
+    """Test that submission checks the request cheaply and leaves loading to the worker."""
+    threads = []
+    build_run = jobs._build_run
+    monkeypatch.setattr(
+        jobs,
+        "_build_run",
+        lambda request: threads.append(threading.current_thread().name) or build_run(request),
+    )
+
+    job = manager.submit(request_payload)
+    manager.wait(job.job_id, timeout=30)
+    assert len(threads) == 1 and threads[0].startswith("match-job")
+
+    request_payload.dataset_b = []
+    request_payload.reference_dataset = "missing"
+    with pytest.raises(FileNotFoundError):
+        manager.submit(request_payload)
+    request_payload.reference_dataset = None
+    request_payload.blocking.method = "nonexistent"
+    with pytest.raises(ValueError):
+        manager.submit(request_payload)
+    assert len(threads) == 1
+
+
+def test_unknown_job(manager):
+    """Test lookups of unknown jobs."""
+    with pytest.raises(KeyError):
+        manager.get("missing")
+    with pytest.raises(KeyError):
+        manager.cancel("missing")
+
+
+def test_cancel_finished_job_is_noop(fake_model, manager, request_payload):
+    """Test that cancelling a completed job leaves it completed."""
+    job = manager.submit(request_payload)
+    manager.wait(job.job_id, timeout=30)
+
+    assert manager.cancel(job.job_id).status == "completed"
+
+
+def test_explanation_handles_survive_a_restart(fake_model, manager, request_payload, monkeypatch):
+    """Test that reading results registers their pairs again in a fresh explanation store."""
+    request_payload.include_explanations = True
+    job = manager.submit(request_payload)
+    manager.wait(job.job_id, timeout=30)
+
+    monkeypatch.setattr(explanation_store, "_store_instance", None)
+    results = [MatchResult.model_validate_json(line) for line in manager.iter_results(job.job_id)]
+
+    store = explanation_store.get_explanation_store()
+    assert len(results) == 6
+    for result in results:
+        assert store._pairs[result.explanation_id] == result.record_pair
@@ -0,0 +1,124 @@
+"""Tests for the model lifecycle manager."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.core.config import settings
+from app.ml import lifecycle as lifecycle_module
+from app.ml.lifecycle import ModelLifecycle, ModelNotReadyError
+
+
+def test_model_loads_and_warms_up_once(fake_model, monkeypatch):
+    """Test that concurrent waiters share one load and warm-up."""
+    monkeypatch.setattr(settings, "MODEL_WARMUP_SEQ_LENGTHS", [4, 8])
+    monkeypatch.setattr(settings, "BATCH_SIZE", 2)
+    fake_model.is_loaded = False
+    loads = []
+    monkeypatch.setattr(
+        fake_model, "load_model", lambda: loads.append(1) or _mark_loaded(fake_model)
+    )
+
+    lifecycle = ModelLifecycle()
+    threads = [threading.Thread(target=lifecycle.wait) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [1]
+    assert lifecycle.ready and lifecycle.state == "ready"
+    assert lifecycle.load_time is not None and lifecycle.warmup_time is not None
+    # Two dummy batches of two texts each, at 4 and 8 words
+    warmup_texts = fake_model.model.encoded_texts
+    assert [len(text.split()) for text in warmup_texts] == [4, 4, 8, 8]
+
+
+def _mark_loaded(model):
+    model.is_loaded = True
+
+
+def test_failed_load_is_reported(fake_model, monkeypatch):
+    """Test that a load failure is surfaced to waiters and not retried within the backoff."""
+    monkeypatch.setattr(settings, "MODEL_RETRY_BACKOFF", 60.0)
+    fake_model.is_loaded = False
+    attempts = []
+
+    def fail():
+        attempts.append(1)
+        raise OSError("model not found")
+
+    monkeypatch.setattr(fake_model, "load_model", fail)
+    lifecycle = ModelLifecycle()
+    with pytest.raises(ModelNotReadyError, match="model not found"):
+        lifecycle.wait()
+    with pytest.raises(ModelNotReadyError):
+        asyncio.run(lifecycle.wait_ready())
+    assert (lifecycle.state, lifecycle.error) == ("failed", "model not found")
+    assert attempts == [1]
+
+
+def test_failed_load_is_retried_after_backoff(fake_model, monkeypatch):
+    """Test that a request after the backoff starts a new load instead of failing forever."""
+    monkeypatch.setattr(settings, "MODEL_RETRY_BACKOFF", 0.0)
+    fake_model.is_loaded = False
+    attempts = []
+
+    def flaky_load():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise OSError("hub unreachable")
+        _mark_loaded(fake_model)
+
+    monkeypatch.setattr(fake_model, "load_model", flaky_load)
+    lifecycle = ModelLifecycle()
+    with pytest.raises(ModelNotReadyError, match="hub unreachable"):
+        lifecycle.wait()
+
+    assert asyncio.run(lifecycle.wait_ready(timeout=5)) is fake_model
+    assert lifecycle.ready and lifecycle.error is None
+    assert attempts == [1, 1]
+
+
+def test_waiting_times_out_while_loading(fake_model, monkeypatch):
+    """Test that requests stop waiting for a slow load without cancelling it."""
+    release = threading.Event()
+    monkeypatch.setattr(lifecycle_module, "warm_up", lambda model: release.wait(5))
+
+    lifecycle = ModelLifecycle()
+    with pytest.raises(ModelNotReadyError, match="warming"):
+        asyncio.run(lifecycle.wait_ready(timeout=0.05))
+
+    release.set()
+    assert lifecycle.wait(timeout=5) is fake_model
+
+
+def test_health_reports_readiness(client, fake_model):
+    """Test liveness and readiness in the health endpoints."""
+    data = client.get("/api/v1/health").json()
+    assert (data["live"], data["ready"], data["model_state"]) == (True, False, "idle")
+    assert client.get("/api/v1/health/ready").status_code == 503
+
+    lifecycle_module.get_model_lifecycle().wait()
+    data = client.get("/api/v1/health").json()
+    assert data["ready"] and data["model_loaded"]
+    assert data["backend"] == settings.MODEL_BACKEND
+    assert data["model_load_time"] is not None
+    assert client.get("/api/v1/health/ready").status_code == 200
+
+
+def test_requests_wait_for_readiness(client, fake_model, monkeypatch):
+    """Test that inference endpoints answer 503 while the model is not ready."""
+    monkeypatch.setattr(settings, "MODEL_READY_TIMEOUT", 0.05)
+    release = threading.Event()
+    monkeypatch.setattr(lifecycle_module, "warm_up", lambda model: release.wait(5))
+
+    pair = {"record_a": {"fields": {"name": "a"}}, "record_b": {"fields": {"name": "a"}}}
+    response = client.post("/api/v1/match/predict", json=pair)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+    release.set()
+    lifecycle_module.get_model_lifecycle().wait(timeout=5)
+    assert client.post("/api/v1/match/predict", json=pair).status_code == 200
@@ -0,0 +1,172 @@
+"""Tests for incremental linkage against a persistent corpus."""
+
+import asyncio
+
+import pytest
+
+from app.ml import linkage_corpus
+from app.ml.linkage_corpus import LinkageCorpus
+from app.models.schemas import (
+    BlockingConfig,
+    LinkageCorpusConfig,
+    LinkageDelta,
+    RecordBase,
+)
+
+
+def _record(record_id, name, city):
+    return RecordBase(id=record_id, fields={"name": name, "city": city})
+
+
+def _people():
+    return [
+        _record("1", "John Smith", "New York"),
+        _record("2", "Jane Doe", "Boston"),
+        _record("3", "Robert Brown", "Chicago"),
+        _record("4", "Maria Garcia", "Houston"),
+    ]
+
+
+def _changes(result):
+    return {(change.id_a, change.id_b, change.change) for change in result.link_changes}
+
+
+@pytest.fixture
+def corpus(fake_model, tmp_path):
+    """An empty corpus blocked on name tokens."""
+    config = LinkageCorpusConfig(
+        threshold=0.8, blocking=BlockingConfig(method="token", fields=["name"])
+    )
+    return LinkageCorpus(str(tmp_path / "people"), config=config, model=fake_model)
+
+
+def test_delta_links_only_blocked_candidates(corpus):
+    """Test that a delta scores its records against their blocks only."""
+    result = corpus.apply_delta(LinkageDelta(upserts=_people()))
+    assert (result.inserted, result.updated, result.num_records) == (4, 0, 4)
+    assert result.link_changes == []
+
+    result = corpus.apply_delta(LinkageDelta(upserts=[_record("5", "Jon Smith", "New York")]))
+    assert result.pairs_scored == 1
+    assert _changes(result) == {("1", "5", "added")}
+    assert corpus.links_of("1") == {"5": pytest.approx(result.link_changes[0].similarity)}
+
+
+def test_updates_and_deletes_change_links(corpus):
+    """Test that updated and deleted records report their changed links."""
+    corpus.apply_delta(LinkageDelta(upserts=_people() + [_record("5", "Jon Smith", "New York")]))
+
+    result = corpus.apply_delta(LinkageDelta(upserts=[_record("5", "John Smith", "NYC")]))
+    assert result.updated == 1
+    assert _changes(result) == {("1", "5", "updated")}
+
+    result = corpus.apply_delta(LinkageDelta(upserts=[_record("5", "Ann Lee", "Seattle")]))
+    assert _changes(result) == {("1", "5", "removed")}
+
+    corpus.apply_delta(LinkageDelta(upserts=[_record("5", "John Smith", "New York")]))
+    result = corpus.apply_delta(LinkageDelta(deletes=["1", "missing"]))
+    assert result.deleted == 1
+    assert _changes(result) == {("1", "5", "removed")}
+    assert corpus.links_of("5") == {}
+    with pytest.raises(KeyError):
+        corpus.links_of("1")
+
+
+def test_corpus_reloads_from_disk(corpus, fake_model):
+    """Test that a reopened corpus has the same records, links and configuration."""
+    corpus.apply_delta(LinkageDelta(upserts=_people() + [_record("5", "Jon Smith", "New York")]))
+    corpus.apply_delta(LinkageDelta(deletes=["2"]))
+
+    reopened = LinkageCorpus(corpus.directory, model=fake_model)
+    assert reopened.config == corpus.config
+    assert set(reopened.records) == {"1", "3", "4", "5"}
+    assert reopened.links_of("5") == pytest.approx(corpus.links_of("5"))
+
+    result = reopened.apply_delta(LinkageDelta(upserts=[_record("6", "Maria Garcia", "Houston")]))
+    assert _changes(result) == {("4", "6", "added")}
+
+    fake_model.fingerprint = "other-weights"
+    with pytest.raises(ValueError):
+        LinkageCorpus(corpus.directory, model=fake_model)
+
+
+def test_ann_scoring_mode(fake_model, tmp_path):
+    """Test that an ANN corpus links records to their nearest neighbours."""
+    config = LinkageCorpusConfig(threshold=0.8, scoring_mode="ann", top_k=2)
+    corpus = LinkageCorpus(str(tmp_path / "ann"), config=config, model=fake_model)
+    corpus.apply_delta(LinkageDelta(upserts=_people()))
+
+    result = corpus.apply_delta(LinkageDelta(upserts=[_record("5", "Jon Smith", "New York")]))
+    assert _changes(result) == {("1", "5", "added")}
+
+    reopened = LinkageCorpus(corpus.directory, model=fake_model)
+    result = reopened.apply_delta(LinkageDelta(deletes=["5"]))
+    assert _changes(result) == {("1", "5", "removed")}
+
+
+def test_invalid_configuration(fake_model, tmp_path):
+    """Test that blockers without per-record keys and unknown modes are rejected."""
+    for config in (
+        LinkageCorpusConfig(blocking=BlockingConfig(method="full")),
+        LinkageCorpusConfig(blocking=BlockingConfig(method="sorted_neighbourhood")),
+        LinkageCorpusConfig(scoring_mode="pairs"),
+    ):
+        with pytest.raises(ValueError):
+            LinkageCorpus(str(tmp_path / "bad"), config=config, model=fake_model)
+
+    corpus = LinkageCorpus(str(tmp_path / "ok"), model=fake_model)
+    with pytest.raises(ValueError):
+        corpus.apply_delta(LinkageDelta(upserts=[RecordBase(fields={"name": "x"})]))
+
+
+def test_corpus_endpoints(client, fake_model, data_dirs):
+    """Test creating a corpus, applying a delta and reading links through the API."""
+    url = "/api/v1/match/corpora/people"
+    assert client.get(url).status_code == 404
+    assert client.put("/api/v1/match/corpora/bad name").status_code == 400
+
+    response = client.put(url, json={"threshold": 0.8})
+    assert response.status_code == 201
+    assert response.json()["num_records"] == 0
+    assert client.put(url).status_code == 409
+
+    records = [record.model_dump() for record in _people()]
+    records.append({"id": "5", "fields": {"name": "Jon Smith", "city": "New York"}})
+    response = client.post(f"{url}/delta", json={"upserts": records})
+    assert response.status_code == 200
+    assert response.json()["inserted"] == 5
+    assert ("1", "5", "added") in {
+        (change["id_a"], change["id_b"], change["change"])
+        for change in response.json()["link_changes"]
+    }
+
+    assert client.get(url).json()["num_links"] >= 1
+    response = client.get(f"{url}/records/5/links")
+    assert response.status_code == 200
+    assert response.json()["links"][0]["id"] == "1"
+    assert client.get(f"{url}/records/missing/links").status_code == 404
+    assert client.post("/api/v1/match/corpora/missing/delta", json={}).status_code == 404
+
+
+def test_corpus_is_opened_off_the_event_loop(client, fake_model, data_dirs, monkeypatch):
+    """Test that the logs of a corpus are replayed in a worker thread, not on the event loop."""
+    url = "/api/v1/match/corpora/people"
+    assert client.put(url).status_code == 201
+    linkage_corpus.get_corpus_registry()._corpora.clear()
+
+    on_event_loop = []
+    load = LinkageCorpus._load
+
+    def recording_load(self):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return load(self)
+
+    monkeypatch.setattr(LinkageCorpus, "_load", recording_load)
+    assert client.get(url).status_code == 200
+    linkage_corpus.get_corpus_registry()._corpora.clear()
+    assert client.get(f"{url}/records/1/links").status_code == 404
+    assert on_event_loop == [False, False]
@@ -0,0 +1,57 @@
+"""Tests for dynamic micro-batching."""
+
+import asyncio
+
+import pytest
+from app.ml.micro_batching import MicroBatcher
+
+PAIRS = [("John Smith", "Jon Smith"), ("Alice Johnson", "Alice Jonson"), ("Bob", "Robert")]
+
+
+def test_concurrent_requests_share_a_batch(fake_model):
+    """Test that requests arriving within the wait window are scored together."""
+    batcher = MicroBatcher(max_batch_size=32, max_wait_ms=50)
+
+    async def run():
+        return await asyncio.gather(*(batcher.similarity(a, b) for a, b in PAIRS))
+
+    similarities = asyncio.run(run())
+
+    assert similarities == pytest.approx(fake_model.predict_batch(PAIRS))
+    stats = batcher.stats()
+    assert stats["batches"] == 1
+    assert stats["batch_size_distribution"] == {3: 1}
+
+
+def test_full_batch_flushes_immediately(fake_model):
+    """Test that reaching the maximum batch size flushes without waiting."""
+    batcher = MicroBatcher(max_batch_size=2, max_wait_ms=10_000)
+
+    async def run():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.similarity(a, b) for a, b in PAIRS[:2])), timeout=5
+        )
+
+    asyncio.run(run())
+
+    stats = batcher.stats()
+    assert stats["batch_size_distribution"] == {2: 1}
+    assert stats["queue_delay_ms"]["max"] < 10_000
+
+
+def test_errors_propagate_to_every_request(fake_model, monkeypatch):
+    """Test that a failed batch fails all of its waiting requests."""
+
+    def fail(pairs):
+        raise RuntimeError("encoder failed")
+
+    monkeypatch.setattr(fake_model, "predict_batch", fail)
+    batcher = MicroBatcher(max_batch_size=32, max_wait_ms=1)
+
+    async def run():
+        return await asyncio.gather(
+            *(batcher.similarity(a, b) for a, b in PAIRS), return_exceptions=True
+        )
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
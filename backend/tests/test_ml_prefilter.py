@@ -0,0 +1,133 @@
+"""Tests for the classical pre-filter cascade."""
+
+import pytest
+from app.core.config import settings
+from app.ml.inference import batch_predict, predict_match
+from app.ml.prefilter import (
+    ACCEPT,
+    AMBIGUOUS,
+    REJECT,
+    PrefilterCascade,
+    field_similarity,
+    jaro_winkler,
+    levenshtein_similarity,
+    token_jaccard,
+)
+from app.models.schemas import BlockingConfig, RecordBase, RecordPair
+
+
+def test_string_metrics():
+    """Test the individual string metrics."""
+    assert jaro_winkler("martha", "marhta") == pytest.approx(0.9611, abs=1e-4)
+    assert token_jaccard("john smith", "smith john") == 1.0
+    assert token_jaccard("john smith", "john doe") == pytest.approx(1 / 3)
+    assert levenshtein_similarity("kitten", "sitting") == pytest.approx(1 - 3 / 7)
+
+
+def test_numeric_and_date_fields_compare_exactly():
+    """Test that numbers and dates only match when equal."""
+    assert field_similarity("45", "45.0") == 1.0
+    assert field_similarity("45", "46") == 0.0
+    assert field_similarity("2020-01-31", "31/01/2020") == 1.0
+    assert field_similarity("2020-01-31", "2020-01-30") == 0.0
+
+
+def test_classify():
+    """Test that clear-cut pairs are resolved and the rest left to the model."""
+    cascade = PrefilterCascade(accept_threshold=0.95, reject_threshold=0.3, min_fields=2)
+    record = RecordBase(fields={"name": "John Smith", "city": "New York", "age": "45"})
+
+    decision, score = cascade.classify(record, record)
+    assert (decision, score) == (ACCEPT, 1.0)
+
+    other = RecordBase(fields={"name": "Xavier Quinn", "city": "Tokyo", "age": "12"})
+    assert cascade.classify(record, other)[0] == REJECT
+
+    similar = RecordBase(fields={"name": "Jon Smith", "city": "New York City", "age": "45"})
+    assert cascade.classify(record, similar)[0] == AMBIGUOUS
+
+    # A single comparable field is never enough to decide
+    assert (
+        cascade.classify(RecordBase(fields={"name": "a"}), RecordBase(fields={"name": "a"}))[0]
+        == AMBIGUOUS
+    )
+
+
+def test_invalid_thresholds():
+    """Test that overlapping thresholds are rejected."""
+    with pytest.raises(ValueError):
+        PrefilterCascade(accept_threshold=0.5, reject_threshold=0.6)
+
+
+@pytest.mark.asyncio
+async def test_batch_predict_skips_resolved_pairs(fake_model):
+    """Test that only ambiguous pairs reach the model and stage counts are reported."""
+    dataset_a = [
+        RecordBase(id="a1", fields={"name": "John Smith", "city": "New York"}),
+        RecordBase(id="a2", fields={"name": "Alice Johnson", "city": "Boston"}),
+    ]
+    dataset_b = [
+        RecordBase(id="b1", fields={"name": "John Smith", "city": "New York"}),
+        RecordBase(id="b2", fields={"name": "Alice Jonson", "city": "Boston MA"}),
+        RecordBase(id="b3", fields={"name": "Zed Quork", "city": "Oslo"}),
+    ]
+
+    result = await batch_predict(
+        dataset_a,
+        dataset_b,
+        threshold=0.9,
+        blocking=BlockingConfig(method="full"),
+        scoring_mode="pair",
+        prefilter=True,
+    )
+
+    assert result.total_comparisons == 6
+    assert result.prefilter_accepted == 1
+    assert result.prefilter_accepted + result.prefilter_rejected + result.model_scored == 6
+    assert 0 < result.model_scored < 6
+    assert "a1" in {match.record_pair.record_a.id for match in result.match_results}
+    # The identical pair was never encoded
+    assert "city: new york | name: john smith" not in {
+        text.lower() for text in fake_model.model.encoded_texts
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("threshold", [0.01, 0.99])
+async def test_prefilter_decisions_ignore_threshold(fake_model, monkeypatch, threshold):
+    """Test that accepted pairs are always matches and rejected ones never, whatever the threshold."""
+    monkeypatch.setattr(settings, "PREFILTER_ACCEPT_THRESHOLD", 0.85)
+    dataset_a = [RecordBase(id="a1", fields={"name": "John Smith", "city": "New York"})]
+    dataset_b = [
+        # Classical score 0.87: accepted, below a 0.99 model threshold
+        RecordBase(id="b1", fields={"name": "John Smith", "city": "New Yorkk"}),
+        # Classical score 0.18: rejected, above a 0.01 model threshold
+        RecordBase(id="b2", fields={"name": "Zed Quork", "city": "Oslo"}),
+    ]
+
+    result = await batch_predict(
+        dataset_a,
+        dataset_b,
+        threshold=threshold,
+        blocking=BlockingConfig(method="full"),
+        scoring_mode="pair",
+        prefilter=True,
+    )
+
+    assert (result.prefilter_accepted, result.prefilter_rejected, result.model_scored) == (1, 1, 0)
+    assert [match.record_pair.record_b.id for match in result.match_results] == ["b1"]
+    prediction = result.match_results[0].prediction
+    assert prediction.is_match and prediction.resolved_by == "prefilter"
+
+
+@pytest.mark.asyncio
+async def test_predict_match_resolved_by_prefilter(fake_model, monkeypatch):
+    """Test that a clear-cut single pair skips the model."""
+    monkeypatch.setattr(settings, "PREFILTER_ENABLED", True)
+    record = RecordBase(fields={"name": "John Smith", "city": "New York"})
+
+    result = await predict_match(RecordPair(record_a=record, record_b=record), False)
+
+    assert result.prediction.resolved_by == "prefilter"
+    assert result.prediction.is_match
+    assert fake_model.model.encoded_texts == []
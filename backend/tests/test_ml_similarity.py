@@ -0,0 +1,93 @@
+"""Tests for vectorized similarity scoring."""
+
+import pytest
+import torch
+from app.ml.inference import batch_predict
+from app.ml.similarity import normalize_embeddings, score_pairs, threshold_matches
+from app.models.schemas import BlockingConfig, RecordBase
+
+
+@pytest.fixture
+def embeddings():
+    """Random normalized embeddings for two datasets."""
+    generator = torch.Generator().manual_seed(0)
+    embeddings_a = normalize_embeddings(torch.randn(7, 16, generator=generator))
+    embeddings_b = normalize_embeddings(torch.randn(5, 16, generator=generator))
+    return embeddings_a, embeddings_b
+
+
+def test_score_pairs_matches_cosine_similarity(embeddings):
+    """Test pair scoring against torch cosine similarity."""
+    embeddings_a, embeddings_b = embeddings
+    pairs = [(0, 0), (3, 4), (6, 1)]
+
+    scores = score_pairs(embeddings_a, embeddings_b, pairs, chunk_size=2)
+
+    for (i, j), score in zip(pairs, scores):
+        expected = torch.cosine_similarity(embeddings_a[i : i + 1], embeddings_b[j : j + 1])
+        assert score == pytest.approx(max(expected.item(), 0.0), abs=1e-5)
+
+
+def test_threshold_matches_equals_brute_force(embeddings):
+    """Test chunked thresholding returns exactly the brute-force pairs."""
+    embeddings_a, embeddings_b = embeddings
+    threshold = 0.1
+
+    matches = threshold_matches(embeddings_a, embeddings_b, threshold, chunk_size=3)
+
+    full = embeddings_a @ embeddings_b.T
+    expected = {
+        (i, j)
+        for i in range(full.shape[0])
+        for j in range(full.shape[1])
+        if full[i, j] >= threshold
+    }
+    assert {(i, j) for i, j, _ in matches} == expected
+
+
+def test_threshold_matches_top_k(embeddings):
+    """Test that top_k bounds the matches per row."""
+    embeddings_a, embeddings_b = embeddings
+
+    matches = threshold_matches(embeddings_a, embeddings_b, 0.0, top_k=2, chunk_size=4)
+
+    rows = [i for i, _, _ in matches]
+    assert all(rows.count(i) <= 2 for i in set(rows))
+
+
+async def test_batch_predict_encodes_each_record_once(fake_model):
+    """Test that record scoring mode encodes each distinct record exactly once."""
+    dataset_a = [RecordBase(id=str(i), fields={"name": f"Person {i}"}) for i in range(4)]
+    dataset_b = [RecordBase(id=str(i), fields={"name": f"Person {i}"}) for i in range(6)]
+
+    result = await batch_predict(
+        dataset_a, dataset_b, threshold=0.99, blocking=BlockingConfig(method="full")
+    )
+
+    assert len(fake_model.model.encoded_texts) == 6  # four records appear on both sides
+    assert result.total_comparisons == 24
+    assert result.matches_found == 4
+
+
+async def test_batch_predict_scoring_modes_agree(fake_model):
+    """Test that record and pair scoring modes find the same matches."""
+    dataset_a = [RecordBase(fields={"name": n}) for n in ["John Smith", "Alice Johnson"]]
+    dataset_b = [RecordBase(fields={"name": n}) for n in ["J. Smith", "Alice Johnsen", "Bob"]]
+    blocking = BlockingConfig(method="full")
+
+    by_record = await batch_predict(dataset_a, dataset_b, threshold=0.5, blocking=blocking)
+    by_pair = await batch_predict(
+        dataset_a, dataset_b, threshold=0.5, blocking=blocking, scoring_mode="pair"
+    )
+
+    def scores(result):
+        return {
+            (m.record_pair.record_a.fields["name"], m.record_pair.record_b.fields["name"]): (
+                m.prediction.similarity_score
+            )
+            for m in result.match_results
+        }
+
+    assert scores(by_record).keys() == scores(by_pair).keys()
+    for key, score in scores(by_record).items():
+        assert score == pytest.approx(scores(by_pair)[key], abs=1e-5)
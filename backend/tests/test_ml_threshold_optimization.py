@@ -0,0 +1,118 @@
+"""Tests for threshold optimization on labeled datasets."""
+
+import time
+
+import numpy as np
+import pytest
+
+from app.core.config import settings
+from app.ml.metrics import metrics_at_threshold, threshold_sweep
+
+
+def test_sweep_matches_metrics_at_each_threshold():
+    """Test that the vectorized sweep agrees with metrics computed threshold by threshold."""
+    rng = np.random.default_rng(0)
+    labels = rng.random(500) < 0.3
+    scores = np.round(np.clip(rng.normal(0.4 + 0.3 * labels, 0.15), 0, 1), 2)
+
+    sweep = threshold_sweep(scores, labels, false_positive_cost=1.0, false_negative_cost=3.0)
+    assert len(sweep["curve"]) == len(np.unique(scores))
+    for point in sweep["curve"]:
+        expected = metrics_at_threshold(scores, labels, point.threshold)
+        assert point.precision == pytest.approx(expected["precision"])
+        assert point.recall == pytest.approx(expected["recall"])
+        assert point.f1_score == pytest.approx(expected["f1_score"])
+        assert point.cost == expected["false_positives"] + 3 * expected["false_negatives"]
+
+    assert sweep["best_f1"].f1_score == max(point.f1_score for point in sweep["curve"])
+    assert sweep["min_cost"].cost == min(point.cost for point in sweep["curve"])
+    assert 0.5 < sweep["roc_auc"] <= 1.0
+
+    thinned = threshold_sweep(scores, labels, max_points=10)
+    assert len(thinned["curve"]) == 10
+    assert thinned["best_f1"].threshold == sweep["best_f1"].threshold
+
+
+def test_sweep_of_separable_scores():
+    """Test the curves of perfectly separated scores."""
+    sweep = threshold_sweep(np.array([0.9, 0.8, 0.3, 0.2]), np.array([1, 1, 0, 0]))
+    assert sweep["roc_auc"] == pytest.approx(1.0)
+    assert sweep["average_precision"] == pytest.approx(1.0)
+    assert sweep["best_f1"].threshold == pytest.approx(0.8)
+
+    # Missing a match costs more than a false match: the optimum moves down
+    sweep = threshold_sweep(
+        np.array([0.9, 0.5, 0.6, 0.2]), np.array([1, 1, 0, 0]), false_negative_cost=5.0
+    )
+    assert sweep["min_cost"].threshold == pytest.approx(0.5)
+
+
+def test_min_cost_can_predict_no_match():
+    """Test that rejecting every pair is chosen when false matches are expensive enough."""
+    scores = np.array([0.9, 0.8, 0.7, 0.6])
+    labels = np.array([0, 1, 0, 1])
+
+    sweep = threshold_sweep(scores, labels, false_positive_cost=10.0)
+
+    assert sweep["min_cost"].cost == 2.0
+    assert (sweep["min_cost"].precision, sweep["min_cost"].recall) == (1.0, 0.0)
+    assert sweep["min_cost"].threshold > 0.9
+    assert metrics_at_threshold(scores, labels, sweep["min_cost"].threshold)["recall"] == 0.0
+
+
+def test_sweep_needs_both_classes():
+    """Test that labels of a single class are rejected."""
+    with pytest.raises(ValueError):
+        threshold_sweep(np.array([0.9, 0.1]), np.array([1, 1]))
+
+
+def _write_pairs(data_dirs, num_pairs=20):
+    rows = ["name_a,name_b,label"]
+    for i in range(num_pairs):
+        rows.append(f"Person {i},Person {i},1")
+        rows.append(f"Person {i},Someone {i + 100},0")
+    (data_dirs / "raw" / "pairs.csv").write_text("\n".join(rows) + "\n")
+
+
+def test_optimize_endpoint(client, fake_model, data_dirs):
+    """Test optimizing a small labeled dataset within the request."""
+    _write_pairs(data_dirs)
+    url = "/api/v1/match/threshold/optimize"
+
+    response = client.get(url, params={"dataset_name": "pairs", "false_negative_cost": 2})
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["num_pairs"], data["num_matches"]) == (40, 20)
+    assert data["best_f1"]["f1_score"] == pytest.approx(1.0)
+    assert data["false_negative_cost"] == 2
+    assert list((data_dirs / "processed" / "thresholds").iterdir())
+
+    cached = client.get(url, params={"dataset_name": "pairs", "false_negative_cost": 2})
+    assert cached.json() == data
+    response = client.get(url, params={"dataset_name": "pairs", "false_positive_cost": -1})
+    assert response.status_code == 400
+
+
+def test_optimize_endpoint_in_background(client, fake_model, data_dirs, monkeypatch):
+    """Test that large datasets are optimized in the background and polled."""
+    _write_pairs(data_dirs)
+    monkeypatch.setattr(settings, "THRESHOLD_SYNC_MAX_PAIRS", 0)
+    params = {"dataset_name": "pairs"}
+
+    response = client.get("/api/v1/match/threshold/optimize", params=params)
+    assert response.status_code in (200, 202)
+    deadline = time.time() + 30
+    while response.status_code == 202 and time.time() < deadline:
+        assert response.json()["status"] == "running"
+        time.sleep(0.05)
+        response = client.get("/api/v1/match/threshold/optimize", params=params)
+
+    assert response.status_code == 200
+    assert response.json()["num_pairs"] == 40
+
+
+def test_optimize_unlabeled_dataset(client, fake_model, data_dirs):
+    """Test that a dataset without labels cannot be optimized."""
+    (data_dirs / "raw" / "people.csv").write_text("name\nJohn Smith\n")
+    response = client.get("/api/v1/match/threshold/optimize", params={"dataset_name": "people"})
+    assert response.status_code == 400
@@ -0,0 +1,216 @@
+"""Tests for the training data pipeline."""
+
+import os
+
+import pytest
+import torch
+from sentence_transformers import InputExample
+
+from app.ml import training
+from app.ml.preprocessing import serialize_record
+from app.ml.training import (
+    evaluate_model,
+    load_labeled_pairs,
+    load_training_data,
+    mine_hard_negatives,
+    train_model,
+)
+from app.models.schemas import RecordBase
+
+CSV = (
+    "name_a,city_a,name_b,city_b,zip_a,label\n"
+    "John Smith,New York,Jon Smith,New York,02139,1\n"
+    "Jane Doe,,Robert Brown,Chicago,,0\n"
+    " Maria Garcia ,NULL,Maria Garcia,Houston,nan,1\n"
+)
+
+
+@pytest.fixture
+def pairs_csv(data_dirs):
+    """A labeled pair file of three pairs."""
+    path = data_dirs / "raw" / "pairs.csv"
+    path.write_text(CSV)
+    return str(path)
+
+
+def test_pairs_are_serialized_like_inference(pairs_csv):
+    """Test that training texts equal serialize_record of each side's fields."""
+    pairs = load_labeled_pairs(pairs_csv, chunk_size=2)
+
+    # zip has no _b column, so it is not part of either side
+    expected_a = [
+        serialize_record(RecordBase(fields={"name": name, "city": city}))
+        for name, city in [("John Smith", "New York"), ("Jane Doe", ""), (" Maria Garcia ", "NULL")]
+    ]
+    assert pairs.column("text_a").to_pylist() == expected_a
+    assert pairs.column("text_a").to_pylist()[2] == "name: Maria Garcia"
+    assert pairs.column("text_b").to_pylist()[1] == "city: Chicago | name: Robert Brown"
+    assert pairs.column("label").to_pylist() == [1.0, 0.0, 1.0]
+
+
+def test_pairs_are_cached_by_content(pairs_csv, monkeypatch):
+    """Test that a file is serialized once and re-serialized when it changes."""
+    first = load_labeled_pairs(pairs_csv)
+    cache_files = os.listdir(os.path.dirname(training.labeled_pairs_cache_path(pairs_csv, "x")))
+    assert len(cache_files) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("cached pairs were serialized again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(training, "_serialize_chunk", fail)
+        assert load_labeled_pairs(pairs_csv).equals(first)
+
+    with open(pairs_csv, "a") as f:
+        f.write("Ann Lee,Seattle,Ann Lee,Seattle,98101,1\n")
+    assert load_labeled_pairs(pairs_csv).num_rows == 4
+
+
+def test_missing_label_column(data_dirs):
+    """Test that a file without labels is rejected."""
+    path = data_dirs / "raw" / "unlabeled.csv"
+    path.write_text("name_a,name_b\nx,y\n")
+    with pytest.raises(ValueError):
+        load_labeled_pairs(str(path))
+
+
+def test_training_examples_and_evaluation(pairs_csv, fake_model):
+    """Test building InputExamples and evaluating from the serialized pairs."""
+    examples = load_training_data(pairs_csv)
+    assert [example.label for example in examples] == [1.0, 0.0, 1.0]
+    assert examples[0].texts == [
+        "city: New York | name: John Smith",
+        "city: New York | name: Jon Smith",
+    ]
+
+    metrics = evaluate_model(fake_model, pairs_csv, threshold=0.7)
+    assert metrics["true_positives"] + metrics["false_negatives"] == 2
+    assert metrics["true_negatives"] + metrics["false_positives"] == 1
+
+
+def test_mine_hard_negatives(fake_model):
+    """Test that hard negatives are the closest texts that are not known matches."""
+    anchors = ["name: John Smith", "name: Maria Garcia"]
+    positives = ["name: Jon Smith", "name: Maria Garcia Lopez"]
+    corpus = positives + ["name: John Smithson", "name: Robert Brown", "name: Mario Garcias"]
+
+    examples = mine_hard_negatives(fake_model, anchors, positives, corpus, num_negatives=1)
+
+    assert [example.texts for example in examples] == [
+        ["name: John Smith", "name: Jon Smith", "name: John Smithson"],
+        ["name: Maria Garcia", "name: Maria Garcia Lopez", "name: Mario Garcias"],
+    ]
+
+    # Pairs without enough candidates are left out
+    assert mine_hard_negatives(fake_model, anchors, positives, positives, num_negatives=2) == []
+
+
+def test_transitive_matches_are_not_negatives(fake_model):
+    """Test that texts matched to the anchor through other pairs are never its negatives."""
+    anchors = ["name: John Smith", "name: Jon Smith"]
+    positives = ["name: Jon Smith", "name: John Smith Jr"]
+    corpus = positives + ["name: John Smith Jr", "name: Robert Brown", "name: Maria Garcia"]
+
+    examples = mine_hard_negatives(fake_model, anchors, positives, corpus, num_negatives=1)
+
+    assert len(examples) == 2
+    matched = set(anchors) | set(positives)
+    assert all(example.texts[2] not in matched for example in examples)
+
+
+def _tiny_sentence_transformer():
+    """A trainable SentenceTransformer built offline from a word-level tokenizer."""
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import StaticEmbedding
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    words = ["[UNK]", "name", ":", "john", "jon", "smith", "maria", "mario", "garcia", "robert"]
+    words += ["rob", "brown", "jane", "janet", "doe", "alice", "cooper", "bob", "dylan", "carol"]
+    words += ["king", "dave", "grohl", "eve", "adams", "frank", "ocean"]
+    tokenizer = Tokenizer(WordLevel({word: i for i, word in enumerate(words)}, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    return SentenceTransformer(modules=[StaticEmbedding(tokenizer, embedding_dim=8)], device="cpu")
+
+
+def test_refresh_rounds_share_one_optimizer(data_dirs, monkeypatch, tmp_path):
+    """Test that hard-negative refreshes keep the optimizer and its decaying schedule."""
+    pairs_csv = data_dirs / "raw" / "ranking_pairs.csv"
+    pairs_csv.write_text(
+        "name_a,name_b,label\n"
+        "John Smith,Jon Smith,1\n"
+        "Maria Garcia,Mario Garcia,1\n"
+        "Robert Brown,Rob Brown,1\n"
+        "Jane Doe,Janet Doe,1\n"
+        "Alice Cooper,Bob Dylan,0\n"
+        "Carol King,Dave Grohl,0\n"
+        "Eve Adams,Frank Ocean,0\n"
+    )
+    network = _tiny_sentence_transformer()
+    initial_weights = network[0].embedding.weight.detach().clone()
+
+    class StubModel:
+        def __init__(self, **kwargs):
+            self.model = network
+
+        def load_model(self):
+            pass
+
+        def save_model(self, path):
+            pass
+
+        def encode_uncached(self, texts, batch_size=None):
+            return network.encode(texts, convert_to_tensor=True)
+
+    optimizers, minings = [], []
+    adamw = torch.optim.AdamW
+    monkeypatch.setattr(
+        torch.optim,
+        "AdamW",
+        lambda *args, **kwargs: optimizers.append(adamw(*args, **kwargs)) or optimizers[-1],
+    )
+    mine = training.mine_hard_negatives
+    monkeypatch.setattr(
+        training,
+        "mine_hard_negatives",
+        lambda *args, **kwargs: minings.append(1) or mine(*args, **kwargs),
+    )
+    monkeypatch.setattr(training, "EntityMatchingModel", StubModel)
+
+    learning_rate = 0.1
+    train_model(
+        str(pairs_csv),
+        output_path=str(tmp_path),
+        epochs=3,
+        batch_size=2,
+        learning_rate=learning_rate,
+        loss="mnrl",
+        refresh_every=1,
+    )
+
+    assert len(minings) == 3
+    assert len(optimizers) == 1
+    # Eight directed matches in batches of at most two: at least four steps per epoch
+    assert optimizers[0].state[network[0].embedding.weight]["step"] >= 12
+    assert optimizers[0].param_groups[0]["lr"] < learning_rate / 2
+    assert not torch.equal(network[0].embedding.weight, initial_weights)
+
+
+def test_batches_never_repeat_a_text():
+    """Test that batching terminates and keeps texts unique when every example shares a text."""
+    examples = [InputExample(texts=[f"anchor {i}", f"positive {i}", "Hub"]) for i in range(5)]
+    examples.append(InputExample(texts=["anchor 5", "positive 5"]))
+
+    batches = training._no_duplicate_batches(examples, batch_size=4)
+
+    assert sorted(len(batch) for batch in batches) == [1, 1, 1, 1, 2]
+    for batch in batches:
+        texts = [text.lower() for example in batch for text in example.texts]
+        assert len(texts) == len(set(texts))
+
+
+def test_unknown_training_loss():
+    """Test that an unknown loss is rejected before the model is loaded."""
+    with pytest.raises(ValueError):
+        train_model("unused.csv", loss="triplet")
@@ -0,0 +1,95 @@
+"""Tests for the dataset catalog."""
+
+import os
+
+import pytest
+
+from app.utils import data_loader, dataset_catalog
+from app.utils.dataset_catalog import DatasetCatalog
+
+
+def _write_csv(path, rows):
+    with open(path, "w") as f:
+        f.write("name,city\n")
+        for i in range(rows):
+            f.write(f"Person {i},City {i % 3}\n")
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch):
+    """A catalog of an empty temporary data directory, installed as the global catalog."""
+    data_dir = tmp_path / "raw"
+    data_dir.mkdir()
+    catalog = DatasetCatalog(str(data_dir), str(tmp_path / "catalog.json"), num_samples=2)
+    monkeypatch.setattr(dataset_catalog, "_catalog_instance", catalog)
+    return catalog
+
+
+def test_index_csv_metadata(catalog):
+    """Test that an entry holds fields, row count, hash and samples."""
+    _write_csv(os.path.join(catalog.data_dir, "people.csv"), rows=7)
+
+    entry = catalog.get("people.csv")
+    assert entry["fields"] == ["name", "city"]
+    assert entry["num_records"] == 7
+    assert len(entry["content_hash"]) == 64
+    assert entry["samples"] == [
+        {"name": "Person 0", "city": "City 0"},
+        {"name": "Person 1", "city": "City 1"},
+    ]
+    assert catalog.get("missing.csv") is None
+
+
+def test_only_changed_files_are_reindexed(catalog, monkeypatch):
+    """Test that unchanged files are not read again, and modified ones are."""
+    path = os.path.join(catalog.data_dir, "people.csv")
+    _write_csv(path, rows=3)
+
+    calls = []
+    index_csv = dataset_catalog.index_csv
+    monkeypatch.setattr(
+        dataset_catalog, "index_csv", lambda *args: calls.append(args) or index_csv(*args)
+    )
+
+    catalog.refresh()
+    catalog.refresh()
+    assert len(calls) == 1
+
+    _write_csv(path, rows=5)
+    assert catalog.refresh()["people.csv"]["num_records"] == 5
+    assert len(calls) == 2
+
+    os.remove(path)
+    assert catalog.refresh() == {}
+
+
+def test_catalog_survives_restart(catalog, monkeypatch):
+    """Test that a new catalog reuses entries persisted by a previous one."""
+    _write_csv(os.path.join(catalog.data_dir, "people.csv"), rows=4)
+    catalog.refresh()
+
+    monkeypatch.setattr(dataset_catalog, "index_csv", pytest.fail)
+    restarted = DatasetCatalog(catalog.data_dir, catalog.catalog_path, num_samples=2)
+    assert restarted.get("people.csv")["num_records"] == 4
+
+
+def test_data_loader_uses_catalog(catalog):
+    """Test that listing and loading datasets read the catalog, including uploads."""
+    _write_csv(os.path.join(catalog.data_dir, "dblp_acm.csv"), rows=6)
+    _write_csv(os.path.join(catalog.data_dir, "my-upload.csv"), rows=3)
+
+    datasets = {info.name: info for info in data_loader.list_available_datasets()}
+    assert datasets["DBLP-ACM"].num_records == 6
+    assert datasets["Walmart-Amazon"].num_records == 0
+    assert datasets["my-upload"].fields == ["name", "city"]
+
+    info = data_loader.load_dataset("my-upload", num_samples=3)
+    assert info.num_records == 3
+    assert [record.fields["name"] for record in info.sample_records] == [
+        "Person 0",
+        "Person 1",
+        "Person 2",
+    ]
+
+    with pytest.raises(FileNotFoundError):
+        data_loader.load_dataset("walmart_amazon")
@@ -0,0 +1,99 @@
+"""Tests for dataset ingestion into Arrow files."""
+
+import os
+
+import pyarrow as pa
+import pyarrow.ipc
+
+from app.utils.dataset_catalog import get_dataset_catalog
+from app.utils.data_loader import load_records_from_csv
+from app.utils.ingestion import (
+    ArrowColumn,
+    csv_to_arrow,
+    infer_type,
+    ingest_dataset,
+    read_arrow_records,
+)
+from app.utils.record_store import RecordStore
+
+CSV = "id,name,price,zip,joined\n1,John,1.0,02139,2020-01-01\n2,,2.50,10001,2021-03-04\n"
+
+
+def test_infer_type():
+    """Test type inference of text columns."""
+    assert infer_type(pa.chunked_array([["1", "2", ""]])) == "int64"
+    assert infer_type(pa.chunked_array([["1.0", "2.5"]])) == "double"
+    assert infer_type(pa.chunked_array([["2020-01-01", "2021-03-04 10:00:00"]])) == "timestamp"
+    assert infer_type(pa.chunked_array([["02139", "10001"]])) == "string"
+    assert infer_type(pa.chunked_array([["John", "2"]])) == "string"
+    assert infer_type(pa.chunked_array([["", ""]])) == "string"
+
+
+def test_arrow_round_trip_matches_csv(tmp_path):
+    """Test that records read from the Arrow file equal those parsed from the CSV."""
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text(CSV)
+    arrow_path = str(tmp_path / "people.arrow")
+
+    info = csv_to_arrow(str(csv_path), arrow_path)
+    assert info["num_records"] == 2
+    assert info["field_types"]["zip"] == "string"
+    assert info["field_types"]["price"] == "double"
+
+    from_arrow = read_arrow_records(arrow_path, id_column="id")
+    from_csv = RecordStore.from_csv(str(csv_path), id_column="id")
+    assert from_arrow.to_records() == from_csv.to_records()
+
+
+def test_conversion_streams_batches(tmp_path):
+    """Test that field types and row counts are merged across CSV batches."""
+    num_rows = 100_000
+    rows = [f"{i},{i + 10000}" for i in range(num_rows - 1)] + ["2.5,02139"]
+    csv_path = tmp_path / "numbers.csv"
+    csv_path.write_text("amount,zip\n" + "\n".join(rows) + "\n")
+    arrow_path = str(tmp_path / "numbers.arrow")
+
+    info = csv_to_arrow(str(csv_path), arrow_path)
+    assert info["num_records"] == num_rows
+    # The values that change each type are in the last batch only
+    assert info["field_types"] == {"amount": "double", "zip": "string"}
+
+    with pa.ipc.open_file(arrow_path) as reader:
+        assert reader.num_record_batches > 1
+
+
+def test_arrow_columns_are_read_lazily(tmp_path):
+    """Test that Arrow-backed stores convert values on access."""
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text(CSV)
+    arrow_path = str(tmp_path / "people.arrow")
+    csv_to_arrow(str(csv_path), arrow_path)
+
+    store = read_arrow_records(arrow_path, id_column="id")
+    assert isinstance(store.columns["name"], ArrowColumn)
+    assert store.serialize([1]) == RecordStore.from_csv(str(csv_path), id_column="id").serialize(
+        [1]
+    )
+    assert list(store.normalized("zip")) == ["02139", "10001"]
+
+
+def test_ingested_dataset_is_loaded_from_arrow(data_dirs, monkeypatch):
+    """Test that loads use the ingested copy, and a modified CSV invalidates it."""
+    csv_path = data_dirs / "raw" / "people.csv"
+    csv_path.write_text(CSV)
+
+    info = ingest_dataset("people.csv")
+    assert os.path.exists(info["path"])
+    assert get_dataset_catalog().get("people.csv")["ingested"] == info
+
+    def no_csv_parsing(*args, **kwargs):
+        raise AssertionError("CSV was parsed")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(RecordStore, "from_csv", no_csv_parsing)
+        store = load_records_from_csv(str(csv_path), id_column="id")
+    assert store.record(0).fields["zip"] == "02139"
+
+    csv_path.write_text(CSV + "3,Ann,3.0,94105,2022-05-06\n")
+    assert len(load_records_from_csv(str(csv_path))) == 3
+    assert not os.path.exists(info["path"])
@@ -0,0 +1,92 @@
+"""Tests for the columnar record store."""
+
+import pytest
+from app.ml.blocking import TokenBlocker, field_value
+from app.ml.inference import batch_predict
+from app.ml.preprocessing import serialize_record, serialize_records
+from app.models.schemas import BlockingConfig, RecordBase
+from app.utils.data_loader import load_records_from_csv
+from app.utils.record_store import RecordStore
+
+
+@pytest.fixture
+def records():
+    """Records with heterogeneous fields and null-like values."""
+    return [
+        RecordBase(id="r1", fields={"name": "John  Smith", "city": "New York"}),
+        RecordBase(id="r2", fields={"name": "Alice Johnson", "email": "alice@example.com"}),
+        RecordBase(id="r3", fields={"name": "Bob Wilson", "city": "nan"}),
+        RecordBase(fields={"name": " Carol White ", "city": "Chicago", "email": ""}),
+    ]
+
+
+def test_views_behave_like_records(records):
+    """Test that views expose the ids and fields of the original records."""
+    store = RecordStore.from_records(records)
+
+    assert len(store) == 4
+    assert store[0].id == "r1"
+    assert store[3].id is None
+    assert dict(store[1].fields) == records[1].fields
+    assert "city" not in store[1].fields
+    assert store.to_records() == records
+
+
+def test_serialize_matches_serialize_record(records):
+    """Test that column-wise serialization matches per-record serialization."""
+    store = RecordStore.from_records(records)
+
+    assert store.serialize() == [serialize_record(record) for record in records]
+    assert serialize_records(store, [2, 0]) == [
+        serialize_record(records[2]),
+        serialize_record(records[0]),
+    ]
+
+
+def test_normalized_matches_field_value(records):
+    """Test that column normalization matches per-record normalization."""
+    store = RecordStore.from_records(records)
+
+    for field in ("name", "city", "email", "missing"):
+        assert [field_value(view, field) for view in store] == [
+            field_value(record, field) for record in records
+        ]
+
+
+def test_blocking_on_store(records):
+    """Test that blocking a store yields the same candidates as blocking records."""
+    store = RecordStore.from_records(records)
+    blocker = TokenBlocker(fields=["name", "city"])
+
+    assert blocker.candidate_pairs(store, store) == blocker.candidate_pairs(records, records)
+
+
+def test_load_records_from_csv(tmp_path):
+    """Test that CSV values are kept as raw text."""
+    path = tmp_path / "records.csv"
+    path.write_text("id,name,zip\n1,John Smith,01234\n2,,02139\n")
+
+    store = load_records_from_csv(str(path), id_column="id")
+
+    assert list(store.ids) == ["1", "2"]
+    assert store.fields == ["name", "zip"]
+    assert store[0].fields["zip"] == "01234"
+    assert store.serialize() == ["name: John Smith | zip: 01234", "zip: 02139"]
+
+
+@pytest.mark.asyncio
+async def test_batch_predict_accepts_store(records, fake_model):
+    """Test that batch matching gives the same results for a store and for records."""
+    blocking = BlockingConfig(method="token")
+    from_records = await batch_predict(records, records, threshold=0.5, blocking=blocking)
+    from_store = await batch_predict(
+        RecordStore.from_records(records),
+        RecordStore.from_records(records),
+        threshold=0.5,
+        blocking=blocking,
+    )
+
+    assert from_store.total_comparisons == from_records.total_comparisons
+    assert [result.model_dump() for result in from_store.match_results] == [
+        result.model_dump() for result in from_records.match_results
+    ]
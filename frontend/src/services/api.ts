@@ -9,7 +9,10 @@ import type {
   BatchMatchRequest,
   BatchMatchResult,
   DatasetInfo,
+  Explanation,
   HealthCheck,
+  ThresholdOptimizationResult,
+  TokenAttributionResult,
 } from '../types';
 
 const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
@@ -87,16 +90,49 @@ class RecordLinkageAPI {
     return response.data;
   }
 
+  async explainTokens(
+    recordPair: RecordPair,
+    maxTokens?: number,
+    timeBudget?: number
+  ): Promise<TokenAttributionResult> {
+    const response = await this.client.post<TokenAttributionResult>(
+      '/match/explain/tokens',
+      recordPair,
+      { params: { max_tokens: maxTokens, time_budget: timeBudget } }
+    );
+    return response.data;
+  }
+
+  async getExplanation(explanationId: string): Promise<Explanation> {
+    const response = await this.client.get<Explanation>(`/match/explanations/${explanationId}`);
+    return response.data;
+  }
+
   async batchMatch(request: BatchMatchRequest): Promise<BatchMatchResult> {
     const response = await this.client.post<BatchMatchResult>('/match/batch', request);
     return response.data;
   }
 
-  async optimizeThreshold(datasetName: string): Promise<{ optimal_threshold: number }> {
-    const response = await this.client.get(`/match/threshold/optimize`, {
-      params: { dataset_name: datasetName },
-    });
-    return response.data;
+  /**
+   * Optimize the match threshold on a labeled dataset.
+   * Resolves to null while a large dataset is optimized in the background (HTTP 202).
+   */
+  async optimizeThreshold(
+    datasetName: string,
+    falsePositiveCost = 1.0,
+    falseNegativeCost = 1.0
+  ): Promise<ThresholdOptimizationResult | null> {
+    const response = await this.client.get<ThresholdOptimizationResult>(
+      `/match/threshold/optimize`,
+      {
+        params: {
+          dataset_name: datasetName,
+          false_positive_cost: falsePositiveCost,
+          false_negative_cost: falseNegativeCost,
+        },
+      }
+    );
+    return response.status === 202 ? null : response.data;
   }
 }
 
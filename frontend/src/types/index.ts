@@ -17,6 +17,7 @@ export interface MatchPrediction {
   match_probability: number;
   confidence: 'High' | 'Medium' | 'Low';
   similarity_score: number;
+  resolved_by?: 'prefilter' | 'model';
 }
 
 export interface FeatureContribution {
@@ -30,6 +31,16 @@ export interface TokenContribution {
   token: string;
   contribution: number;
   position: number;
+  side?: 'a' | 'b';
+}
+
+export interface TokenAttributionResult {
+  similarity_score: number;
+  token_contributions: TokenContribution[];
+  num_tokens: number;
+  tokens_evaluated: number;
+  complete: boolean;
+  processing_time: number;
 }
 
 export interface Explanation {
@@ -43,14 +54,58 @@ export interface Explanation {
 export interface MatchResult {
   prediction: MatchPrediction;
   explanation?: Explanation;
+  explanation_id?: string;
   record_pair: RecordPair;
 }
 
+export interface BlockingConfig {
+  method?: 'full' | 'standard' | 'sorted_neighbourhood' | 'qgram' | 'token';
+  fields?: string[];
+  window_size?: number;
+  q?: number;
+  max_block_size?: number;
+}
+
+export interface ClusteringConfig {
+  method?: 'connected_components' | 'center' | 'correlation';
+  threshold?: number;
+  include_singletons?: boolean;
+}
+
 export interface BatchMatchRequest {
   dataset_a: RecordBase[];
-  dataset_b: RecordBase[];
+  dataset_b?: RecordBase[];
+  reference_dataset?: string;
   threshold?: number;
   include_explanations: boolean;
+  blocking?: BlockingConfig;
+  scoring_mode?: 'record' | 'pair' | 'ann';
+  top_k?: number;
+  prefilter?: boolean;
+  clustering?: ClusteringConfig;
+}
+
+export interface ClusterMember {
+  id?: string;
+  dataset?: 'a' | 'b';
+  index?: number;
+}
+
+export interface EntityCluster {
+  cluster_id: number;
+  size: number;
+  members: ClusterMember[];
+}
+
+export interface MatchEdge {
+  id_a: string;
+  id_b: string;
+  similarity: number;
+}
+
+export interface ClusterRequest {
+  edges: MatchEdge[];
+  clustering?: ClusteringConfig;
 }
 
 export interface BatchMatchResult {
@@ -58,6 +113,90 @@ export interface BatchMatchResult {
   matches_found: number;
   match_results: MatchResult[];
   processing_time: number;
+  pairs_pruned: number;
+  blocking_method?: string;
+  prefilter_accepted: number;
+  prefilter_rejected: number;
+  model_scored: number;
+  clusters?: EntityCluster[];
+}
+
+export interface BatchMatchProgress {
+  chunks_done: number;
+  total_chunks: number;
+  pairs_scored: number;
+  total_comparisons: number;
+  matches_found: number;
+  elapsed_time: number;
+  pairs_per_second: number;
+}
+
+export interface MatchJob {
+  job_id: string;
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  created_at: number;
+  updated_at: number;
+  progress: BatchMatchProgress;
+  error?: string;
+}
+
+export interface LinkageCorpusConfig {
+  threshold?: number;
+  blocking?: BlockingConfig;
+  scoring_mode?: 'record' | 'ann';
+  top_k?: number;
+}
+
+export interface LinkageCorpusInfo {
+  name: string;
+  num_records: number;
+  num_links: number;
+  config: LinkageCorpusConfig;
+}
+
+export interface LinkageDelta {
+  upserts?: RecordBase[];
+  deletes?: string[];
+}
+
+export interface LinkChange {
+  id_a: string;
+  id_b: string;
+  similarity: number;
+  change: 'added' | 'updated' | 'removed';
+}
+
+export interface LinkageDeltaResult {
+  inserted: number;
+  updated: number;
+  deleted: number;
+  pairs_scored: number;
+  num_records: number;
+  link_changes: LinkChange[];
+  processing_time: number;
+}
+
+export interface ThresholdPoint {
+  threshold: number;
+  precision: number;
+  recall: number;
+  f1_score: number;
+  false_positive_rate: number;
+  cost: number;
+}
+
+export interface ThresholdOptimizationResult {
+  dataset_name: string;
+  num_pairs: number;
+  num_matches: number;
+  false_positive_cost: number;
+  false_negative_cost: number;
+  roc_auc: number;
+  average_precision: number;
+  best_f1: ThresholdPoint;
+  min_cost: ThresholdPoint;
+  curve: ThresholdPoint[];
+  processing_time: number;
 }
 
 export interface DatasetInfo {
@@ -65,6 +204,7 @@ export interface DatasetInfo {
   description: string;
   num_records: number;
   fields: string[];
+  field_types?: Record<string, string>;
   sample_records?: RecordBase[];
 }
 
@@ -73,6 +213,13 @@ export interface HealthCheck {
   version: string;
   model_loaded: boolean;
   device: string;
+  live: boolean;
+  ready: boolean;
+  model_state: 'idle' | 'loading' | 'warming' | 'ready' | 'failed';
+  backend?: string;
+  model_load_time?: number;
+  model_warmup_time?: number;
+  model_error?: string;
 }
 
 export interface ErrorResponse {
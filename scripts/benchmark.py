@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Non-interactive performance benchmark for the matching pipeline.
+
+Generates synthetic record sets and measures each pipeline stage:
+serialization, encoding, pairwise scoring, batch matching and the HTTP
+endpoints. Reports throughput, latency percentiles and peak RSS, and can
+write the results as JSON and compare them with a previous run.
+
+Example:
+    python scripts/benchmark.py --records 500 --fields 6 --output bench.json
+    python scripts/benchmark.py --records 500 --fields 6 --compare bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import string
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import settings
+
+STAGES = ("serialize", "encode", "predict_batch", "batch_predict", "http_predict", "http_batch")
+
+FIRST_NAMES = ["John", "Jane", "Robert", "Maria", "Wei", "Aisha", "Carlos", "Olga", "Liam", "Emma"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Chen", "Khan", "Ivanova", "Brown", "Lopez", "Muller"]
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Boston", "Seattle"]
+STREETS = ["Main Street", "Oak Avenue", "Elm Road", "Park Lane", "Maple Drive", "Pine Court"]
+
+
+def _field_value(field_index: int, rng: random.Random) -> str:
+    """Generate a value for the field at the given position."""
+    kind = field_index % 5
+    if kind == 0:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    if kind == 1:
+        return str(rng.randint(18, 90))
+    if kind == 2:
+        return rng.choice(CITIES)
+    if kind == 3:
+        return f"{rng.randint(1, 9999)} {rng.choice(STREETS)}"
+    return "".join(rng.choices(string.ascii_lowercase + string.digits, k=8))
+
+
+def _corrupt(value: str, rng: random.Random) -> str:
+    """Introduce a single-character typo."""
+    if len(value) < 2:
+        return value
+    i = rng.randrange(len(value))
+    return value[:i] + rng.choice(string.ascii_lowercase) + value[i + 1 :]
+
+
+def generate_datasets(num_records: int, num_fields: int, match_rate: float, seed: int):
+    """
+    Generate two synthetic datasets where a fraction of B are noisy copies of A.
+
+    Args:
+        num_records: Records per dataset
+        num_fields: Fields per record
+        match_rate: Fraction of dataset_b records derived from dataset_a
+        seed: Random seed
+
+    Returns:
+        Tuple of (dataset_a, dataset_b) lists of RecordBase
+    """
+    from app.models.schemas import RecordBase
+
+    rng = random.Random(seed)
+    field_names = ["name", "age", "city", "address", "code"]
+    field_names += [f"field_{i}" for i in range(len(field_names), num_fields)]
+    field_names = field_names[:num_fields]
+
+    def random_record(record_id: str):
+        return RecordBase(
+            id=record_id,
+            fields={name: _field_value(i, rng) for i, name in enumerate(field_names)},
+        )
+
+    dataset_a = [random_record(f"a{i}") for i in range(num_records)]
+    dataset_b = []
+    for i in range(num_records):
+        if rng.random() < match_rate:
+            source = rng.choice(dataset_a)
+            fields = {
+                name: _corrupt(value, rng) if rng.random() < 0.3 else value
+                for name, value in source.fields.items()
+            }
+            dataset_b.append(RecordBase(id=f"b{i}", fields=fields))
+        else:
+            dataset_b.append(random_record(f"b{i}"))
+
+    return dataset_a, dataset_b
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(stage: str, unit: str, latencies, items: int, wall_time: float, **extra) -> dict:
+    """
+    Summarize the measurements of one stage.
+
+    Args:
+        stage: Stage name
+        unit: What an item is (pairs, texts)
+        latencies: Seconds per call
+        items: Items processed over all calls
+        wall_time: Total wall-clock time in seconds
+        **extra: Additional stage-specific values
+
+    Returns:
+        dict: Throughput, latency percentiles (ms) and peak RSS
+    """
+    latencies_ms = np.asarray(latencies, dtype=np.float64) * 1000
+    return {
+        "stage": stage,
+        "unit": unit,
+        "calls": len(latencies_ms),
+        "items": items,
+        "items_per_second": items / wall_time if wall_time > 0 else 0.0,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(latencies_ms.mean()),
+        "peak_rss_mb": peak_rss_mb(),
+        **extra,
+    }
+
+
+def timed_calls(func, calls):
+    """Call func once per argument, returning per-call latencies and total wall time."""
+    latencies = []
+    start = time.perf_counter()
+    for args in calls:
+        call_start = time.perf_counter()
+        func(*args)
+        latencies.append(time.perf_counter() - call_start)
+    return latencies, time.perf_counter() - start
+
+
+def bench_serialize(pairs, args) -> dict:
+    """Benchmark serialize_record_pair."""
+    from app.ml.preprocessing import serialize_record_pair
+
+    latencies, wall_time = timed_calls(
+        lambda pair: serialize_record_pair(pair, add_sep=False), [(pair,) for pair in pairs]
+    )
+    return summarize("serialize", "pairs", latencies, len(pairs), wall_time)
+
+
+def bench_encode(model, texts, args) -> dict:
+    """Benchmark EntityMatchingModel.encode in batches of BATCH_SIZE."""
+    batches = [
+        (texts[i : i + args.batch_size],) for i in range(0, len(texts), args.batch_size)
+    ] * args.repeats
+    latencies, wall_time = timed_calls(
+        lambda batch: model.encode(batch, batch_size=args.batch_size), batches
+    )
+    return summarize("encode", "texts", latencies, len(texts) * args.repeats, wall_time)
+
+
+def bench_predict_batch(model, text_pairs, args) -> dict:
+    """Benchmark EntityMatchingModel.predict_batch in batches of BATCH_SIZE pairs."""
+    batches = [
+        (text_pairs[i : i + args.batch_size],) for i in range(0, len(text_pairs), args.batch_size)
+    ] * args.repeats
+    latencies, wall_time = timed_calls(model.predict_batch, batches)
+    return summarize("predict_batch", "pairs", latencies, len(text_pairs) * args.repeats, wall_time)
+
+
+def bench_batch_predict(dataset_a, dataset_b, args) -> dict:
+    """Benchmark batch_predict over the full synthetic datasets."""
+    from app.ml.inference import batch_predict
+
+    latencies = []
+    comparisons = 0
+    matches = 0
+    start = time.perf_counter()
+    for _ in range(args.repeats):
+        call_start = time.perf_counter()
+        result = asyncio.run(batch_predict(dataset_a, dataset_b, scoring_mode=args.scoring_mode))
+        latencies.append(time.perf_counter() - call_start)
+        comparisons += result.total_comparisons
+        matches = result.matches_found
+    wall_time = time.perf_counter() - start
+
+    return summarize(
+        "batch_predict",
+        "pairs",
+        latencies,
+        comparisons,
+        wall_time,
+        matches_found=matches,
+        pairs_pruned=result.pairs_pruned,
+        blocking_method=result.blocking_method,
+    )
+
+
+async def _http_requests(client, method, url, payloads, concurrency):
+    """Send requests with bounded concurrency, returning latencies and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def send(payload):
+        async with semaphore:
+            call_start = time.perf_counter()
+            response = await client.request(method, url, json=payload)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - call_start)
+            return response.json()
+
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(send(payload) for payload in payloads))
+    return latencies, time.perf_counter() - start, responses
+
+
+def _http_client(args):
+    """HTTP client for a running server (--base-url) or the app in-process."""
+    import httpx
+
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=300)
+
+    from app.main import app
+
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark", timeout=300
+    )
+
+
+def bench_http_predict(pairs, args) -> dict:
+    """Benchmark POST /match/predict with concurrent single-pair requests."""
+
+    async def run():
+        async with _http_client(args) as client:
+            payloads = [pair.model_dump() for pair in pairs[: args.http_requests]]
+            return await _http_requests(
+                client,
+                "POST",
+                f"{settings.API_V1_STR}/match/predict?include_explanation=false",
+                payloads,
+                args.concurrency,
+            )
+
+    latencies, wall_time, _ = asyncio.run(run())
+    return summarize(
+        "http_predict", "pairs", latencies, len(latencies), wall_time, concurrency=args.concurrency
+    )
+
+
+def bench_http_batch(dataset_a, dataset_b, args) -> dict:
+    """Benchmark POST /match/batch over the full synthetic datasets."""
+
+    async def run():
+        async with _http_client(args) as client:
+            payload = {
+                "dataset_a": [record.model_dump() for record in dataset_a],
+                "dataset_b": [record.model_dump() for record in dataset_b],
+                "scoring_mode": args.scoring_mode,
+            }
+            return await _http_requests(
+                client,
+                "POST",
+                f"{settings.API_V1_STR}/match/batch",
+                [payload] * args.repeats,
+                1,
+            )
+
+    latencies, wall_time, responses = asyncio.run(run())
+    comparisons = sum(response["total_comparisons"] for response in responses)
+    return summarize("http_batch", "pairs", latencies, comparisons, wall_time)
+
+
+def print_report(results, baseline=None):
+    """Print a table of stage results, with speedups against a baseline run."""
+    baseline_by_stage = {result["stage"]: result for result in (baseline or {}).get("results", [])}
+
+    print("\n" + "=" * 100)
+    header = (
+        f"{'Stage':<15} {'Unit':<6} {'Items/sec':>12} {'p50 ms':>10} {'p95 ms':>10} "
+        f"{'p99 ms':>10} {'Peak RSS MB':>12}"
+    )
+    print(header + (f" {'vs baseline':>12}" if baseline else ""))
+    print("=" * 100)
+    for result in results:
+        line = (
+            f"{result['stage']:<15} {result['unit']:<6} {result['items_per_second']:>12.1f} "
+            f"{result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+            f"{result['peak_rss_mb']:>12.1f}"
+        )
+        previous = baseline_by_stage.get(result["stage"])
+        if previous and previous["items_per_second"] > 0:
+            line += f" {result['items_per_second'] / previous['items_per_second']:>11.2f}x"
+        print(line)
+
+
+def main():
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark the record linkage pipeline")
+    parser.add_argument(
+        "--records", type=int, default=200, help="Records per dataset (default: 200)"
+    )
+    parser.add_argument("--fields", type=int, default=5, help="Fields per record (default: 5)")
+    parser.add_argument(
+        "--pairs",
+        type=int,
+        default=1000,
+        help="Record pairs for serialize/predict_batch (default: 1000)",
+    )
+    parser.add_argument(
+        "--match-rate",
+        type=float,
+        default=0.3,
+        help="Fraction of dataset_b derived from dataset_a (default: 0.3)",
+    )
+    parser.add_argument(
+        "--stages",
+        nargs="+",
+        choices=STAGES,
+        default=list(STAGES),
+        help="Stages to run (default: all)",
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=3, help="Repetitions of each stage (default: 3)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.BATCH_SIZE,
+        help=f"Encoding batch size (default: {settings.BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--scoring-mode",
+        type=str,
+        default=None,
+        help=f"Batch scoring mode (default: {settings.BATCH_SCORING_MODE})",
+    )
+    parser.add_argument(
+        "--http-requests",
+        type=int,
+        default=200,
+        help="Requests sent to /match/predict (default: 200)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=16,
+        help="Concurrent /match/predict requests (default: 16)",
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=None,
+        help="Benchmark a running server instead of the app in-process",
+    )
+    parser.add_argument(
+        "--model-name",
+        type=str,
+        default=settings.MODEL_NAME,
+        help=f"Model name or path (default: {settings.MODEL_NAME})",
+    )
+    parser.add_argument(
+        "--embedding-cache",
+        action="store_true",
+        help="Keep the embedding cache enabled (disabled by default for cold numbers)",
+    )
+    parser.add_argument("--seed", type=int, default=42, help="Random seed (default: 42)")
+    parser.add_argument(
+        "--output", type=str, default=None, help="Write the results as JSON to this file"
+    )
+    parser.add_argument(
+        "--compare", type=str, default=None, help="Previous JSON results to compare against"
+    )
+
+    args = parser.parse_args()
+
+    if not args.embedding_cache:
+        settings.EMBEDDING_CACHE_SIZE = 0
+        settings.EMBEDDING_CACHE_DIR = None
+
+    import app.ml.model as model_module
+    from app.ml.preprocessing import serialize_record_pair
+    from app.models.schemas import RecordPair
+
+    print(f"Generating {args.records} x {args.records} records with {args.fields} fields...")
+    dataset_a, dataset_b = generate_datasets(args.records, args.fields, args.match_rate, args.seed)
+    rng = random.Random(args.seed)
+    pairs = [
+        RecordPair(record_a=rng.choice(dataset_a), record_b=rng.choice(dataset_b))
+        for _ in range(args.pairs)
+    ]
+    text_pairs = [serialize_record_pair(pair, add_sep=False) for pair in pairs]
+    texts = [text for text_pair in text_pairs for text in text_pair]
+
+    model = model_module.EntityMatchingModel(model_name=args.model_name)
+    load_start = time.perf_counter()
+    model.load_model()
+    load_time = time.perf_counter() - load_start
+    # Share the model with batch_predict and the in-process API
+    model_module._model_instance = model
+
+    stages = {
+        "serialize": lambda: bench_serialize(pairs, args),
+        "encode": lambda: bench_encode(model, texts, args),
+        "predict_batch": lambda: bench_predict_batch(model, text_pairs, args),
+        "batch_predict": lambda: bench_batch_predict(dataset_a, dataset_b, args),
+        "http_predict": lambda: bench_http_predict(pairs, args),
+        "http_batch": lambda: bench_http_batch(dataset_a, dataset_b, args),
+    }
+
+    results = []
+    for stage in args.stages:
+        print(f"Running stage: {stage}")
+        results.append(stages[stage]())
+
+    report = {
+        "created_at": time.time(),
+        "config": vars(args),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "model": args.model_name,
+            "backend": model.backend,
+            "device": model.device,
+            "model_load_seconds": load_time,
+        },
+        "results": results,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Compare inference backends: embedding parity against torch and sentences/sec."""
+
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import settings
+from app.ml.backends import BACKENDS, embedding_parity, measure_throughput
+from app.ml.model import EntityMatchingModel
+from app.ml.preprocessing import serialize_record
+from app.models.schemas import RecordBase
+
+FIRST_NAMES = ["John", "Jane", "Robert", "Maria", "Wei", "Aisha", "Carlos", "Olga"]
+LAST_NAMES = ["Smith", "Johnson", "Garcia", "Chen", "Khan", "Ivanova", "Brown", "Lopez"]
+CITIES = ["New York", "Los Angeles", "Chicago", "Houston", "Phoenix", "Boston"]
+
+
+def synthetic_texts(count: int, seed: int = 42):
+    """Generate serialized synthetic person records."""
+    rng = random.Random(seed)
+    return [
+        serialize_record(
+            RecordBase(
+                id=str(i),
+                fields={
+                    "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    "age": str(rng.randint(18, 90)),
+                    "city": rng.choice(CITIES),
+                    "address": f"{rng.randint(1, 9999)} Main Street",
+                },
+            )
+        )
+        for i in range(count)
+    ]
+
+
+def main():
+    """Benchmark each backend and check it against the torch backend."""
+    parser = argparse.ArgumentParser(description="Benchmark model inference backends")
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=BACKENDS,
+        default=list(BACKENDS),
+        help="Backends to benchmark (default: all)",
+    )
+    parser.add_argument(
+        "--model-name",
+        type=str,
+        default=settings.MODEL_NAME,
+        help=f"Model name or path (default: {settings.MODEL_NAME})",
+    )
+    parser.add_argument(
+        "--sentences",
+        type=int,
+        default=1000,
+        help="Number of synthetic sentences to encode (default: 1000)",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.BATCH_SIZE,
+        help=f"Encoding batch size (default: {settings.BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.01,
+        help="Maximum allowed cosine deviation from torch (default: 0.01)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write the results as JSON to this file",
+    )
+
+    args = parser.parse_args()
+    texts = synthetic_texts(args.sentences)
+
+    reference = EntityMatchingModel(model_name=args.model_name, backend="torch")
+    reference.load_model()
+
+    results = []
+    for backend in args.backends:
+        print(f"\nBenchmarking backend: {backend}")
+        model = (
+            reference
+            if backend == "torch"
+            else EntityMatchingModel(model_name=args.model_name, backend=backend)
+        )
+        try:
+            model.load_model()
+        except Exception as e:
+            print(f"Skipping {backend}: {e}")
+            results.append({"backend": backend, "error": str(e)})
+            continue
+
+        parity = embedding_parity(reference, model, texts[:256])
+        sentences_per_second = measure_throughput(model, texts, batch_size=args.batch_size)
+        results.append(
+            {
+                "backend": backend,
+                "sentences_per_second": sentences_per_second,
+                **parity,
+                "parity_ok": parity["max_cosine_deviation"] <= args.tolerance,
+            }
+        )
+
+    print("\n" + "=" * 72)
+    print(f"{'Backend':<12} {'Sentences/sec':>14} {'Max cos dev':>12} {'Mean cos dev':>13} Parity")
+    print("=" * 72)
+    for result in results:
+        if "error" in result:
+            print(f"{result['backend']:<12} {'error':>14}")
+            continue
+        print(
+            f"{result['backend']:<12} {result['sentences_per_second']:>14.1f} "
+            f"{result['max_cosine_deviation']:>12.2e} {result['mean_cosine_deviation']:>13.2e} "
+            f"{'OK' if result['parity_ok'] else 'FAIL'}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {"model": args.model_name, "sentences": args.sentences, "results": results},
+                f,
+                indent=2,
+            )
+        print(f"\nResults written to: {args.output}")
+
+    # Non-zero exit when a backend drifts from the torch embeddings
+    if any(not result.get("parity_ok", True) for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
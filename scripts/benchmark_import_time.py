@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Measure API startup import time with ``python -X importtime``.
+
+Imports the application in a fresh interpreter, reports the slowest
+imports it triggers and fails when the total exceeds the budget or when a
+heavy library (torch, sentence-transformers, pandas, ...) is imported
+eagerly instead of on first use by the model and data layers.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+
+# Libraries that must only be loaded on first use
+HEAVY_MODULES = [
+    "torch",
+    "sentence_transformers",
+    "transformers",
+    "pandas",
+    "pyarrow",
+    "scipy",
+    "sklearn",
+    "onnxruntime",
+    "optimum",
+]
+
+DEFAULT_BUDGET_MS = 3000
+
+
+def measure_import_time(module: str = "app.main"):
+    """
+    Import a module in a fresh interpreter with ``-X importtime``.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Tuple of ((nesting depth, cumulative microseconds) per imported module,
+        heavy modules found in sys.modules after the import)
+    """
+    probe = (
+        f"import sys, {module}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    # Lines look like "import time:  self [us] | cumulative | imported package", with
+    # nested imports indented by two more spaces per level
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        timings[name.strip()] = (depth, int(cumulative))
+
+    heavy = [name for name in result.stdout.strip().split(",") if name]
+    return timings, heavy
+
+
+def import_time_ms(timings, module: str) -> float:
+    """
+    Total import time of a module: its own top-level import and its parent packages'.
+
+    Interpreter startup imports (site, encodings, ...) are not counted.
+
+    Args:
+        timings: (Nesting depth, cumulative microseconds) per imported module
+        module: Imported module
+
+    Returns:
+        float: Import time in milliseconds
+    """
+    parts = module.split(".")
+    packages = {".".join(parts[: i + 1]) for i in range(len(parts))}
+    # Nested imports are already in their parent's cumulative time
+    return (
+        sum(us for name, (depth, us) in timings.items() if depth == 0 and name in packages) / 1000
+    )
+
+
+def main():
+    """Report import time and fail on a regression."""
+    parser = argparse.ArgumentParser(description="Benchmark API startup import time")
+    parser.add_argument(
+        "--module",
+        type=str,
+        default="app.main",
+        help="Module to import (default: app.main)",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=float(os.environ.get("IMPORT_TIME_BUDGET_MS", DEFAULT_BUDGET_MS)),
+        help=f"Maximum total import time in ms (default: {DEFAULT_BUDGET_MS})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=3,
+        help="Number of runs; the fastest is reported (default: 3)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=15,
+        help="Number of slowest direct imports to show (default: 15)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        help="Output file for results (JSON)",
+    )
+    args = parser.parse_args()
+
+    runs = [measure_import_time(args.module) for _ in range(max(args.repeat, 1))]
+    timings, heavy = min(runs, key=lambda run: import_time_ms(run[0], args.module))
+    total_ms = import_time_ms(timings, args.module)
+    # Direct imports of the application are where a regression shows up
+    direct = sorted(
+        ((name, us) for name, (depth, us) in timings.items() if depth == 1),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+    print("\n" + "=" * 60)
+    print(f"Import time of {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    print("=" * 60)
+    print(f"{'Direct import':<40} {'Cumulative (ms)':>18}")
+    for name, us in direct[: args.top]:
+        print(f"{name:<40} {us / 1000:>18.1f}")
+    print(f"\nHeavy modules imported eagerly: {', '.join(heavy) or 'none'}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "module": args.module,
+                    "total_ms": total_ms,
+                    "budget_ms": args.budget_ms,
+                    "heavy_modules": heavy,
+                    "direct_imports_ms": {name: us / 1000 for name, us in direct},
+                },
+                f,
+                indent=2,
+            )
+        print(f"\nResults written to: {args.output}")
+
+    # Non-zero exit when startup regresses
+    if heavy or total_ms > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
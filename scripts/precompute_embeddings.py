@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Precompute and store the embeddings of datasets for the current model."""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from app.core.config import settings
+from app.ml.dataset_embeddings import DTYPES, precompute_dataset_embeddings
+from app.ml.model import EntityMatchingModel
+
+
+def main():
+    """Encode each dataset and write its memory-mappable embedding matrix."""
+    parser = argparse.ArgumentParser(description="Precompute dataset embeddings for batch matching")
+    parser.add_argument(
+        "datasets",
+        nargs="+",
+        help="Dataset names (uci, dblp_acm, ... or the name of an uploaded CSV)",
+    )
+    parser.add_argument(
+        "--model-name",
+        type=str,
+        default=settings.MODEL_NAME,
+        help=f"Model name or path (default: {settings.MODEL_NAME})",
+    )
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default=settings.MODEL_BACKEND,
+        help=f"Inference backend (default: {settings.MODEL_BACKEND})",
+    )
+    parser.add_argument(
+        "--dtype",
+        choices=DTYPES,
+        default=settings.DATASET_EMBEDDING_DTYPE,
+        help=f"Storage dtype (default: {settings.DATASET_EMBEDDING_DTYPE})",
+    )
+
+    args = parser.parse_args()
+
+    model = EntityMatchingModel(model_name=args.model_name, backend=args.backend)
+    model.load_model()
+
+    for dataset in args.datasets:
+        start = time.time()
+        embeddings = precompute_dataset_embeddings(dataset, model=model, dtype=args.dtype)
+        print(
+            f"{dataset}: {embeddings.meta['num_records']} x {embeddings.meta['dim']} "
+            f"{embeddings.meta['dtype']} in {time.time() - start:.1f}s -> {embeddings.directory}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
-from app.ml.training import train_model, evaluate_model
+from app.ml.training import TRAINING_LOSSES, train_model, evaluate_model
 from app.ml.model import EntityMatchingModel
 from app.core.config import settings
 
@@ -59,6 +59,25 @@ def main():
         default=2e-5,
         help="Learning rate (default: 2e-5)",
     )
+    parser.add_argument(
+        "--loss",
+        choices=TRAINING_LOSSES,
+        default="cosine",
+        help="cosine (regress every labeled pair) or mnrl (in-batch and mined "
+        "hard negatives; default: cosine)",
+    )
+    parser.add_argument(
+        "--hard-negatives",
+        type=int,
+        default=1,
+        help="Mined hard negatives per matching pair with --loss mnrl (default: 1)",
+    )
+    parser.add_argument(
+        "--refresh-every",
+        type=int,
+        default=1,
+        help="Epochs between hard-negative mining passes with --loss mnrl (default: 1)",
+    )
 
     args = parser.parse_args()
 
@@ -88,6 +107,7 @@ def main():
     print(f"  Epochs: {args.epochs}")
     print(f"  Batch size: {args.batch_size}")
     print(f"  Learning rate: {args.learning_rate}")
+    print(f"  Loss: {args.loss}")
     print()
 
     # Train the model
@@ -99,6 +119,9 @@ def main():
             epochs=args.epochs,
             batch_size=args.batch_size,
             learning_rate=args.learning_rate,
+            loss=args.loss,
+            hard_negatives=args.hard_negatives,
+            refresh_every=args.refresh_every,
         )
 
         # Evaluate if test dataset provided